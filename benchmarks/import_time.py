@@ -0,0 +1,71 @@
+# benchmarks/import_time.py - Cold import cost of the dashboard modules (python -X importtime summary)
+#
+# Usage: python benchmarks/import_time.py [--module main_simplified] [--top 15] [--budget-ms 600]
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must stay unloaded after importing the app modules - they load on the first data ingest / figure build.
+# (plotly.graph_objects is left out: streamlit's plotly_chart element imports it, and its submodules are lazy anyway)
+DEFERRED_MODULES = ['geopandas', 'plotly.express', 'shapely', 'scipy.sparse']
+
+
+def measure(module: str) -> Tuple[List[Tuple[str, int, int]], Dict[str, bool]]:
+    """Import module in a fresh interpreter; returns (name, depth, cumulative_us) rows and deferred-module state"""
+    probe = (f"import sys, {module}; "
+             f"print('|'.join(f'{{name}}={{name in sys.modules}}' for name in {DEFERRED_MODULES!r}))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # Nesting is encoded as two extra spaces per level before the module name
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative_us)))
+
+    loaded = {}
+    for item in result.stdout.strip().splitlines()[-1].split('|'):
+        name, state = item.split('=')
+        loaded[name] = state == 'True'
+    return rows, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Cold import time of the dashboard modules')
+    parser.add_argument('--module', default='main_simplified', help='module to import cold')
+    parser.add_argument('--top', type=int, default=15, help='number of packages to list')
+    parser.add_argument('--budget-ms', type=float, default=None, help='fail if the total exceeds this')
+    args = parser.parse_args()
+
+    rows, loaded = measure(args.module)
+    # Top-level imports only - their cumulative time already includes everything they pulled in
+    total_ms = sum(cumulative for _, depth, cumulative in rows if depth == 0) / 1000
+    # Each package is imported once, so its root row (e.g. 'pandas') carries the whole package's cost;
+    # packages imported by other packages are counted in both
+    packages = [(name, cumulative) for name, _, cumulative in rows if '.' not in name and name != args.module]
+
+    print(f"Cold import of {args.module}: {total_ms:.0f} ms ({len(rows)} modules)")
+    print(f"{'cumulative ms':>14}  package")
+    for name, cumulative in sorted(packages, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    eager = [name for name, is_loaded in loaded.items() if is_loaded]
+    print(f"Deferred modules loaded at import: {', '.join(eager) if eager else 'none'}")
+
+    failed = bool(eager)
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"Over budget: {total_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
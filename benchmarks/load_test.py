@@ -0,0 +1,190 @@
+# benchmarks/load_test.py - Concurrent simulated sessions against the real app script (Streamlit AppTest)
+#
+# Usage: python benchmarks/load_test.py [--users 8] [--actions 20] [--processes 1] [--warmup] [--seed 0]
+#
+# Every user is an AppTest session on its own thread, so all users of one process share its caches the
+# way sessions of one Streamlit worker do. --processes runs that many independent workers.
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_ROOT, 'main_simplified.py')
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class SimulatedUser:
+    """One session clicking through the dashboard: level, page, year, month, metric, period and trend entities"""
+
+    def __init__(self, user_id: int, seed: int, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.user_id = user_id
+        self.rng = random.Random(seed * 1000 + user_id)
+        self.app = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: List[str] = []
+
+    def _rerun(self, action: str, interact):
+        start = time.perf_counter()
+        interact()
+        self.latencies[action].append((time.perf_counter() - start) * 1000)
+        for element in list(self.app.exception) + list(self.app.error):
+            self.errors.append(f"{action}: {element.value}")
+
+    def _pick(self, widget) -> Any:
+        current = widget.value
+        others = [option for option in widget.options if str(option) != str(current)] or list(widget.options)
+        return self.rng.choice(others)
+
+    def start(self):
+        self._rerun('open', self.app.run)
+
+    def step(self):
+        level, page = self.app.session_state['admin_level'], self.app.session_state['current_page']
+        actions = ['level', 'page']
+        actions += ['year', 'month', 'metric', 'period'] if page == 'dashboard' else ['entities']
+        action = self.rng.choice(actions)
+
+        if action == 'level':
+            radio = self.app.sidebar.radio(key='admin_level_radio')
+            self._rerun(action, lambda: radio.set_value(self._pick(radio)).run())
+        elif action == 'page':
+            target = 'trends' if page == 'dashboard' else 'dashboard'
+            self._rerun(action, lambda: self.app.sidebar.button(key=f"{target}_{level}").click().run())
+        elif action == 'entities':
+            multiselect = self.app.multiselect(key=f"trend_entities_{level}")
+            options = list(multiselect.options)
+            chosen = self.rng.sample(options, k=min(len(options), self.rng.randint(1, 5)))
+            self._rerun(action, lambda: multiselect.set_value(chosen).run())
+        else:
+            # Dashboard selectboxes (they hold numpy values - pick from their own options)
+            selectbox = self.app.selectbox(key=f"{action}_{level}_{page}")
+            self._rerun(action, lambda: selectbox.set_value(self._pick(selectbox)).run())
+
+
+def run_worker(users: int, actions: int, seed: int, timeout: float, warmup: bool) -> Dict[str, Any]:
+    """Run `users` concurrent sessions in this process; returns latencies, errors, wall time and peak RSS"""
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+    if warmup:
+        from warmup import WARMUP_STATUS, warm_up
+        warm_up(WARMUP_STATUS)
+
+    sessions = [SimulatedUser(user_id, seed, timeout) for user_id in range(users)]
+    barrier = threading.Barrier(users)
+
+    def drive(session: SimulatedUser):
+        barrier.wait()  # Every session opens at the same moment - the cold-start stampede
+        try:
+            session.start()
+            for _ in range(actions):
+                session.step()
+        except Exception as e:
+            session.errors.append(f"driver: {type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=drive, args=(session,), name=f"user-{session.user_id}") for session in sessions]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - start
+
+    from view_cache import FIGURE_CACHE, TABLE_CACHE
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    for session in sessions:
+        for action, values in session.latencies.items():
+            latencies[action].extend(values)
+    return {
+        'pid': os.getpid(),
+        'users': users,
+        'wall_seconds': wall_seconds,
+        'latencies': dict(latencies),
+        'errors': [error for session in sessions for error in session.errors],
+        'peak_rss_mb': peak_rss_mb(),
+        'caches': {'figures': FIGURE_CACHE.stats(), 'tables': TABLE_CACHE.stats()}
+    }
+
+
+def _percentiles(values: List[float]) -> Optional[List[float]]:
+    return list(np.percentile(values, [50, 95, 99])) if values else None
+
+
+def print_report(results: List[Dict[str, Any]]):
+    all_latencies: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        for action, values in result['latencies'].items():
+            all_latencies[action].extend(values)
+    reruns = sum(len(values) for values in all_latencies.values())
+    wall_seconds = max(result['wall_seconds'] for result in results)
+    users = sum(result['users'] for result in results)
+
+    print(f"{users} users over {len(results)} worker(s): {reruns} reruns in {wall_seconds:.1f} s "
+          f"({reruns / wall_seconds:.1f} reruns/s)")
+    print(f"{'action':>10} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = sorted(all_latencies.items()) + [('all', [v for values in all_latencies.values() for v in values])]
+    for action, values in rows:
+        p50, p95, p99 = _percentiles(values)
+        print(f"{action:>10} {len(values):>6} {p50:>9.0f} {p95:>9.0f} {p99:>9.0f}")
+
+    for result in results:
+        figures, tables = result['caches']['figures'], result['caches']['tables']
+        print(f"worker {result['pid']}: peak RSS {result['peak_rss_mb']:.0f} MB · figure cache hit rate "
+              f"{figures['hit_rate']:.0%} ({figures['coalesced']} coalesced) · table cache hit rate "
+              f"{tables['hit_rate']:.0%} ({tables['coalesced']} coalesced)")
+
+    errors = [error for result in results for error in result['errors']]
+    if errors:
+        print(f"{len(errors)} errors, first: {errors[0]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Concurrent headless sessions against main_simplified.py')
+    parser.add_argument('--users', type=int, default=8, help='concurrent sessions per worker')
+    parser.add_argument('--actions', type=int, default=20, help='interactions per session after opening the app')
+    parser.add_argument('--processes', type=int, default=1, help='independent worker processes')
+    parser.add_argument('--warmup', action='store_true', help='run the process warm-up before users arrive')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300, help='per-rerun timeout in seconds')
+    parser.add_argument('--json', action='store_true', help='print the raw worker result as JSON')
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        # Each worker is this script in --json mode; seeds differ so workers don't replay the same clicks
+        commands = [[sys.executable, os.path.abspath(__file__), '--json', '--users', str(args.users),
+                     '--actions', str(args.actions), '--seed', str(args.seed + worker),
+                     '--timeout', str(args.timeout)] + (['--warmup'] if args.warmup else [])
+                    for worker in range(args.processes)]
+        workers = [subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                   for command in commands]
+        results = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+    else:
+        results = [run_worker(args.users, args.actions, args.seed, args.timeout, args.warmup)]
+
+    if args.json:
+        print(json.dumps(results[0]))
+    else:
+        print_report(results)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
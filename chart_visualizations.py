@@ -1,9 +1,18 @@
-import plotly.express as px
-import plotly.graph_objects as go
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
-import geopandas as gpd
-from typing import List, Optional, Tuple, Any
+from typing import TYPE_CHECKING, List, Optional, Tuple, Any
+
+from lazy_imports import lazy_import
+from metric_registry import METRIC_REGISTRY
+from view_cache import cached_figure
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
 
 class ChartVisualizations:
     """Handle all chart visualizations including bar charts, trends, and scatterplots"""
@@ -27,49 +36,56 @@ class ChartVisualizations:
         7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"
     }
     
-    # Chart configuration templates
-    CHART_CONFIGS = {
-        'districts': {
-            'all cases': ('All Cases', 'All Cases Trends Over Time'),
-            'Severe cases/Deaths': ('Severe Cases & Deaths', 'Severe Cases & Deaths Trends Over Time'),
-            'all cases incidence': ('All Cases Incidence', 'All Cases Incidence Trends Over Time'),
-            'Severe cases/Deaths incidence': ('Severe Cases & Deaths Incidence', 'Severe Cases & Deaths Incidence Trends Over Time')
-        },
-        'sectors': {
-            'Simple malaria cases': ('Simple Malaria Cases', 'Simple Malaria Cases Trends Over Time'),
-            'incidence': ('Incidence', 'Incidence Trends Over Time')
-        }
+    # Scatterplot (x, y) columns per level
+    SCATTER_AXES = {
+        'Districts': ('all cases', 'Severe cases/Deaths'),
+        'Sectors': ('Population', 'incidence')
     }
     
+    # From this many points the scatterplot is drawn with WebGL instead of SVG
+    WEBGL_MIN_POINTS = 1000
+    
+    # Trend series longer than this are LTTB-downsampled (20 years of months - full detail for shorter histories)
+    TREND_MAX_POINTS = 240
+    
     def __init__(self, dashboard_type: str, metrics_calculator):
         self.dashboard_type = dashboard_type
         self.metrics_calculator = metrics_calculator
     
-    def create_top_entities_chart(self, data: gpd.GeoDataFrame, year: int, month: int, metric: str, top_n: int = 10) -> Any:
+    @cached_figure
+    def create_top_entities_chart(self, data: gpd.GeoDataFrame, year: int, month: int, metric: str, top_n: int = 10,
+                                  lean: bool = False, period_label: Optional[str] = None) -> Any:
         """Create top entities bar chart with improved ranking (highest at top)"""
-        filtered_data = data[(data['year'] == year) & (data['month'] == month)].copy()
+        rank_table = self.metrics_calculator.get_rank_table(data)
         
         # Get top entities - FIXED: Now shows highest values at TOP
-        sorted_data = filtered_data.nlargest(top_n, metric)
+        if metric in rank_table.metrics:
+            top_rows = rank_table.top(year, month, metric, top_n)['row'].to_numpy()
+            sorted_data = data.iloc[top_rows]
+        else:
+            filtered_data = data[(data['year'] == year) & (data['month'] == month)]
+            sorted_data = filtered_data.nlargest(top_n, metric)
         
         # Reverse the order so highest appears at top of chart
         sorted_data = sorted_data.iloc[::-1]
         
         # Get configuration using helper
-        y_title, title, y_column = self._get_chart_config('bar', year, month, metric, top_n)
+        y_title, title, y_column = self._get_chart_config('bar', year, month, metric, top_n, period_label)
         
-        # Get yearly maximum for consistent color scaling
-        yearly_max = data[data['year'] == year][metric].max()
-        yearly_min = data[data['year'] == year][metric].min()
+        # Get yearly range for consistent color scaling (precomputed stats table)
+        yearly_min, yearly_max = self.metrics_calculator.get_yearly_color_range(data, year, metric)
         
-        fig = px.bar(
-            sorted_data, x=metric, y=y_column, orientation='h', color=metric,
-            color_continuous_scale=self.PINK_PURPLE_SCALE, 
-            range_color=[yearly_min, yearly_max],  # FIXED: Use yearly range, not monthly
-            title=title,
-            labels={metric: y_title, y_column: self._get_entity_label()},
-            hover_data=self._get_hover_data('bar')
-        )
+        if lean:
+            fig = self._create_lean_bar(sorted_data, metric, y_column, y_title, title, yearly_min, yearly_max)
+        else:
+            fig = px.bar(
+                sorted_data, x=metric, y=y_column, orientation='h', color=metric,
+                color_continuous_scale=self.PINK_PURPLE_SCALE, 
+                range_color=[yearly_min, yearly_max],  # FIXED: Use yearly range, not monthly
+                title=title,
+                labels={metric: y_title, y_column: self._get_entity_label()},
+                hover_data=self._get_hover_data('bar')
+            )
         
         # Update colorbar with better labels
         fig.update_layout(
@@ -89,34 +105,48 @@ class ChartVisualizations:
         self._apply_dark_theme(fig, height=520, title_size=14)
         return fig
     
-    def create_trend_chart(self, data: gpd.GeoDataFrame, selected_entities: List[str], metric: str) -> Optional[Any]:
-        """Create trend line chart for selected entities showing monthly trends"""
+    @cached_figure
+    def create_trend_chart(self, data: gpd.GeoDataFrame, selected_entities: List[str], metric: str,
+                           max_points: Optional[int] = None) -> Optional[Any]:
+        """Create trend line chart for selected entities showing monthly trends
+        
+        Series are slices of the per-dataset trend store, so a selection change only
+        touches the selected entities' points. Series longer than max_points (default
+        TREND_MAX_POINTS) are LTTB-downsampled, keeping their peaks and troughs.
+        """
         if not selected_entities:
             return None
         
-        # Filter and prepare data
-        filtered_data = self._filter_trend_data(data, selected_entities)
-        if filtered_data.empty:
+        store = self.metrics_calculator.get_trend_store(data)
+        entities = [entity for entity in selected_entities if entity in store]
+        if not entities or metric not in store.columns:
             return None
         
-        # Create date column and sort
-        filtered_data = filtered_data.copy()
-        filtered_data['date'] = pd.to_datetime(filtered_data[['year', 'month']].assign(day=1))
-        filtered_data = filtered_data.sort_values('date')
-        
         # Get configuration
         y_column, y_title, title = self._get_chart_config('trend', metric=metric)
-        color_column = 'sector_display' if self.dashboard_type == "Sectors" else self.metrics_calculator.get_display_column()
-        
-        # Create color mapping
-        color_map = {entity: self.HARMONIZED_COLORS[i % len(self.HARMONIZED_COLORS)] 
-                     for i, entity in enumerate(selected_entities)}
-        
-        fig = px.line(
-            filtered_data, x='date', y=y_column, color=color_column, title=title,
-            labels={y_column: y_title, 'date': 'Time Period', color_column: self._get_entity_label()},
-            color_discrete_map=color_map, hover_data=self._get_hover_data('trend')
-        )
+        max_points = self.TREND_MAX_POINTS if max_points is None else max_points
+        
+        # Same hover columns as before, the plotted metric itself shown once as y
+        hover_columns = [(col, fmt) for col, fmt in self._get_hover_data('trend').items()
+                         if col != y_column and col in store.columns]
+        hover_lines = [f"{col}=%{{customdata[{i}]{'' if fmt is True else fmt}}}"
+                       for i, (col, fmt) in enumerate(hover_columns)]
+        definition = METRIC_REGISTRY.get(self.dashboard_type, metric)
+        y_format = definition.hover_format if definition is not None else ''
+        hovertemplate = "<br>".join([f"{self._get_entity_label()}=%{{fullData.name}}", "Time Period=%{x|%b %Y}",
+                                     f"{y_title}=%{{y{y_format}}}"] + hover_lines) + "<extra></extra>"
+        
+        fig = go.Figure()
+        for i, entity in enumerate(entities):
+            dates, values = store.series(entity, [y_column] + [col for col, _ in hover_columns], max_points)
+            customdata = np.column_stack([values[col] for col, _ in hover_columns]) if hover_columns else None
+            fig.add_trace(go.Scatter(
+                x=dates, y=values[y_column], name=entity, legendgroup=entity,
+                line=dict(color=self.HARMONIZED_COLORS[i % len(self.HARMONIZED_COLORS)]),
+                customdata=customdata, hovertemplate=hovertemplate
+            ))
+        fig.update_layout(title=title, xaxis_title='Time Period', yaxis_title=y_title,
+                          legend=dict(title=self._get_entity_label()))
         
         # Apply styling with spline smoothing
         fig.update_traces(line=dict(width=3, shape='spline', smoothing=0.3), marker=dict(size=6), mode='lines+markers')
@@ -125,69 +155,88 @@ class ChartVisualizations:
         
         return fig
     
-    def create_scatterplot(self, data: gpd.GeoDataFrame, year: int, month: int) -> Tuple[Optional[Any], Optional[float], Optional[float]]:
-        """Create scatterplot with quadrant analysis and star/triangle highlights for selected month/year"""
-        filtered_data = data[(data['year'] == year) & (data['month'] == month)].copy()
-        
-        if filtered_data.empty:
+    @cached_figure
+    def create_scatterplot(self, data: gpd.GeoDataFrame, year: int, month: int,
+                           render_mode: str = 'auto') -> Tuple[Optional[Any], Optional[float], Optional[float]]:
+        """Create scatterplot with quadrant analysis and star/triangle highlights for selected month/year
+
+        render_mode is 'webgl' (Scattergl), 'svg' or 'auto' (WebGL from WEBGL_MIN_POINTS points).
+        Thresholds, axis ranges and highlighted entities come from the per-period
+        stats table, so a render only slices the period's points.
+        """
+        x_col, y_col = self.SCATTER_AXES[self.dashboard_type]
+        stats = self.metrics_calculator.get_scatter_stats(data, x_col, y_col)
+        if (int(year), int(month)) not in stats.index:
             return None, None, None
+        period_stats = stats.loc[(int(year), int(month))]
+        
+        mask = (data['year'] == year) & (data['month'] == month) & (data[x_col] >= 0) & (data[y_col] >= 0)
+        points = data.loc[mask]
+        webgl = render_mode == 'webgl' or (render_mode == 'auto' and len(points) >= self.WEBGL_MIN_POINTS)
+        highlights = (data.iloc[int(period_stats['x_max_row'])], data.iloc[int(period_stats['y_max_row'])])
         
         if self.dashboard_type == "Districts":
-            return self._create_district_scatterplot(filtered_data, year, month)
+            return self._create_district_scatterplot(points, period_stats, highlights, year, month, webgl)
         else:
-            return self._create_sector_scatterplot(filtered_data, year, month)
+            return self._create_sector_scatterplot(points, period_stats, highlights, year, month, webgl)
     
     # === PRIVATE HELPER METHODS ===
     
-    def _get_chart_config(self, chart_type: str, year: int = None, month: int = None, metric: str = None, top_n: int = 10) -> Tuple[str, str, str]:
+    def _get_chart_config(self, chart_type: str, year: int = None, month: int = None, metric: str = None, top_n: int = 10,
+                          period_label: Optional[str] = None) -> Tuple[str, str, str]:
         """Universal configuration method for all chart types"""
-        dashboard_key = 'districts' if self.dashboard_type == "Districts" else 'sectors'
+        definition = METRIC_REGISTRY.get(self.dashboard_type, metric)
         
         if chart_type == 'bar':
             month_name = self.MONTH_NAMES.get(month, str(month))
+            period_text = period_label or f'{month_name} {year}'
             entity_label = "Districts" if self.dashboard_type == "Districts" else "Sectors"
             y_column = 'District' if self.dashboard_type == "Districts" else 'Sector'
             
-            if metric in self.CHART_CONFIGS[dashboard_key]:
-                y_title = self.CHART_CONFIGS[dashboard_key][metric][0]
-                title = f'Top {top_n} {entity_label}: {y_title} ({month_name} {year})'
+            if definition is not None:
+                y_title = definition.label
+                title = f'Top {top_n} {entity_label}: {y_title} ({period_text})'
             else:
-                y_title, title = 'Value', f'Top {top_n} {entity_label} ({month_name} {year})'
+                y_title, title = 'Value', f'Top {top_n} {entity_label} ({period_text})'
             
             return y_title, title, y_column
         
         elif chart_type == 'trend':
-            if metric in self.CHART_CONFIGS[dashboard_key]:
-                y_title, title = self.CHART_CONFIGS[dashboard_key][metric]
-                return metric, y_title, title
+            if definition is not None:
+                return metric, definition.label, definition.trend_title
             else:
                 return metric, 'Value', 'Trends Over Time'
     
     def _get_hover_data(self, chart_type: str) -> dict:
         """Get hover data configuration based on dashboard type and chart type"""
-        base_data = {'Population': ':,.0f'}
+        # Metric formats come from the registry; sectors also show their district
+        specific_data = METRIC_REGISTRY.hover_formats(self.dashboard_type, include_population=False)
+        if self.dashboard_type != "Districts":
+            specific_data = {'District': True, **specific_data}
         
-        if self.dashboard_type == "Districts":
-            specific_data = {
-                'all cases': ':,.0f', 'Severe cases/Deaths': ':,.0f',
-                'all cases incidence': ':.2f', 'Severe cases/Deaths incidence': ':.2f'
-            }
-        else:
-            specific_data = {
-                'District': True, 'Simple malaria cases': ':,.0f', 'incidence': ':.2f'
-            }
-        
-        return {**base_data, **specific_data} if chart_type == 'bar' else specific_data
+        if chart_type == 'bar':
+            return {'Population': METRIC_REGISTRY.get(self.dashboard_type, 'Population').hover_format, **specific_data}
+        return specific_data
     
-    def _filter_trend_data(self, data: gpd.GeoDataFrame, selected_entities: List[str]) -> gpd.GeoDataFrame:
-        """Filter data for trend charts based on dashboard type"""
-        if self.dashboard_type == "Districts":
-            return data[data[self.metrics_calculator.get_display_column()].isin(selected_entities)]
-        else:
-            if 'sector_display' in data.columns:
-                return data[data['sector_display'].isin(selected_entities)]
-            else:
-                return data[data['Sector'].isin(selected_entities)]
+    def _create_lean_bar(self, sorted_data, metric: str, y_column: str, y_title: str, title: str,
+                         vmin: float, vmax: float) -> Any:
+        """Build the top-N bar directly with graph_objects: values rounded to 2 decimals, no extra hover columns"""
+        definition = METRIC_REGISTRY.get(self.dashboard_type, metric)
+        value_format = definition.fmt if definition is not None else ',.0f'
+        values = np.round(sorted_data[metric].to_numpy(dtype='float64'), 2)
+        
+        fig = go.Figure(go.Bar(
+            x=values, y=sorted_data[y_column].tolist(), orientation='h',
+            marker=dict(color=values, coloraxis='coloraxis'),
+            hovertemplate=f"<b>%{{y}}</b><br>{y_title}: %{{x:{value_format}}}<extra></extra>"
+        ))
+        fig.update_layout(
+            template='none',  # the default template alone adds several KB to every payload
+            title=title,
+            coloraxis=dict(colorscale=self.PINK_PURPLE_SCALE, cmin=float(vmin), cmax=float(vmax)),
+            xaxis_title=y_title, yaxis_title=self._get_entity_label()
+        )
+        return fig
     
     def _apply_dark_theme(self, fig, height: int = 450, title_size: int = 16):
         """Apply consistent dark theme styling to all charts"""
@@ -202,78 +251,79 @@ class ChartVisualizations:
             coloraxis_colorbar=dict(title_font_color='white', tickfont_color='white')
         )
     
-    def _create_district_scatterplot(self, filtered_data: gpd.GeoDataFrame, year: int, month: int) -> Tuple[Optional[Any], Optional[float], Optional[float]]:
+    def _create_district_scatterplot(self, points: gpd.GeoDataFrame, period_stats: pd.Series, highlights: Tuple,
+                                     year: int, month: int, webgl: bool) -> Tuple[Optional[Any], Optional[float], Optional[float]]:
         """Create district scatterplot: Total vs Severe Cases"""
-        # Prepare data
-        filtered_data['Total Malaria Cases'] = filtered_data['all cases']
-        filtered_data['Severe Cases & Deaths'] = filtered_data['Severe cases/Deaths']
-        
-        filtered_data = filtered_data[(filtered_data['Total Malaria Cases'] >= 0) & 
-                                      (filtered_data['Severe Cases & Deaths'] >= 0)].copy()
-        if filtered_data.empty:
-            return None, None, None
-        
-        # Calculate thresholds and bounds
-        thresholds = self._calculate_scatterplot_bounds(filtered_data, 'Total Malaria Cases', 'Severe Cases & Deaths')
+        thresholds = self._get_scatterplot_bounds(period_stats)
         
-        # Create scatterplot
         month_name = self.MONTH_NAMES.get(month, str(month))
-        fig = px.scatter(
-            filtered_data, x='Total Malaria Cases', y='Severe Cases & Deaths', color='Province',
-            color_discrete_map=self.PROVINCE_COLORS, hover_name='District',
-            hover_data={'Province': False, 'all cases': ':,.1f', 'Severe cases/Deaths': ':,.1f', 'Population': ':,.0f'},
-            title=f'District Performance: Total vs Severe Cases ({month_name} {year})',
-            labels={'Total Malaria Cases': 'Total Malaria Cases', 'Severe Cases & Deaths': 'Severe Cases & Deaths'},
-            opacity=0.85
-        )
+        fig = go.Figure(self._create_province_traces(
+            points, 'all cases', 'Severe cases/Deaths', 'District',
+            [('all cases', 'all cases', ',.1f'), ('Severe cases/Deaths', 'Severe cases/Deaths', ',.1f'),
+             ('Population', 'Population', ',.0f')], webgl
+        ))
+        fig.update_layout(title=f'District Performance: Total vs Severe Cases ({month_name} {year})',
+                          xaxis_title='Total Malaria Cases', yaxis_title='Severe Cases & Deaths')
         
         # Add styling and highlights
         self._style_scatterplot(fig, thresholds, 'district')
-        self._add_highlights(fig, filtered_data, 'district')
+        self._add_highlights(fig, highlights, 'all cases', 'Severe cases/Deaths', 'District',
+                             ('Highest Total', 'Highest Severe'))
         
         return fig, thresholds['x_threshold'], thresholds['y_threshold']
     
-    def _create_sector_scatterplot(self, filtered_data: gpd.GeoDataFrame, year: int, month: int) -> Tuple[Optional[Any], Optional[float], Optional[float]]:
+    def _create_sector_scatterplot(self, points: gpd.GeoDataFrame, period_stats: pd.Series, highlights: Tuple,
+                                   year: int, month: int, webgl: bool) -> Tuple[Optional[Any], Optional[float], Optional[float]]:
         """Create sector scatterplot: Population vs Incidence"""
-        # Clean province names and filter data
-        filtered_data['Province'] = filtered_data['Province'].replace('Iburengerazuba', 'Western Province')
-        filtered_data = filtered_data[(filtered_data['Population'] >= 0) & (filtered_data['incidence'] >= 0)].copy()
-        
-        if filtered_data.empty:
-            return None, None, None
-        
-        # Calculate thresholds with custom x bounds
-        thresholds = self._calculate_scatterplot_bounds(filtered_data, 'Population', 'incidence', x_lower=-100)
-        
-        # Create scatterplot
-        month_name = self.MONTH_NAMES.get(month, str(month))
-        hover_name_col = 'sector_display' if 'sector_display' in filtered_data.columns else 'Sector'
-        
-        fig = px.scatter(
-            filtered_data, x='Population', y='incidence', color='Province',
-            color_discrete_map=self.PROVINCE_COLORS, hover_name=hover_name_col,
-            hover_data={'Province': False, 'District': True, 'Simple malaria cases': ':,.0f', 'Population': ':,.0f', 'incidence': ':.2f'},
-            title=f'<br><br>',
-            labels={'Population': 'Population', 'incidence': 'Incidence (per 1,000 people)'},
-            opacity=0.85
-        )
+        # Province names are canonical from the loader (see name_normalization.py)
+        thresholds = self._get_scatterplot_bounds(period_stats, x_lower=-100)
+        
+        name_col = 'sector_display' if 'sector_display' in points.columns else 'Sector'
+        fig = go.Figure(self._create_province_traces(
+            points, 'Population', 'incidence', name_col,
+            [('District', 'District', None), ('Simple malaria cases', 'Simple malaria cases', ',.0f'),
+             ('Population', 'Population', ',.0f'), ('incidence', 'incidence', '.2f')], webgl
+        ))
+        fig.update_layout(title='<br><br>', xaxis_title='Population', yaxis_title='Incidence (per 1,000 people)')
         
         # Add styling and highlights
         self._style_scatterplot(fig, thresholds, 'sector')
-        self._add_highlights(fig, filtered_data, 'sector')
+        self._add_highlights(fig, highlights, 'Population', 'incidence', name_col,
+                             ('Highest Population', 'Highest Incidence'))
         
         return fig, thresholds['x_threshold'], thresholds['y_threshold']
     
-    def _calculate_scatterplot_bounds(self, data, x_col: str, y_col: str, x_lower: int = 0) -> dict:
-        """Calculate thresholds and bounds for scatterplot"""
-        x_threshold = np.percentile(data[x_col], 75)
-        y_threshold = np.percentile(data[y_col], 75)
-        x_upper = max(data[x_col].max() * 1.2, x_threshold * 1.5)
-        y_upper = max(data[y_col].max() * 1.2, y_threshold * 1.5)
-        
+    def _create_province_traces(self, points: gpd.GeoDataFrame, x_col: str, y_col: str, name_col: str,
+                                hover_columns: List[Tuple[str, str, Optional[str]]], webgl: bool) -> List[Any]:
+        """One marker trace per province (legend entries), Scattergl when webgl, hover from customdata"""
+        trace_class = go.Scattergl if webgl else go.Scatter
+        customdata = points[[col for col, _, _ in hover_columns]].to_numpy()
+        hover_lines = [f"{label}=%{{customdata[{i}]{':' + fmt if fmt else ''}}}"
+                       for i, (_, label, fmt) in enumerate(hover_columns)]
+        hovertemplate = "<b>%{hovertext}</b><br><br>" + "<br>".join(hover_lines) + "<extra></extra>"
+        
+        codes, provinces = pd.factorize(points['Province'].fillna('Unknown'))
+        x_values, y_values = points[x_col].to_numpy(), points[y_col].to_numpy()
+        names = points[name_col].to_numpy()
+        traces = []
+        for code, province in enumerate(provinces):
+            selected = codes == code
+            color = self.PROVINCE_COLORS.get(province, self.HARMONIZED_COLORS[code % len(self.HARMONIZED_COLORS)])
+            traces.append(trace_class(
+                x=x_values[selected], y=y_values[selected], mode='markers', name=province, legendgroup=province,
+                marker=dict(color=color, opacity=0.85), hovertext=names[selected],
+                customdata=customdata[selected], hovertemplate=hovertemplate
+            ))
+        return traces
+    
+    def _get_scatterplot_bounds(self, period_stats: pd.Series, x_lower: int = 0) -> dict:
+        """Quadrant thresholds and axis bounds from the precomputed per-period stats"""
+        x_threshold, y_threshold = period_stats['x_threshold'], period_stats['y_threshold']
         return {
             'x_threshold': x_threshold, 'y_threshold': y_threshold,
-            'x_upper': x_upper, 'y_upper': y_upper, 'x_lower': x_lower
+            'x_upper': max(period_stats['x_max'] * 1.2, x_threshold * 1.5),
+            'y_upper': max(period_stats['y_max'] * 1.2, y_threshold * 1.5),
+            'x_lower': x_lower
         }
     
     def _style_scatterplot(self, fig, thresholds: dict, plot_type: str):
@@ -328,32 +378,12 @@ class ChartVisualizations:
             fig.add_annotation(x=x_pos, y=y_pos, text=text, showarrow=False,
                               font=dict(color="lightgray", size=11), xanchor=x_anchor, yanchor=y_anchor)
     
-    def _add_highlights(self, fig, data, plot_type: str):
-        """Add star and triangle highlights"""
-        if plot_type == 'district':
-            max_case_row = data.loc[data['Total Malaria Cases'].idxmax()]
-            max_severe_row = data.loc[data['Severe Cases & Deaths'].idxmax()]
-            
-            self._add_highlight_marker(fig, max_case_row, 'Total Malaria Cases', 'Severe Cases & Deaths', 
-                                     'District', 'Province', 'star', 'Highest Total')
-            
-            if max_severe_row['District'] != max_case_row['District']:
-                self._add_highlight_marker(fig, max_severe_row, 'Total Malaria Cases', 'Severe Cases & Deaths', 
-                                         'District', 'Province', 'triangle-up', 'Highest Severe')
-        else:  # sector
-            max_pop_row = data.loc[data['Population'].idxmax()]
-            max_inc_row = data.loc[data['incidence'].idxmax()]
-            
-            name_col = 'sector_display' if 'sector_display' in data.columns else 'Sector'
-            pop_name = max_pop_row.get(name_col, 'Unknown')
-            inc_name = max_inc_row.get(name_col, 'Unknown')
-            
-            self._add_highlight_marker(fig, max_pop_row, 'Population', 'incidence', 
-                                     name_col, 'Province', 'star', 'Highest Population')
-            
-            if inc_name != pop_name:
-                self._add_highlight_marker(fig, max_inc_row, 'Population', 'incidence', 
-                                         name_col, 'Province', 'triangle-up', 'Highest Incidence')
+    def _add_highlights(self, fig, highlights: Tuple, x_col: str, y_col: str, name_col: str, names: Tuple[str, str]):
+        """Add star (highest x) and triangle (highest y, if a different entity) highlights"""
+        x_max_row, y_max_row = highlights
+        self._add_highlight_marker(fig, x_max_row, x_col, y_col, name_col, 'Province', 'star', names[0])
+        if y_max_row.get(name_col, 'Unknown') != x_max_row.get(name_col, 'Unknown'):
+            self._add_highlight_marker(fig, y_max_row, x_col, y_col, name_col, 'Province', 'triangle-up', names[1])
     
     def _add_highlight_marker(self, fig, row, x_col: str, y_col: str, name_col: str, color_col: str, symbol: str, name: str):
         """Add a single highlight marker"""
@@ -0,0 +1,162 @@
+# consistency_checks.py - Reconcile sector roll-ups with the district file, month by month
+
+import threading
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+Period = Tuple[int, int]
+
+
+class AggregationConsistencyChecker:
+    """Roll sector cases and population up to district and province and compare with the district file
+
+    Results are kept per month together with a content hash of that month's
+    sector and district rows, so each check only recomputes months whose data
+    changed (new ingest, corrected month) instead of the full history.
+    """
+
+    SECTOR_COLUMNS = ['year', 'month', 'District', 'Sector', 'Simple malaria cases', 'Population']
+    DISTRICT_COLUMNS = ['year', 'month', 'Province', 'District', 'all cases', 'Population']
+
+    def __init__(self, cases_tolerance_pct: float = 2.0, population_tolerance_pct: float = 1.0):
+        self.cases_tolerance_pct = cases_tolerance_pct
+        self.population_tolerance_pct = population_tolerance_pct
+        self._month_hashes: Dict[Period, Tuple[int, int]] = {}
+        self._district_results: Dict[Period, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.last_recomputed: List[Period] = []
+
+    def check(self, sector_data: pd.DataFrame, district_data: pd.DataFrame) -> pd.DataFrame:
+        """Update the reconciliation for changed months and return the district-level report"""
+        sectors = pd.DataFrame(sector_data[self.SECTOR_COLUMNS])
+        districts = pd.DataFrame(district_data[self.DISTRICT_COLUMNS])
+        sector_hashes = self._month_hashes_of(sectors)
+        district_hashes = self._month_hashes_of(districts)
+
+        with self._lock:
+            periods = set(sector_hashes) | set(district_hashes)
+            current = {period: (sector_hashes.get(period, 0), district_hashes.get(period, 0)) for period in periods}
+            changed = sorted(period for period in periods if self._month_hashes.get(period) != current[period])
+
+            # Months that disappeared from both files
+            for period in set(self._month_hashes) - periods:
+                self._month_hashes.pop(period)
+                self._district_results.pop(period, None)
+
+            if changed:
+                changed_index = pd.MultiIndex.from_tuples(changed, names=['year', 'month'])
+                sectors = sectors[pd.MultiIndex.from_frame(sectors[['year', 'month']]).isin(changed_index)]
+                districts = districts[pd.MultiIndex.from_frame(districts[['year', 'month']]).isin(changed_index)]
+                results = self._reconcile_districts(sectors, districts)
+                for period, frame in results.groupby(['year', 'month'], sort=False):
+                    self._district_results[(int(period[0]), int(period[1]))] = frame.reset_index(drop=True)
+                for period in changed:
+                    self._month_hashes[period] = current[period]
+
+            self.last_recomputed = changed
+            return self.district_report()
+
+    def _month_hashes_of(self, frame: pd.DataFrame) -> Dict[Period, int]:
+        """Order-independent content hash of each month's rows"""
+        row_hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+        sums = pd.Series(row_hashes, dtype='uint64').groupby([frame['year'].to_numpy(), frame['month'].to_numpy()]).sum()
+        return {(int(year), int(month)): int(value) for (year, month), value in sums.items()}
+
+    def _reconcile_districts(self, sectors: pd.DataFrame, districts: pd.DataFrame) -> pd.DataFrame:
+        """Grouped roll-up of sectors and comparison with district rows for a batch of months"""
+        rollup = (sectors.groupby(['year', 'month', 'District'], sort=False)
+                  .agg(sector_cases=('Simple malaria cases', 'sum'),
+                       sector_population=('Population', 'sum'),
+                       sectors_reporting=('Sector', 'nunique'))
+                  .reset_index())
+        reference = districts.rename(columns={'all cases': 'district_cases', 'Population': 'district_population'})
+
+        merged = rollup.merge(reference, on=['year', 'month', 'District'], how='outer', indicator=True)
+        merged['missing_in_district_file'] = merged['_merge'] == 'left_only'
+        merged['missing_in_sector_file'] = merged['_merge'] == 'right_only'
+        merged = merged.drop(columns='_merge')
+
+        merged['cases_diff'] = merged['sector_cases'] - merged['district_cases']
+        merged['cases_diff_pct'] = self._percent(merged['cases_diff'], merged['district_cases'])
+        merged['population_diff'] = merged['sector_population'] - merged['district_population']
+        merged['population_diff_pct'] = self._percent(merged['population_diff'], merged['district_population'])
+        return self._flag(merged)
+
+    def _percent(self, diff: pd.Series, reference: pd.Series) -> pd.Series:
+        """Difference as a percentage of the district-file value (NaN when the reference is 0 or missing)"""
+        return diff / reference.where(reference != 0) * 100
+
+    def _flag(self, report: pd.DataFrame) -> pd.DataFrame:
+        """Mark rows whose roll-up disagrees with the reference"""
+        # Simple cases are a subset of all cases, so a larger sector total is always an error
+        report['cases_exceed_district'] = report['cases_diff'] > 0
+        report['cases_mismatch'] = report['cases_diff_pct'].abs() > self.cases_tolerance_pct
+        report['population_mismatch'] = report['population_diff_pct'].abs() > self.population_tolerance_pct
+        flags = ['missing_in_district_file', 'missing_in_sector_file', 'cases_exceed_district',
+                 'cases_mismatch', 'population_mismatch']
+        report['has_discrepancy'] = report[flags].any(axis=1)
+        return report
+
+    def district_report(self) -> pd.DataFrame:
+        """Reconciliation per (year, month, district) for every checked month"""
+        if not self._district_results:
+            return pd.DataFrame()
+        frames = [self._district_results[period] for period in sorted(self._district_results)]
+        return pd.concat(frames, ignore_index=True)
+
+    def province_report(self) -> pd.DataFrame:
+        """Reconciliation per (year, month, province) using the district file's province names"""
+        report = self.district_report()
+        if report.empty:
+            return report
+        province_of = report.dropna(subset=['Province']).groupby('District')['Province'].first()
+        report = report.assign(Province=report['District'].map(province_of))
+        provinces = (report.groupby(['year', 'month', 'Province'])
+                     [['sector_cases', 'district_cases', 'sector_population', 'district_population']]
+                     .sum(min_count=1).reset_index())
+        provinces['cases_diff'] = provinces['sector_cases'] - provinces['district_cases']
+        provinces['cases_diff_pct'] = self._percent(provinces['cases_diff'], provinces['district_cases'])
+        provinces['population_diff'] = provinces['sector_population'] - provinces['district_population']
+        provinces['population_diff_pct'] = self._percent(provinces['population_diff'], provinces['district_population'])
+        provinces['missing_in_district_file'] = provinces['district_cases'].isna()
+        provinces['missing_in_sector_file'] = provinces['sector_cases'].isna()
+        return self._flag(provinces)
+
+    def discrepancies(self, level: str = 'district') -> pd.DataFrame:
+        """Only the flagged rows of the district or province report"""
+        report = self.province_report() if level == 'province' else self.district_report()
+        if report.empty:
+            return report
+        return report[report['has_discrepancy']].reset_index(drop=True)
+
+    def summary(self) -> Dict[str, int]:
+        """Counts for a quick data-quality status line"""
+        report = self.district_report()
+        if report.empty:
+            return {'months_checked': 0, 'district_months': 0, 'discrepancies': 0,
+                    'cases_exceed_district': 0, 'population_mismatch': 0}
+        return {
+            'months_checked': len(self._district_results),
+            'district_months': len(report),
+            'discrepancies': int(report['has_discrepancy'].sum()),
+            'cases_exceed_district': int(report['cases_exceed_district'].sum()),
+            'population_mismatch': int(report['population_mismatch'].sum())
+        }
+
+
+# One checker per process so repeated ingests only re-check changed months
+CONSISTENCY_CHECKER = AggregationConsistencyChecker()
+
+
+if __name__ == "__main__":
+    from data_loader import MalariaDataLoader, SectorDataLoader
+
+    sector_loader, district_loader = SectorDataLoader(), MalariaDataLoader()
+    sector_table = sector_loader.process_data(pd.read_csv(sector_loader.data_file))
+    district_table = district_loader.process_data(pd.read_csv(district_loader.data_file))
+
+    CONSISTENCY_CHECKER.check(sector_table, district_table)
+    print(f"Checked {len(CONSISTENCY_CHECKER.last_recomputed)} months: {CONSISTENCY_CHECKER.summary()}")
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(CONSISTENCY_CHECKER.discrepancies().head(20))
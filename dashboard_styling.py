@@ -1,11 +1,22 @@
 import streamlit as st
+import numpy as np
 import base64
+import html
 import os
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+def _compact_html(markup: str) -> str:
+    """Collapse template whitespace once, so rendered cards carry no indentation"""
+    return re.sub(r'>\s+<', '><', re.sub(r'\s+', ' ', markup)).strip()
 
 class DashboardStyling:
     """Handle all dashboard styling, CSS, and visual appearance"""
     
+    # Served by Streamlit at app/static/ (see .streamlit/config.toml)
+    LOGO_PATH = "static/HIC_logo.png"
+    
     @staticmethod
     def setup_page_config():
         """Set up page configuration"""
@@ -16,10 +27,8 @@ class DashboardStyling:
             initial_sidebar_state="expanded"
         )
     
-    @staticmethod
-    def apply_custom_css():
-        """Apply comprehensive custom CSS for professional dark theme"""
-        st.markdown("""
+    # Dark theme stylesheet - emitted on every rerun, minified once per process
+    CUSTOM_CSS = """
         <style>
             /* ===== DARK THEME BASE ===== */
             .stApp {
@@ -240,18 +249,31 @@ class DashboardStyling:
                 color: #0d47a1 !important;
             }
         </style>
-        """, unsafe_allow_html=True)
+    """
+    
+    @staticmethod
+    def apply_custom_css():
+        """Apply comprehensive custom CSS for professional dark theme"""
+        st.markdown(DashboardStyling.get_minified_css(), unsafe_allow_html=True)
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_minified_css() -> str:
+        """Get the custom CSS with comments and indentation stripped (cached per process)"""
+        css = re.sub(r'/\*.*?\*/', '', DashboardStyling.CUSTOM_CSS, flags=re.DOTALL)
+        return re.sub(r'\s+', ' ', css).strip()
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def render_header_with_logo() -> str:
-        """Render professional header with logo"""
-        logo_base64 = DashboardStyling.get_logo_base64()
+        """Render professional header with logo (built once per process)"""
+        logo_src = DashboardStyling.get_logo_src()
         
-        if logo_base64:
+        if logo_src:
             header_html = f"""
             <div class="main-header">
                 <div style="text-align: center; margin-bottom: 1rem;">
-                    <img src="data:image/png;base64,{logo_base64}" 
+                    <img src="{logo_src}" 
                          alt="Health Intelligence Center" 
                          style="height: 120px; width: auto; margin-bottom: 1rem;">
                 </div>
@@ -270,9 +292,20 @@ class DashboardStyling:
         return header_html
     
     @staticmethod
+    @lru_cache(maxsize=1)
+    def get_logo_src() -> str:
+        """Get logo URL - static file route when static serving is enabled, cached data URI otherwise"""
+        if st.get_option("server.enableStaticServing") and os.path.exists(DashboardStyling.LOGO_PATH):
+            return f"app/static/{os.path.basename(DashboardStyling.LOGO_PATH)}"
+        
+        logo_base64 = DashboardStyling.get_logo_base64()
+        return f"data:image/png;base64,{logo_base64}" if logo_base64 else ""
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
     def get_logo_base64() -> str:
-        """Get logo as base64 string"""
-        logo_path = "assets/HIC_logo.png"
+        """Get logo as base64 string (read and encoded once per process)"""
+        logo_path = DashboardStyling.LOGO_PATH
         
         try:
             if os.path.exists(logo_path):
@@ -284,6 +317,68 @@ class DashboardStyling:
         except Exception:
             return ""
     
+    # Card templates - compacted once at import, filled with str.format on every rerun
+    METRIC_TILE_TEMPLATE = _compact_html("""
+        <div class="metric-card {status_class}">
+            <div style="font-size: 0.9rem; color: #B0B0B0; font-weight: 500;">{title}</div>
+            <div style="font-size: 2.2rem; font-weight: 700; color: #FFFFFF; margin: 0.5rem 0;">{value}</div>
+            {delta_html}
+        </div>
+    """)
+    
+    METRIC_DELTA_TEMPLATE = _compact_html("""
+        <div style="color: {color} !important; font-size: 0.9rem; margin-top: 0.5rem;">{arrow} {delta}</div>
+    """)
+    
+    MOVER_ROW_TEMPLATE = _compact_html("""
+        <div style="background: {background}; padding: 1.2rem; border-radius: 10px; margin-bottom: 0.5rem;
+                    display: flex; justify-content: space-between; align-items: center;">
+            <strong style="flex: 1; color: white; font-size: 18px;">{name}</strong>
+            <span style="color: white; text-align: right; font-size: 17px;">{value} {unit} ({change})</span>
+        </div>
+    """)
+    
+    # Heading and body of a dashboard card in one markdown block (one message per card)
+    CARD_TEMPLATE = "### {title}\n\n{body}"
+    
+    # Increase/decrease backgrounds of top-mover rows (increases are bad news)
+    MOVER_COLORS = ('rgba(40, 167, 69, 0.3)', 'rgba(220, 53, 69, 0.3)')
+    
+    # Delta text colors and arrows of metric tiles when a rise is bad (inverse) - falling, flat, rising
+    INVERSE_DELTA_STYLES = (('#4CAF50', '▼'), ('#888888', '●'), ('#F44336', '▲'))
+    
+    @staticmethod
+    def render_card(title: str, body: str) -> str:
+        """Markdown block of a card heading and its HTML body"""
+        return DashboardStyling.CARD_TEMPLATE.format(title=title, body=body)
+    
+    @staticmethod
+    def render_metric_tiles(titles: Sequence[str], values: Sequence[str], changes: Sequence[float],
+                            delta_texts: Sequence[str]) -> str:
+        """HTML of metric tiles with inverse deltas (rises in red, falls in green)"""
+        tiles = []
+        for title, value, change, delta in zip(titles, values, changes, delta_texts):
+            direction = int(np.sign(change)) if change == change else 0
+            color, arrow = DashboardStyling.INVERSE_DELTA_STYLES[direction + 1]
+            status_class = ('status-improved', 'status-current', 'status-concern')[direction + 1]
+            delta_html = DashboardStyling.METRIC_DELTA_TEMPLATE.format(color=color, arrow=arrow, delta=delta)
+            tiles.append(DashboardStyling.METRIC_TILE_TEMPLATE.format(
+                status_class=status_class, title=html.escape(title), value=value, delta_html=delta_html
+            ))
+        return "".join(tiles)
+    
+    @staticmethod
+    def render_mover_rows(names: Sequence[str], values: List[str], changes: List[str],
+                          rising: Sequence[bool], unit: str) -> str:
+        """HTML of top-mover rows from column arrays (names, formatted values and changes, rising flags)"""
+        colors = DashboardStyling.MOVER_COLORS
+        return "".join(
+            DashboardStyling.MOVER_ROW_TEMPLATE.format(
+                background=colors[bool(up)], name=html.escape(str(name)), value=value, unit=unit, change=change
+            )
+            for name, value, change, up in zip(names, values, changes, rising)
+        )
+    
     @staticmethod
     def create_metric_card(title: str, value: str, delta: str = None, delta_color: str = "normal") -> str:
         """Create a styled metric card"""
@@ -298,13 +393,9 @@ class DashboardStyling:
         
         delta_html = f'<div style="color: #888; font-size: 0.9rem; margin-top: 0.5rem;">{delta}</div>' if delta else ""
         
-        return f"""
-        <div class="metric-card {delta_class}">
-            <div style="font-size: 0.9rem; color: #B0B0B0; font-weight: 500;">{title}</div>
-            <div style="font-size: 2.2rem; font-weight: 700; color: #FFFFFF; margin: 0.5rem 0;">{value}</div>
-            {delta_html}
-        </div>
-        """
+        return DashboardStyling.METRIC_TILE_TEMPLATE.format(
+            status_class=delta_class, title=html.escape(title), value=value, delta_html=delta_html
+        )
     
     @staticmethod
     def create_risk_badge(risk_level: str) -> str:
@@ -0,0 +1,235 @@
+# data_export.py - CSV / Parquet / GeoJSON export of filtered slices, encoded in chunks and served as one payload
+
+import io
+import json
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from range_queries import Period, period_to_index
+from view_cache import LRUCache, _freeze, dataset_fingerprint
+
+# Format key -> (label, mime type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'text/csv', 'csv'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet', 'parquet'),
+    'geojson': ('GeoJSON', 'application/geo+json', 'geojson')
+}
+
+# Finished exports are kept for identical repeat requests (bytes, so keep the count small)
+EXPORT_CACHE = LRUCache(max_entries=16)
+
+
+def parquet_available() -> bool:
+    """Parquet export needs pyarrow (installed with Streamlit, but may be broken or absent)"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ChunkedExport(io.RawIOBase):
+    """Read-only file object over a chunk generator
+
+    Chunks are encoded only as the consumer reads. st.download_button reads
+    the whole object into one bytes payload before serving it, so the browser
+    does not receive a stream - what the chunking bounds is the working set
+    of DataFrame copies and encoders. The payload is also stored in
+    EXPORT_CACHE once the generator is exhausted, provided it is smaller than
+    max_cached_bytes (up to that size a second copy is held while reading).
+    """
+
+    def __init__(self, chunks: Iterator[bytes], cache_key: Tuple, max_cached_bytes: int):
+        self._chunks = chunks
+        self._buffer = b''
+        self._cache_key = cache_key
+        self._max_cached_bytes = max_cached_bytes
+        self._parts: Optional[List[bytes]] = []
+        self._size = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        # Only a no-op rewind before the first read (download handlers call seek(0))
+        if offset == 0 and whence == io.SEEK_SET and not self._size and not self._buffer:
+            return 0
+        raise io.UnsupportedOperation('chunked export is not seekable')
+
+    def readinto(self, target) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._store()
+                return 0
+            self._buffer = chunk
+            self._keep(chunk)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def _keep(self, chunk: bytes):
+        if self._parts is None:
+            return
+        self._size += len(chunk)
+        if self._size > self._max_cached_bytes:
+            self._parts = None  # Too large to cache - stop keeping a copy
+        else:
+            self._parts.append(chunk)
+
+    def _store(self):
+        if self._parts is not None:
+            EXPORT_CACHE.put(self._cache_key, b''.join(self._parts))
+            self._parts = None
+
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file object that hands out what was written since the last drain
+
+    tell() keeps counting across drains so writers that record absolute
+    offsets (the Parquet footer) stay correct.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b''.join(self._parts), []
+        return data
+
+
+class SliceExporter:
+    """Serialize a (period range x entities x columns) slice of a dataset chunk by chunk
+
+    Rows are selected as positions into the loaded frame and only chunk_rows
+    rows are copied and encoded at a time, so exporting the full sector
+    history never builds the whole slice as one DataFrame or string. The
+    encoded file itself still ends up in memory once, when Streamlit serves it.
+    CSV and Parquet are tabular (no geometry); GeoJSON carries the polygons.
+    """
+
+    ID_COLUMNS = ['year', 'month', 'Province', 'District', 'Sector', 'Population']
+
+    def __init__(self, data: pd.DataFrame, entity_col: str, chunk_rows: int = 5000,
+                 max_cached_bytes: int = 50 * 1024 * 1024):
+        self.data = data
+        self.entity_col = entity_col
+        self.chunk_rows = chunk_rows
+        self.max_cached_bytes = max_cached_bytes
+        self._period_index = (data['year'].to_numpy(dtype=np.int64) * 12
+                              + data['month'].to_numpy(dtype=np.int64) - 1)
+
+    def get_columns(self, metrics: Sequence[str]) -> List[str]:
+        """Identifier columns followed by the requested metrics"""
+        columns = [col for col in self.ID_COLUMNS if col in self.data.columns]
+        return columns + [metric for metric in metrics if metric in self.data.columns and metric not in columns]
+
+    def select_rows(self, start: Period, end: Period, entities: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Row positions inside [start, end] (and the entity selection), in year/month order"""
+        mask = (self._period_index >= period_to_index(start)) & (self._period_index <= period_to_index(end))
+        if entities:
+            mask &= self.data[self.entity_col].isin(list(entities)).to_numpy()
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(self._period_index[rows], kind='stable')]
+
+    def _iter_frames(self, rows: np.ndarray, columns: List[str]) -> Iterator[pd.DataFrame]:
+        for offset in range(0, len(rows), self.chunk_rows):
+            yield self.data.iloc[rows[offset:offset + self.chunk_rows]][columns]
+
+    def iter_csv(self, rows: np.ndarray, columns: List[str]) -> Iterator[bytes]:
+        """Header line, then one encoded block per chunk"""
+        yield (','.join(columns) + '\n').encode('utf-8')
+        for frame in self._iter_frames(rows, columns):
+            yield pd.DataFrame(frame).to_csv(index=False, header=False).encode('utf-8')
+
+    def iter_parquet(self, rows: np.ndarray, columns: List[str]) -> Iterator[bytes]:
+        """One Parquet row group per chunk, yielded as soon as it is written"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        sink = _ByteSink()
+        writer = None
+        try:
+            for frame in self._iter_frames(rows, columns):
+                if writer is None:
+                    # Schema from the first chunk; all-missing text columns are still strings
+                    schema = pa.Schema.from_pandas(pd.DataFrame(frame), preserve_index=False)
+                    schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                        for field in schema], metadata=schema.metadata)
+                    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+                writer.write_table(pa.Table.from_pandas(pd.DataFrame(frame), schema=schema, preserve_index=False))
+                yield sink.drain()
+            if writer is None:
+                # Empty selection - still a valid file with the selected columns
+                empty = pd.DataFrame(self.data[columns].iloc[:0])
+                writer = pq.ParquetWriter(sink, pa.Schema.from_pandas(empty, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+        yield sink.drain()
+
+    def iter_geojson(self, rows: np.ndarray, columns: List[str]) -> Iterator[bytes]:
+        """FeatureCollection written feature by feature"""
+        yield b'{"type": "FeatureCollection", "features": ['
+        first = True
+        for frame in self._iter_frames(rows, columns + ['geometry']):
+            features = [json.dumps(feature) for feature in frame.iterfeatures(na='null', drop_id=True)]
+            if not features:
+                continue
+            yield (('' if first else ', ') + ', '.join(features)).encode('utf-8')
+            first = False
+        yield b']}'
+
+    def iter_export(self, fmt: str, start: Period, end: Period, metrics: Sequence[str],
+                    entities: Optional[Sequence[str]] = None) -> Iterator[bytes]:
+        """Byte chunks of the selected slice in one of EXPORT_FORMATS"""
+        rows = self.select_rows(start, end, entities)
+        columns = self.get_columns(metrics)
+        if fmt == 'geojson':
+            if 'geometry' not in self.data.columns:
+                raise ValueError("GeoJSON export needs a 'geometry' column")
+            return self.iter_geojson(rows, columns)
+        if fmt == 'parquet':
+            return self.iter_parquet(rows, columns)
+        return self.iter_csv(rows, columns)
+
+    def open(self, fmt: str, start: Period, end: Period, metrics: Sequence[str],
+             entities: Optional[Sequence[str]] = None) -> io.RawIOBase:
+        """File object for an export, served from EXPORT_CACHE when the same slice was exported before"""
+        key = (dataset_fingerprint(self.data), self.entity_col, fmt, tuple(start), tuple(end),
+               _freeze(list(metrics)), _freeze(sorted(entities) if entities else None))
+        cached = EXPORT_CACHE.get(key)
+        if cached is not None:
+            return io.BytesIO(cached)
+        chunks = self.iter_export(fmt, start, end, metrics, entities)
+        return _ChunkedExport(chunks, key, self.max_cached_bytes)
+
+
+def get_export_file_name(level: str, fmt: str, start: Period, end: Period) -> str:
+    """e.g. malaria_sectors_2024-07_2025-06.csv"""
+    extension = EXPORT_FORMATS[fmt][2]
+    return f"malaria_{level}_{start[0]}-{start[1]:02d}_{end[0]}-{end[1]:02d}.{extension}"
+
+
+def get_export_formats(data: Optional[pd.DataFrame] = None) -> Dict[str, str]:
+    """Format options for the selector, without Parquet when pyarrow cannot be imported
+    and without GeoJSON when data has no geometry"""
+    return {fmt: label for fmt, (label, _, _) in EXPORT_FORMATS.items()
+            if (fmt != 'parquet' or parquet_available())
+            and (fmt != 'geojson' or data is None or 'geometry' in data.columns)}
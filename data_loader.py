@@ -1,13 +1,40 @@
+from __future__ import annotations
+
+import os
 import pandas as pd
-import geopandas as gpd
 import streamlit as st
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+
+from consistency_checks import CONSISTENCY_CHECKER
+from data_export import SliceExporter
+from dataset_manifest import DATASET_REGISTRY, DatasetManifest, PublishedDataset, file_state, hash_files
+from data_validation import DataValidationError, DataValidator
+from entity_search import EntitySearchIndex
+from lazy_imports import lazy_import
+from metric_registry import METRIC_REGISTRY
+from name_normalization import NAME_NORMALIZER
+from query_backends import SQLQueryBackend, get_query_engine, register_query_backend
+from spatial_index import SpatialIndex
+from view_cache import TABLE_CACHE, SingleFlight, dataset_fingerprint, set_dataset_fingerprint
+
+gpd = lazy_import('geopandas')
+
+# Sessions that notice the same file change at the same time share one re-hash / ingest
+INGEST_FLIGHTS = SingleFlight()
+
+def check_published_consistency():
+    """Reconcile sector roll-ups with the district file once both levels are published"""
+    sectors = DATASET_REGISTRY.get(SectorDataLoader().dataset_name)
+    districts = DATASET_REGISTRY.get(MalariaDataLoader().dataset_name)
+    if sectors is not None and districts is not None:
+        CONSISTENCY_CHECKER.check(sectors.data, districts.data)
 
 class BaseDataLoader(ABC):
     def __init__(self, data_file: str, geometry_file: str):
         self.data_file = data_file
         self.geometry_file = geometry_file
+        self.validation_report = None
     
     @abstractmethod
     def get_join_column(self) -> str:
@@ -17,37 +44,131 @@ class BaseDataLoader(ABC):
     def process_data(self, data: pd.DataFrame) -> pd.DataFrame:
         pass
     
+    @abstractmethod
+    def get_validator(self) -> DataValidator:
+        pass
+    
+    def get_entity_key_column(self) -> str:
+        """Column that uniquely identifies an entity in the merged data"""
+        return self.get_join_column()
+    
+    def get_entity_name_column(self) -> str:
+        """Column with an entity's own name (without its parent district)"""
+        return self.get_entity_key_column()
+    
+    def get_spatial_index(self, data: gpd.GeoDataFrame, tolerance: float = 0.0) -> SpatialIndex:
+        """Get the STRtree index and contiguity matrix for this level - built once, adjacency cached to disk"""
+        key_col = self.get_entity_key_column()
+        cache_name = os.path.splitext(os.path.basename(self.geometry_file))[0]
+        key = ('spatial_index', self.geometry_file, tolerance, dataset_fingerprint(data))
+        return TABLE_CACHE.get_or_compute(key, lambda: SpatialIndex.from_data(data, key_col, tolerance, cache_name))
+    
+    def get_exporter(self, data: gpd.GeoDataFrame) -> SliceExporter:
+        """Get the chunked CSV/Parquet/GeoJSON exporter for this level's data"""
+        key = ('exporter', self.data_file, dataset_fingerprint(data))
+        return TABLE_CACHE.get_or_compute(key, lambda: SliceExporter(data, self.get_entity_key_column()))
+    
+    def get_search_index(self, data: gpd.GeoDataFrame) -> EntitySearchIndex:
+        """Get the typeahead / drill-down index over this level's entity names"""
+        key = ('search_index', self.data_file, dataset_fingerprint(data))
+        return TABLE_CACHE.get_or_compute(
+            key, lambda: EntitySearchIndex(data, self.get_entity_key_column(), self.get_entity_name_column())
+        )
+    
+    @property
+    def dataset_name(self) -> str:
+        """Registry / manifest name of this loader's dataset (data file name without extension)"""
+        return os.path.splitext(os.path.basename(self.data_file))[0]
+    
+    def get_source_files(self) -> List[str]:
+        """Files the loaded frame is derived from - any change to them is a new dataset version"""
+        return [self.data_file, self.geometry_file, NAME_NORMALIZER.alias_file]
+    
+    def get_manifest(self) -> Optional[DatasetManifest]:
+        """Manifest of the currently loaded dataset version (None before the first load)"""
+        published = DATASET_REGISTRY.get(self.dataset_name)
+        return published.manifest if published else None
+    
     def load_data(self) -> Tuple[gpd.GeoDataFrame, list]:
         try:
-            df = pd.read_csv(self.data_file)
-            gdf = gpd.read_file(self.geometry_file)
-            df = self.process_data(df)
-            join_col = self.get_join_column()
-            
-            if isinstance(join_col, list):
-                for col in join_col:
-                    df[col] = df[col].str.strip().str.title()
-                    gdf[col] = gdf[col].str.strip().str.title()
-                gdf = gdf[join_col + ['geometry']].drop_duplicates()
-                merged = df.merge(gdf, on=join_col, how='left')
-                
-                # Create sector display names for selection
-                if 'Sector' in merged.columns and 'District' in merged.columns:
-                    merged['sector_display'] = merged['Sector'] + ' (' + merged['District'] + ')'
-                    merged['sector_key'] = merged['Sector'] + '_' + merged['District']
-                    options = sorted(merged['sector_display'].unique())
-                else:
-                    options = []
-            else:
-                gdf = gdf[[join_col, 'geometry']].drop_duplicates()
-                merged = df.merge(gdf, on=join_col, how='left')
-                options = sorted(merged[join_col].unique()) if isinstance(join_col, str) else []
-            
-            merged = gpd.GeoDataFrame(merged, geometry='geometry')
-            return merged, options
+            published = self.get_published_dataset()
+            self.validation_report = published.validation_report
+            return published.data, published.options
+        except DataValidationError as e:
+            self.validation_report = e.report
+            st.error(f"Data validation failed for {self.data_file}: {e}")
+            return None, []
         except Exception as e:
             st.error(f"Data loading failed: {e}")
             return None, []
+    
+    def get_published_dataset(self) -> PublishedDataset:
+        """Current dataset version - files are re-hashed only when their size or mtime changed (raises on failure)"""
+        state = file_state(self.get_source_files())
+        published = DATASET_REGISTRY.get(self.dataset_name)
+        if published is not None and published.file_state == state:
+            return published
+        return INGEST_FLIGHTS.do((self.dataset_name, state), lambda: self._refresh(state))
+    
+    def _refresh(self, state) -> PublishedDataset:
+        """Re-hash the files and ingest them if their content changed"""
+        published = DATASET_REGISTRY.get(self.dataset_name)
+        if published is not None and published.file_state == state:
+            return published  # Published by a flight that finished just before this one started
+        
+        file_hashes = hash_files(self.get_source_files())
+        if published is not None and published.manifest.file_hashes == file_hashes:
+            DATASET_REGISTRY.touch(self.dataset_name, state)
+            return published
+        return self._ingest(file_hashes, state)
+    
+    def _ingest(self, file_hashes: Dict[str, str], state) -> PublishedDataset:
+        """Read, validate and merge the files, then publish them as a new dataset version"""
+        NAME_NORMALIZER.reload()
+        df = pd.read_csv(self.data_file)
+        gdf = gpd.read_file(self.geometry_file)
+        
+        # Validate the raw file before process_data coerces bad values
+        validator = self.get_validator()
+        report = validator.validate(df, self.data_file)
+        df = self.process_data(df)
+        join_col = self.get_join_column()
+        
+        # Canonical names via the shared alias table (computed on unique values only)
+        join_columns = join_col if isinstance(join_col, list) else [join_col]
+        NAME_NORMALIZER.normalize_columns(df, join_columns + ['Province'])
+        NAME_NORMALIZER.normalize_columns(gdf, join_columns)
+        
+        if isinstance(join_col, list):
+            gdf = gdf[join_col + ['geometry']].drop_duplicates()
+            merged = df.merge(gdf, on=join_col, how='left')
+            
+            # Create sector display names for selection
+            if 'Sector' in merged.columns and 'District' in merged.columns:
+                merged['sector_display'] = merged['Sector'] + ' (' + merged['District'] + ')'
+                merged['sector_key'] = merged['Sector'] + '_' + merged['District']
+                options = sorted(merged['sector_display'].unique())
+            else:
+                options = []
+        else:
+            gdf = gdf[[join_col, 'geometry']].drop_duplicates()
+            merged = df.merge(gdf, on=join_col, how='left')
+            options = sorted(merged[join_col].unique()) if isinstance(join_col, str) else []
+        
+        validator.check_geometry_keys(report, df, gdf)
+        merged = gpd.GeoDataFrame(merged, geometry='geometry')
+        
+        manifest = DatasetManifest.build(self.dataset_name, file_hashes, merged, self.get_entity_key_column())
+        # Every cache keyed on dataset_fingerprint(merged) now keys on the dataset version
+        set_dataset_fingerprint(merged, manifest.fingerprint)
+        published = DATASET_REGISTRY.publish(PublishedDataset(manifest, merged, options, report, state))
+        
+        # SQL engines keep the fact table in an embedded database; rankings and period totals query it
+        engine = get_query_engine()
+        if engine != 'pandas' and published.data is merged:
+            register_query_backend(self.dataset_name, SQLQueryBackend.open(engine, merged, manifest.fingerprint))
+        check_published_consistency()
+        return published
 
 class MalariaDataLoader(BaseDataLoader):
     def __init__(self):
@@ -56,16 +177,26 @@ class MalariaDataLoader(BaseDataLoader):
     def get_join_column(self):
         return 'District'
     
+    def get_validator(self):
+        return DataValidator(
+            entity_columns=['District'],
+            count_columns=METRIC_REGISTRY.count_columns('Districts'),
+            rate_columns=METRIC_REGISTRY.rate_columns('Districts')
+        )
+    
     def process_data(self, df):
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Unparseable dates are reported by the validator and dropped here
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df = df.dropna(subset=['Date']).copy()
         df['year'] = df['Date'].dt.year.astype('int32')
         df['month'] = df['Date'].dt.month.astype('int32')
         df['month_name'] = df['Date'].dt.strftime('%B')
         
-        for col in ['Population', 'all cases', 'Severe cases/Deaths', 'all cases incidence', 'Severe cases/Deaths incidence']:
+        for col in METRIC_REGISTRY.source_columns('Districts'):
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        return df
+        # Rates are recomputed from their counts in one vectorized pass, whatever the file stored
+        return METRIC_REGISTRY.derive(df, 'Districts')
 
 class SectorDataLoader(BaseDataLoader):
     def __init__(self):
@@ -74,13 +205,29 @@ class SectorDataLoader(BaseDataLoader):
     def get_join_column(self):
         return ['District', 'Sector']
     
+    def get_entity_key_column(self):
+        return 'sector_display'
+    
+    def get_entity_name_column(self):
+        return 'Sector'
+    
+    def get_validator(self):
+        return DataValidator(
+            entity_columns=['District', 'Sector'],
+            count_columns=METRIC_REGISTRY.count_columns('Sectors'),
+            rate_columns=METRIC_REGISTRY.rate_columns('Sectors')
+        )
+    
     def process_data(self, df):
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Unparseable dates are reported by the validator and dropped here
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df = df.dropna(subset=['Date']).copy()
         df['year'] = df['Date'].dt.year.astype('int32')
         df['month'] = df['Date'].dt.month.astype('int32')
         df['month_name'] = df['Date'].dt.strftime('%B')
         
-        for col in ['Population', 'Simple malaria cases', 'incidence']:
+        for col in METRIC_REGISTRY.source_columns('Sectors'):
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        return df
\ No newline at end of file
+        # Rates are recomputed from their counts in one vectorized pass, whatever the file stored
+        return METRIC_REGISTRY.derive(df, 'Sectors')
\ No newline at end of file
@@ -0,0 +1,187 @@
+# data_validation.py - Vectorized schema and quality checks run while a dataset is ingested
+
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from name_normalization import NAME_NORMALIZER
+
+
+class DataValidationError(ValueError):
+    """Raised when a file cannot be used at all (e.g. required columns are missing)"""
+
+    def __init__(self, report: 'ValidationReport'):
+        super().__init__('; '.join(issue['message'] for issue in report.errors()))
+        self.report = report
+
+
+class ValidationReport:
+    """Result of one validation run - issue list plus per-month issue counts"""
+
+    def __init__(self, source: str, rows_checked: int):
+        self.source = source
+        self.rows_checked = rows_checked
+        self.issues: List[Dict[str, Any]] = []
+        self.by_month = pd.DataFrame()
+        self.elapsed_ms = 0.0
+
+    def add(self, check: str, count: int, message: str, severity: str = 'warning',
+            column: Optional[str] = None, examples: Optional[List[Any]] = None):
+        """Record an issue (zero counts are ignored)"""
+        if count:
+            self.issues.append({'check': check, 'severity': severity, 'column': column, 'count': int(count),
+                                'message': message, 'examples': list(examples or [])[:5]})
+
+    def errors(self) -> List[Dict[str, Any]]:
+        return [issue for issue in self.issues if issue['severity'] == 'error']
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.errors())
+
+    @property
+    def is_clean(self) -> bool:
+        return not self.issues
+
+    def count(self, check: str) -> int:
+        """Total affected rows/keys for one check"""
+        return sum(issue['count'] for issue in self.issues if issue['check'] == check)
+
+    def summary(self) -> Dict[str, int]:
+        """Affected rows/keys per check"""
+        totals: Dict[str, int] = {}
+        for issue in self.issues:
+            totals[issue['check']] = totals.get(issue['check'], 0) + issue['count']
+        return totals
+
+    def to_frame(self) -> pd.DataFrame:
+        """Issues as a table for display"""
+        frame = pd.DataFrame(self.issues, columns=['check', 'severity', 'column', 'count', 'message', 'examples'])
+        frame['examples'] = frame['examples'].map(lambda values: ', '.join(map(str, values)))
+        return frame
+
+
+class DataValidator:
+    """Schema and quality checks for a (entity x month) malaria file
+
+    Every row-level check is a boolean column in one mask frame, so the
+    per-month breakdown is a single groupby-sum over all checks.
+    """
+
+    def __init__(self, entity_columns: List[str], count_columns: List[str], rate_columns: Dict[str, str],
+                 date_column: str = 'Date', population_column: str = 'Population',
+                 rate_tolerance_pct: float = 1.0, rate_tolerance_abs: float = 0.01):
+        self.entity_columns = entity_columns
+        self.count_columns = count_columns
+        self.rate_columns = rate_columns
+        self.date_column = date_column
+        self.population_column = population_column
+        self.rate_tolerance_pct = rate_tolerance_pct
+        self.rate_tolerance_abs = rate_tolerance_abs
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        return list(dict.fromkeys(self.count_columns + [self.population_column] + list(self.rate_columns)))
+
+    @property
+    def required_columns(self) -> List[str]:
+        """Rate columns are optional - the loader derives them from their counts"""
+        return [self.date_column] + self.entity_columns + self.count_columns + [self.population_column]
+
+    def validate(self, raw: pd.DataFrame, source: str = '') -> ValidationReport:
+        """Check a raw file as read from disk (before coercion); does not modify it"""
+        start = time.perf_counter()
+        report = ValidationReport(source, len(raw))
+
+        missing = [col for col in self.required_columns if col not in raw.columns]
+        if missing:
+            report.add('missing_columns', len(missing), f"Missing required columns: {', '.join(missing)}",
+                       severity='error', examples=missing)
+            raise DataValidationError(report)
+
+        dates = pd.to_datetime(raw[self.date_column], errors='coerce')
+        numbers = {col: pd.to_numeric(raw[col], errors='coerce') for col in self.numeric_columns if col in raw.columns}
+        masks: Dict[str, np.ndarray] = {}
+
+        invalid_dates = dates.isna().to_numpy()
+        masks['invalid_date'] = invalid_dates
+        report.add('invalid_date', invalid_dates.sum(), f"Rows with an unparseable {self.date_column} (dropped from "
+                   "monthly views)", severity='error', column=self.date_column,
+                   examples=raw.loc[invalid_dates, self.date_column].head().tolist())
+
+        for col, values in numbers.items():
+            # Present but not numeric - process_data turns these into 0
+            coerced = (values.isna() & raw[col].notna()).to_numpy()
+            blank = raw[col].isna().to_numpy()
+            masks[f'coerced:{col}'] = coerced
+            masks[f'missing:{col}'] = blank
+            report.add('coerced_to_zero', coerced.sum(), f"Non-numeric '{col}' values coerced to 0", column=col,
+                       examples=raw.loc[coerced, col].head().tolist())
+            report.add('missing_value', blank.sum(), f"Blank '{col}' values filled with 0", column=col)
+
+        for col in self.count_columns + [self.population_column]:
+            negative = (numbers[col] < 0).to_numpy()
+            masks[f'negative:{col}'] = negative
+            report.add('negative_count', negative.sum(), f"Negative '{col}' values", severity='error', column=col,
+                       examples=numbers[col][negative].head().tolist())
+
+        zero_population = (numbers[self.population_column] <= 0).to_numpy()
+        masks['zero_population'] = zero_population
+        report.add('zero_population', zero_population.sum(), "Rows with zero population (incidence undefined)",
+                   column=self.population_column)
+
+        population = numbers[self.population_column].where(~zero_population)
+        for rate_col, count_col in self.rate_columns.items():
+            if rate_col not in numbers:
+                continue
+            expected = numbers[count_col] / population * 1000
+            reported = numbers[rate_col]
+            tolerance = np.maximum(self.rate_tolerance_abs, expected.abs() * self.rate_tolerance_pct / 100)
+            disagrees = ((reported - expected).abs() > tolerance).to_numpy()
+            masks[f'rate_mismatch:{rate_col}'] = disagrees
+            report.add('rate_mismatch', disagrees.sum(),
+                       f"'{rate_col}' differs from {count_col} / {self.population_column} x 1000 by more than "
+                       f"{self.rate_tolerance_pct:g}%", column=rate_col)
+
+        keys = NAME_NORMALIZER.normalize_columns(raw[self.entity_columns].copy(), self.entity_columns)
+        keys[self.date_column] = dates.dt.to_period('M')
+        duplicated = keys.duplicated(keep=False).to_numpy()
+        masks['duplicate_row'] = duplicated
+        report.add('duplicate_row', duplicated.sum(),
+                   f"Rows sharing the same ({', '.join(self.entity_columns)}, month)",
+                   severity='error', examples=self._key_examples(keys[duplicated]))
+
+        report.by_month = self._by_month(masks, dates)
+        report.elapsed_ms = (time.perf_counter() - start) * 1000
+        return report
+
+    def check_geometry_keys(self, report: ValidationReport, data: pd.DataFrame, geometries: pd.DataFrame) -> ValidationReport:
+        """Join keys present in only one of the data and the geometry file (after key normalization)"""
+        start = time.perf_counter()
+        data_keys = pd.MultiIndex.from_frame(data[self.entity_columns].drop_duplicates())
+        geometry_keys = pd.MultiIndex.from_frame(geometries[self.entity_columns].drop_duplicates())
+
+        without_geometry = data_keys[~data_keys.isin(geometry_keys)]
+        report.add('no_geometry', len(without_geometry), "Entities in the data with no matching geometry "
+                   "(not drawn on maps)", severity='warning', examples=self._key_examples(without_geometry.to_frame()))
+        without_data = geometry_keys[~geometry_keys.isin(data_keys)]
+        report.add('no_data', len(without_data), "Geometries with no matching rows in the data",
+                   severity='warning', examples=self._key_examples(without_data.to_frame()))
+        report.elapsed_ms += (time.perf_counter() - start) * 1000
+        return report
+
+    def _key_examples(self, keys: pd.DataFrame) -> List[str]:
+        return [' / '.join(map(str, row)) for row in keys.drop_duplicates().head().itertuples(index=False)]
+
+    def _by_month(self, masks: Dict[str, np.ndarray], dates: pd.Series) -> pd.DataFrame:
+        """Affected rows per (year, month) and check - one grouped sum for all checks"""
+        flags = pd.DataFrame(masks)
+        flags = flags.loc[:, flags.any()]
+        valid = dates.notna().to_numpy()
+        if flags.empty or not valid.any():
+            return pd.DataFrame()
+        flags = flags[valid]
+        by_month = flags.groupby([dates[valid].dt.year.rename('year'), dates[valid].dt.month.rename('month')]).sum()
+        return by_month[by_month.sum(axis=1) > 0]
@@ -0,0 +1,175 @@
+# dataset_manifest.py - Dataset versions (content hash manifests) and version-keyed cache invalidation
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from data_export import EXPORT_CACHE
+from view_cache import FIGURE_CACHE, TABLE_CACHE, LRUCache
+
+FileState = Tuple[Tuple[str, Optional[int], Optional[int]], ...]
+
+
+def file_state(paths: List[str]) -> FileState:
+    """(path, size, mtime) of each file - a cheap check for 'maybe changed' before hashing"""
+    state = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            state.append((path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            state.append((path, None, None))
+    return tuple(state)
+
+
+def hash_files(paths: List[str], block_size: int = 1 << 20) -> Dict[str, str]:
+    """SHA-256 of each existing file, read in blocks"""
+    hashes = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(block_size), b''):
+                digest.update(block)
+        hashes[path] = digest.hexdigest()
+    return hashes
+
+
+class DatasetManifest:
+    """Identity and shape of one dataset version
+
+    The content hash covers every file the loaded frame is derived from (data,
+    geometry, name aliases), so any edit to any of them is a new version.
+    """
+
+    def __init__(self, name: str, file_hashes: Dict[str, str], row_count: int, entity_count: int,
+                 date_min: Optional[str], date_max: Optional[str], built_at: str):
+        self.name = name
+        self.file_hashes = dict(file_hashes)
+        self.row_count = row_count
+        self.entity_count = entity_count
+        self.date_min = date_min
+        self.date_max = date_max
+        self.built_at = built_at
+        combined = hashlib.sha256()
+        for path in sorted(self.file_hashes):
+            combined.update(f"{os.path.basename(path)}={self.file_hashes[path]}\n".encode())
+        self.content_hash = combined.hexdigest()
+
+    @property
+    def version(self) -> str:
+        """Short content hash shown to users"""
+        return self.content_hash[:12]
+
+    @property
+    def fingerprint(self) -> str:
+        """Cache-key fingerprint of the loaded frame for this version"""
+        return f"{self.name}@{self.version}"
+
+    @classmethod
+    def build(cls, name: str, file_hashes: Dict[str, str], data: pd.DataFrame, entity_col: str,
+              date_col: str = 'Date') -> 'DatasetManifest':
+        """Describe a freshly ingested frame"""
+        dates = data[date_col] if date_col in data.columns else pd.Series(dtype='datetime64[ns]')
+        return cls(
+            name=name,
+            file_hashes=file_hashes,
+            row_count=len(data),
+            entity_count=int(data[entity_col].nunique()) if entity_col in data.columns else 0,
+            date_min=dates.min().strftime('%Y-%m') if len(dates) else None,
+            date_max=dates.max().strftime('%Y-%m') if len(dates) else None,
+            built_at=datetime.now(timezone.utc).isoformat(timespec='seconds')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name, 'version': self.version, 'content_hash': self.content_hash,
+            'files': self.file_hashes, 'row_count': self.row_count, 'entity_count': self.entity_count,
+            'date_min': self.date_min, 'date_max': self.date_max, 'built_at': self.built_at
+        }
+
+    def save(self, directory: str = 'data/cache/manifests') -> Optional[str]:
+        """Write <name>.json next to the other derived caches (best effort)"""
+        path = os.path.join(directory, f"{self.name}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'w') as handle:
+                json.dump(self.to_dict(), handle, indent=2)
+        except OSError:
+            return None  # Read-only deployments keep the manifest in memory only
+        return path
+
+
+class PublishedDataset:
+    """A loaded frame together with its manifest and ingest report"""
+
+    def __init__(self, manifest: DatasetManifest, data: Any, options: list, validation_report: Any,
+                 state: FileState):
+        self.manifest = manifest
+        self.data = data
+        self.options = options
+        self.validation_report = validation_report
+        self.file_state = state
+
+
+class DatasetRegistry:
+    """Current version of each dataset in this process
+
+    Publishing a new version swaps the registry entry and drops every cache
+    entry keyed on the previous version's fingerprint under one lock, so no
+    session can pick up the new frame while stale derived views are still
+    reachable. Content-keyed entries of derived frames are left alone: their
+    keys only ever match identical content.
+    """
+
+    def __init__(self, caches: List[LRUCache]):
+        self.caches = caches
+        self._datasets: Dict[str, PublishedDataset] = {}
+        self._callbacks: List[Callable[[DatasetManifest], None]] = []
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[PublishedDataset]:
+        return self._datasets.get(name)
+
+    def on_publish(self, callback: Callable[[DatasetManifest], None]):
+        """Run callback(new_manifest) whenever a dataset version changes (e.g. to clear st.cache_data)"""
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+    def publish(self, dataset: PublishedDataset) -> PublishedDataset:
+        """Make a dataset version current, invalidating caches of the version it replaces"""
+        name = dataset.manifest.name
+        with self._lock:
+            previous = self._datasets.get(name)
+            if previous is not None and previous.manifest.content_hash == dataset.manifest.content_hash:
+                # Same content (e.g. another session ingested concurrently) - keep the frame already in use
+                previous.file_state = dataset.file_state
+                return previous
+
+            self._datasets[name] = dataset
+            if previous is not None:
+                stale = previous.manifest.fingerprint
+                for cache in self.caches:
+                    cache.discard_where(lambda key: isinstance(key, tuple) and stale in key)
+                for callback in self._callbacks:
+                    callback(dataset.manifest)
+        dataset.manifest.save()
+        return dataset
+
+    def touch(self, name: str, state: FileState):
+        """Files were rewritten with identical content - remember the new state, keep the version"""
+        with self._lock:
+            if name in self._datasets:
+                self._datasets[name].file_state = state
+
+    def manifests(self) -> Dict[str, DatasetManifest]:
+        return {name: dataset.manifest for name, dataset in self._datasets.items()}
+
+
+DATASET_REGISTRY = DatasetRegistry([FIGURE_CACHE, TABLE_CACHE, EXPORT_CACHE])
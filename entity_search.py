@@ -0,0 +1,127 @@
+# entity_search.py - Prefix / fuzzy typeahead index over province, district and sector names
+
+import difflib
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+class EntitySearchIndex:
+    """Typeahead over entity keys with province -> district -> entity drill-down
+
+    Every word of an entity's own name, its district and its province goes
+    into one sorted term list, so a prefix lookup is two bisections instead
+    of a scan over every option. Misspellings fall back to difflib matching
+    against the (much smaller) set of distinct names.
+    """
+
+    # Ranking of a hit by where the query matched (lower is better)
+    EXACT, NAME_PREFIX, WORD_PREFIX, PARENT_PREFIX, FUZZY = range(5)
+
+    def __init__(self, data: pd.DataFrame, key_col: str, name_col: str,
+                 district_col: Optional[str] = 'District', province_col: Optional[str] = 'Province'):
+        columns = [col for col in dict.fromkeys([key_col, name_col, district_col, province_col]) if col]
+        entities = pd.DataFrame(data[columns]).drop_duplicates(key_col).sort_values(key_col)
+
+        self.keys: List[str] = entities[key_col].astype(str).tolist()
+        self.names: List[str] = entities[name_col].astype(str).tolist()
+        self.districts: List[str] = self._column(entities, district_col)
+        self.provinces: List[str] = self._column(entities, province_col)
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+
+        # Hierarchy for drill-down
+        self._children: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, (province, district) in enumerate(zip(self.provinces, self.districts)):
+            self._children[(province, '')].append(i)
+            self._children[(province, district)].append(i)
+            self._children[('', district)].append(i)
+
+        self._terms, self._names_by_normal = self._build_terms()
+
+    def _column(self, entities: pd.DataFrame, col: Optional[str]) -> List[str]:
+        return entities[col].fillna('').astype(str).tolist() if col and col in entities.columns else [''] * len(entities)
+
+    def _build_terms(self) -> Tuple[List[Tuple[str, int, int]], Dict[str, List[int]]]:
+        """Sorted (term, rank, entity) triples plus a normalized-name lookup for fuzzy matching"""
+        terms = []
+        names_by_normal: Dict[str, List[int]] = defaultdict(list)
+        for i, (name, district, province) in enumerate(zip(self.names, self.districts, self.provinces)):
+            normal = normalize_name(name)
+            names_by_normal[normal].append(i)
+            terms.append((normal, self.NAME_PREFIX, i))
+            terms.extend((word, self.WORD_PREFIX, i) for word in normal.split()[1:])
+            for parent in {normalize_name(district), normalize_name(province)} - {'', normal}:
+                names_by_normal[parent].append(i)
+                terms.append((parent, self.PARENT_PREFIX, i))
+        terms.sort()
+        return terms, dict(names_by_normal)
+
+    # === SEARCH ===
+
+    def _prefix_hits(self, prefix: str) -> Dict[int, int]:
+        """Best rank per entity among terms starting with prefix"""
+        hits: Dict[int, int] = {}
+        start = bisect_left(self._terms, (prefix,))
+        end = bisect_left(self._terms, (prefix + '\uffff',))
+        for term, rank, entity in self._terms[start:end]:
+            if rank == self.NAME_PREFIX and term == prefix:
+                rank = self.EXACT
+            hits[entity] = min(rank, hits.get(entity, rank))
+        return hits
+
+    def _fuzzy_hits(self, query: str, limit: int) -> Dict[int, int]:
+        """Entities whose own, district or province name is close to the query"""
+        hits: Dict[int, int] = {}
+        for name in difflib.get_close_matches(query, self._names_by_normal.keys(), n=limit, cutoff=0.7):
+            for entity in self._names_by_normal[name]:
+                hits.setdefault(entity, self.FUZZY)
+        return hits
+
+    def search(self, query: str, province: Optional[str] = None, district: Optional[str] = None,
+               limit: int = 50) -> List[str]:
+        """Entity keys matching a query within an optional province/district, best matches first"""
+        scope = self._scope(province, district)
+        query = normalize_name(query)
+        if not query:
+            return [self.keys[i] for i in scope[:limit]]
+
+        hits = self._prefix_hits(query)
+        if len(hits) < limit:
+            for entity, rank in self._fuzzy_hits(query, limit).items():
+                hits.setdefault(entity, rank)
+
+        in_scope = set(scope)
+        ranked = sorted((rank, self.keys[i]) for i, rank in hits.items() if i in in_scope)
+        return [key for _, key in ranked[:limit]]
+
+    # === DRILL-DOWN ===
+
+    def _scope(self, province: Optional[str], district: Optional[str]) -> List[int]:
+        if province or district:
+            return self._children.get((province or '', district or ''), [])
+        return list(range(len(self.keys)))
+
+    def get_provinces(self) -> List[str]:
+        """Distinct provinces, sorted"""
+        return sorted({province for province in self.provinces if province})
+
+    def get_districts(self, province: Optional[str] = None) -> List[str]:
+        """Distinct districts, optionally within a province"""
+        return sorted({self.districts[i] for i in self._scope(province, None) if self.districts[i]})
+
+    def get_entities(self, province: Optional[str] = None, district: Optional[str] = None) -> List[str]:
+        """Entity keys under a province and/or district"""
+        return [self.keys[i] for i in self._scope(province, district)]
+
+    def __len__(self) -> int:
+        return len(self.keys)
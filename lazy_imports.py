@@ -0,0 +1,43 @@
+# lazy_imports.py - Defer heavy third-party imports until the code path that needs them runs
+
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Module stand-in that imports the real module on first attribute access
+
+    Resolution goes through importlib.import_module, which holds the import
+    lock, so builder threads touching a lazy module at the same time are safe
+    (unlike importlib.util.LazyLoader on Python < 3.12).
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = name
+
+    def _load(self) -> ModuleType:
+        module = importlib.import_module(self.__dict__['_lazy_target'])
+        # Later attribute lookups skip __getattr__ entirely
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return the module if it is already imported, otherwise a proxy that imports it when first used"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """Whether a module has actually been imported (for import-time checks)"""
+    return name in sys.modules
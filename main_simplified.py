@@ -1,18 +1,39 @@
+from __future__ import annotations
+
 import streamlit as st
-import geopandas as gpd
+import numpy as np
 import pandas as pd
-from typing import List, Tuple, Dict, Any
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import geopandas as gpd
 
 # Import custom modules
-from data_loader import MalariaDataLoader, SectorDataLoader
+from consistency_checks import CONSISTENCY_CHECKER
+from data_loader import INGEST_FLIGHTS, MalariaDataLoader, SectorDataLoader
+from metric_registry import METRIC_REGISTRY, Metric
 from metrics_calculator import MetricsCalculator
 from map_visualizations import MapVisualizations
 from chart_visualizations import ChartVisualizations
 from dashboard_styling import DashboardStyling
+from data_export import EXPORT_CACHE, EXPORT_FORMATS, get_export_file_name, get_export_formats
+from hotspot_analysis import HotspotAnalyzer
+from parallel_tasks import run_in_background, run_parallel
+from query_backends import get_query_engine
+from range_queries import PERIOD_TYPES, format_period_span, resolve_period
+from utils import get_figure_payload_size, format_bytes, format_markdown_table
+from view_cache import FIGURE_CACHE, TABLE_CACHE
+from warmup import start_warmup
+
+# Regions whose widgets only affect themselves rerun on their own (no-op before Streamlit 1.33)
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
 
 class SimplifiedDashboard:
     """Simplified main dashboard - clean and focused"""
     
+    # Longest trend series drawn with lean figures (LTTB keeps the peaks)
+    LEAN_TREND_POINTS = 48
+    
     def __init__(self):
         # Initialize data loaders
         self.district_loader = MalariaDataLoader()
@@ -51,6 +72,13 @@ class SimplifiedDashboard:
         )
         st.session_state.admin_level = admin_level
         
+        # Compact figure payloads for slow connections
+        st.sidebar.checkbox(
+            "⚡ Lean figures",
+            key='lean_figures',
+            help="Smaller map and chart payloads with simplified hover info - faster on slow connections"
+        )
+        
         st.sidebar.markdown("---")
         
         # Navigation menu - Only Dashboard and Trends
@@ -79,6 +107,10 @@ class SimplifiedDashboard:
                 st.session_state.current_page = page_key
                 st.rerun()
     
+    def _get_active_loader(self):
+        """Get the data loader for the selected admin level"""
+        return self.district_loader if st.session_state.admin_level == 'districts' else self.sector_loader
+    
     def load_data(self) -> Tuple[gpd.GeoDataFrame, List[str], str]:
         """Load data based on selected admin level"""
         if st.session_state.admin_level == 'districts':
@@ -94,6 +126,54 @@ class SimplifiedDashboard:
         
         return data, entity_options, display_type
     
+    def render_data_quality(self):
+        """Render the ingest validation report for the active level in the sidebar"""
+        loader = self._get_active_loader()
+        report = loader.validation_report
+        if report is None:
+            return
+        
+        st.sidebar.markdown("---")
+        status = "✅" if report.is_clean else ("❌" if report.has_errors else "⚠️")
+        with st.sidebar.expander(f"{status} Data quality"):
+            manifest = loader.get_manifest()
+            if manifest is not None:
+                st.caption(f"Dataset version `{manifest.version}` · {manifest.row_count:,} rows · "
+                           f"{manifest.entity_count} {st.session_state.admin_level} · "
+                           f"{manifest.date_min} to {manifest.date_max} · built {manifest.built_at} · "
+                           f"{get_query_engine()} query engine")
+            st.caption(f"{report.rows_checked:,} rows checked in {report.elapsed_ms:.0f} ms · "
+                       f"warm-up {start_warmup().summary()}")
+            consistency = CONSISTENCY_CHECKER.summary()
+            if consistency['months_checked']:
+                st.caption(f"Sector vs district totals: {consistency['discrepancies']:,} of "
+                           f"{consistency['district_months']:,} district-months differ "
+                           f"({consistency['cases_exceed_district']:,} sector cases above district, "
+                           f"{consistency['population_mismatch']:,} population mismatches)")
+            if report.is_clean:
+                st.markdown("No issues found.")
+                return
+            for check, count in report.summary().items():
+                st.markdown(f"- **{check.replace('_', ' ').capitalize()}**: {count:,}")
+            st.markdown(format_markdown_table(report.to_frame()[['severity', 'column', 'count', 'message', 'examples']],
+                                              index=False))
+            if not report.by_month.empty:
+                st.markdown("**Affected rows by month**")
+                st.markdown(format_markdown_table(report.by_month))
+    
+    def render_cache_stats(self):
+        """Render shared cache hit rates and single-flight contention counters in the sidebar"""
+        with st.sidebar.expander("⚙️ Cache statistics"):
+            caches = {'Figures': FIGURE_CACHE, 'Tables': TABLE_CACHE, 'Exports': EXPORT_CACHE}
+            stats = pd.DataFrame({name: cache.stats() for name, cache in caches.items()}).T
+            stats['hit_rate'] = (stats['hit_rate'].astype(float) * 100).round(1)
+            # Markdown, not st.dataframe - a broken pyarrow install must not take down the page
+            st.markdown(format_markdown_table(stats[['entries', 'hits', 'misses', 'hit_rate', 'in_flight', 'coalesced',
+                                                     'max_waiters', 'wait_seconds']]))
+            ingest = INGEST_FLIGHTS.stats()
+            st.caption(f"Dataset ingests: {ingest['computations']} run, {ingest['coalesced']} joined by waiting "
+                       f"sessions ({ingest['wait_seconds']:.1f} s waited)")
+    
     def setup_components(self, data: gpd.GeoDataFrame) -> Dict[str, Any]:
         """Setup dashboard components"""
         display_type = "Districts" if st.session_state.admin_level == "districts" else "Sectors"
@@ -107,11 +187,11 @@ class SimplifiedDashboard:
         
         return components
     
-    def render_global_filters(self, data: gpd.GeoDataFrame) -> Tuple[int, int, str, Dict]:
+    def render_global_filters(self, data: gpd.GeoDataFrame) -> Tuple[int, int, str, Dict, str]:
         """Render global filters"""
         st.markdown("## Filters")
         
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col4, col3 = st.columns(4)
         
         with col1:
             available_years = sorted(data['year'].unique(), reverse=True)
@@ -137,6 +217,15 @@ class SimplifiedDashboard:
                 key=f"month_{st.session_state.admin_level}_{st.session_state.current_page}"
             )
         
+        with col4:
+            # Window containing the selected month - totals come from the prefix-sum range index
+            period_type = st.selectbox(
+                "Period",
+                list(PERIOD_TYPES.keys()),
+                format_func=lambda x: PERIOD_TYPES[x],
+                key=f"period_{st.session_state.admin_level}_{st.session_state.current_page}"
+            )
+        
         with col3:
             # Auto-detect available metrics for current admin level
             metric_options = self._get_available_metrics(data)
@@ -166,6 +255,7 @@ class SimplifiedDashboard:
         st.session_state[f'dashboard_month_{st.session_state.admin_level}'] = selected_month
         st.session_state[f'dashboard_metric_{st.session_state.admin_level}'] = selected_metric
         st.session_state[f'dashboard_metric_options_{st.session_state.admin_level}'] = metric_options
+        st.session_state[f'dashboard_period_{st.session_state.admin_level}'] = period_type
         
         # Also store general ones for backward compatibility
         st.session_state.dashboard_year = selected_year
@@ -175,25 +265,11 @@ class SimplifiedDashboard:
         
         st.markdown("---")
         
-        return selected_year, selected_month, selected_metric, metric_options
+        return selected_year, selected_month, selected_metric, metric_options, period_type
     
     def _get_available_metrics(self, data: gpd.GeoDataFrame) -> Dict[str, str]:
         """Get available metrics from data"""
-        columns = data.columns.tolist()
-        
-        if 'all cases' in columns and 'Severe cases/Deaths' in columns:
-            return {
-                "all cases": "Total Cases",
-                "Severe cases/Deaths": "Severe Cases/Deaths", 
-                "all cases incidence": "Cases Incidence Rate"
-            }
-        elif 'Simple malaria cases' in columns:
-            return {
-                "Simple malaria cases": "Simple Malaria Cases",
-                "incidence": "Incidence Rate"
-            }
-        else:
-            return {"Population": "Population"}
+        return MetricsCalculator.get_dashboard_metric_options(data)
     
     def render_page(self, data: gpd.GeoDataFrame, entity_options: List[str], components: Dict[str, Any]):
         """Render the selected page"""
@@ -210,7 +286,18 @@ class SimplifiedDashboard:
         st.markdown(f"Geographic analysis and overview across Rwanda's {st.session_state.admin_level}")
         
         # Global filters
-        selected_year, selected_month, selected_metric, metric_options = self.render_global_filters(data)
+        selected_year, selected_month, selected_metric, metric_options, period_type = self.render_global_filters(data)
+        
+        # Multi-month periods are summed into one row per entity, stamped as the selected month
+        period_data, period_label = components['metrics_calculator'].get_period_data(
+            data, period_type, selected_year, selected_month
+        )
+        source_data = data
+        period_start, period_end, _ = resolve_period(period_type, selected_year, selected_month)
+        self._render_export_controls(source_data, period_start, period_end, [selected_metric])
+        if period_type != 'month':
+            st.caption(f"Showing totals for {period_label}, compared with the preceding period of equal length")
+            data = period_data
         
         # Current data
         current_data = data[(data['year'] == selected_year) & (data['month'] == selected_month)]
@@ -219,8 +306,24 @@ class SimplifiedDashboard:
             st.error("No data available for the selected period.")
             return
         
+        # The default map layer is built with the rank table and chart; other layers by the map fragment
+        lean = st.session_state.get('lean_figures', False)
+        map_layer = st.session_state.get(f"map_layer_{st.session_state.admin_level}", 'values')
+        loader = self._get_active_loader()
+        
+        tasks = {
+            'rank_table': lambda: components['metrics_calculator'].get_rank_table(data),
+            'chart': lambda: components['chart_viz'].create_top_entities_chart(
+                data, selected_year, selected_month, selected_metric, lean=lean,
+                period_label=period_label if period_type != 'month' else None
+            ),
+            'map': lambda: self._build_map(components, loader, data, source_data, selected_year, selected_month,
+                                           selected_metric, map_layer, lean)
+        }
+        figures = run_parallel(tasks)
+        
         # Overview cards
-        self._render_overview_cards(current_data, data, selected_year, selected_month)
+        self._render_overview_cards(current_data, data, selected_year, selected_month, figures['rank_table'])
         
         st.markdown("---")
         
@@ -229,13 +332,49 @@ class SimplifiedDashboard:
         
         with col1:
             st.markdown(f"### Geographic Distribution - {metric_options[selected_metric]}")
-            map_fig = components['map_viz'].create_choropleth_map(data, selected_year, selected_month, selected_metric)
-            st.plotly_chart(map_fig, use_container_width=True)
+            self._render_map_fragment(components, data, source_data, selected_year, selected_month, selected_metric,
+                                      lean, (map_layer, figures['map']))
         
         with col2:
             st.markdown(f"### Top 10 {components['display_type']}")
-            chart_fig = components['chart_viz'].create_top_entities_chart(data, selected_year, selected_month, selected_metric)
-            st.plotly_chart(chart_fig, use_container_width=True)
+            st.plotly_chart(figures['chart'], use_container_width=True)
+            if lean:
+                st.caption(f"Chart payload: {format_bytes(get_figure_payload_size(figures['chart']))}")
+    
+    def _build_map(self, components: Dict[str, Any], loader, data: gpd.GeoDataFrame, source_data: gpd.GeoDataFrame,
+                   year: int, month: int, metric: str, map_layer: str, lean: bool):
+        """Build the choropleth or hotspot map (no Streamlit calls - safe on the figure pool)"""
+        if map_layer == 'hotspots':
+            spatial_index = loader.get_spatial_index(source_data)
+            return components['map_viz'].create_hotspot_map(data, year, month, metric, spatial_index)
+        return components['map_viz'].create_choropleth_map(data, year, month, metric, lean=lean)
+    
+    @fragment
+    def _render_map_fragment(self, components: Dict[str, Any], data: gpd.GeoDataFrame, source_data: gpd.GeoDataFrame,
+                             year: int, month: int, metric: str, lean: bool, prebuilt: Tuple[str, Any]):
+        """Render the map layer switch and map - switching layers reruns only this region"""
+        map_layer = st.radio(
+            "Map layer",
+            ['values', 'hotspots'],
+            format_func=lambda x: 'Values' if x == 'values' else 'Hotspots (Gi*)',
+            horizontal=True,
+            label_visibility='collapsed',
+            key=f"map_layer_{st.session_state.admin_level}"
+        )
+        
+        # The page prebuilt the layer selected when it ran; fragment reruns build the other one
+        prebuilt_layer, map_fig = prebuilt
+        if map_layer != prebuilt_layer:
+            map_fig = self._build_map(components, self._get_active_loader(), data, source_data, year, month, metric,
+                                      map_layer, lean)
+        
+        if map_layer == 'hotspots':
+            st.caption(f"Getis-Ord Gi* hot and cold spots (p ≤ {HotspotAnalyzer.SIGNIFICANCE:g}, "
+                       f"{HotspotAnalyzer.PERMUTATIONS} permutations) among neighbouring "
+                       f"{st.session_state.admin_level}")
+        st.plotly_chart(map_fig, use_container_width=True)
+        if lean:
+            st.caption(f"Map payload: {format_bytes(get_figure_payload_size(map_fig))}")
     
     def _render_trends_page(self, data: gpd.GeoDataFrame, entity_options: List[str], components: Dict[str, Any]):
         """Render trends page"""
@@ -251,42 +390,41 @@ class SimplifiedDashboard:
             selected_metric = st.session_state[f'dashboard_metric_{st.session_state.admin_level}']
             selected_year = st.session_state[f'dashboard_year_{st.session_state.admin_level}']
             selected_month = st.session_state[f'dashboard_month_{st.session_state.admin_level}']
+            period_type = st.session_state.get(f'dashboard_period_{st.session_state.admin_level}', 'month')
         else:
             # Use defaults if stored metric doesn't exist for current admin level
             selected_year = data['year'].max()
             selected_month = data[data['year'] == selected_year]['month'].max()
             selected_metric = list(available_metrics.keys())[0]
+            period_type = 'month'
+        
+        # The scatterplot only depends on the stored filters - build it while the trend region renders
+        def build_scatterplot():
+            period_data, period_label = components['metrics_calculator'].get_period_data(
+                data, period_type, selected_year, selected_month
+            )
+            current_data = period_data[(period_data['year'] == selected_year) & (period_data['month'] == selected_month)]
+            if current_data.empty:
+                return None, period_label
+            return components['chart_viz'].create_scatterplot(period_data, selected_year, selected_month)[0], period_label
+        
+        scatterplot = run_in_background(build_scatterplot)
         
         # Two-column layout with better proportions
         col1, col2 = st.columns([1.2, 0.8])
         
         with col1:
             st.markdown("### Historical Trends")
-            
-            # Entity selection
-            default_entities = entity_options[:3] if entity_options else []
-            selected_entities = st.multiselect(
-                f"Select {components['display_type']} (max 5)",
-                entity_options,
-                default=default_entities,
-                max_selections=5,
-                key=f"trend_entities_{st.session_state.admin_level}"
-            )
-            
-            if selected_entities:
-                trend_fig = components['chart_viz'].create_trend_chart(data, selected_entities, selected_metric)
-                if trend_fig:
-                    st.plotly_chart(trend_fig, use_container_width=True)
-            else:
-                st.info(f"Please select {components['display_type'].lower()} to view trends")
+            self._render_trend_fragment(data, entity_options, components, selected_metric)
         
         with col2:
             st.markdown("### Priority Analysis")
             
-            current_data = data[(data['year'] == selected_year) & (data['month'] == selected_month)]
+            scatterplot_fig, period_label = scatterplot.result()
             
-            if not current_data.empty:
-                scatterplot_fig, _, _ = components['chart_viz'].create_scatterplot(data, selected_year, selected_month)
+            if scatterplot_fig is not None:
+                if period_type != 'month':
+                    st.caption(f"Totals for {period_label}")
                 if scatterplot_fig:
                     st.plotly_chart(scatterplot_fig, use_container_width=True)
                     
@@ -308,10 +446,90 @@ class SimplifiedDashboard:
                         - **Bottom Right**: High cases + Low severity → Enhance treatment
                         """)
     
-    def _render_overview_cards(self, current_data: gpd.GeoDataFrame, all_data: gpd.GeoDataFrame, year: int, month: int):
-        """Render overview metric cards with new 3-box design"""
-        from utils import get_month_name
+    @fragment
+    def _render_trend_fragment(self, data: gpd.GeoDataFrame, entity_options: List[str], components: Dict[str, Any],
+                               selected_metric: str):
+        """Render entity search, selection, trend chart and its export - selection changes rerun only this region"""
+        # Entity selection - options are search matches, not the full entity list
+        default_entities = entity_options[:3] if entity_options else []
+        candidates = self._render_entity_search(data, components)
+        entities_key = f"trend_entities_{st.session_state.admin_level}"
+        current_selection = st.session_state.get(entities_key, default_entities)
+        # The defaults only seed the first run - afterwards they may have been deselected and searched away
+        selected_entities = st.multiselect(
+            f"Select {components['display_type']} (max 5)",
+            list(dict.fromkeys(current_selection + candidates)),
+            default=None if entities_key in st.session_state else default_entities,
+            max_selections=5,
+            key=entities_key
+        )
+        
+        if not selected_entities:
+            st.info(f"Please select {components['display_type'].lower()} to view trends")
+            return
+        
+        # Lean figures also thin long series down to a few points per year of history
+        max_points = self.LEAN_TREND_POINTS if st.session_state.get('lean_figures', False) else None
+        trend_fig = components['chart_viz'].create_trend_chart(data, selected_entities, selected_metric, max_points)
+        if trend_fig:
+            st.plotly_chart(trend_fig, use_container_width=True)
+        
+        # Full history of the selected entities, as plotted
+        history_start = (int(data['year'].min()), int(data[data['year'] == data['year'].min()]['month'].min()))
+        history_end = (int(data['year'].max()), int(data[data['year'] == data['year'].max()]['month'].max()))
+        self._render_export_controls(data, history_start, history_end, [selected_metric], selected_entities)
+    
+    def _render_entity_search(self, data: gpd.GeoDataFrame, components: Dict[str, Any], limit: int = 50) -> List[str]:
+        """Render search box and province/district drill-down, returning matching entity keys"""
+        level = st.session_state.admin_level
+        search_index = self._get_active_loader().get_search_index(data)
+        
+        search_col, province_col, district_col = st.columns([2, 1, 1])
+        with search_col:
+            query = st.text_input(
+                f"Search {components['display_type'].lower()}",
+                placeholder="Name, district or province",
+                key=f"entity_search_{level}"
+            )
+        with province_col:
+            province = st.selectbox("Province", ['All'] + search_index.get_provinces(), key=f"entity_province_{level}")
+            province = None if province == 'All' else province
+        district = None
+        if level == 'sectors':
+            with district_col:
+                district = st.selectbox("District", ['All'] + search_index.get_districts(province),
+                                        key=f"entity_district_{level}")
+                district = None if district == 'All' else district
+        
+        return search_index.search(query, province, district, limit=limit)
+    
+    @fragment
+    def _render_export_controls(self, data: gpd.GeoDataFrame, start: Tuple[int, int], end: Tuple[int, int],
+                                metrics: List[str], entities: Optional[List[str]] = None):
+        """Render the export format picker and a download button for the current selection"""
+        level = st.session_state.admin_level
+        page = st.session_state.current_page
         
+        with st.expander("⬇️ Export selection"):
+            formats = get_export_formats(data)
+            fmt = st.selectbox("Format", list(formats.keys()), format_func=lambda x: formats[x],
+                               key=f"export_format_{level}_{page}")
+            exporter = self._get_active_loader().get_exporter(data)
+            
+            # Encoded in chunks on click, then served by Streamlit from memory (repeat exports come from the cache)
+            st.download_button(
+                f"Download {formats[fmt]}",
+                data=lambda: exporter.open(fmt, start, end, metrics, entities),
+                file_name=get_export_file_name(level, fmt, start, end),
+                mime=EXPORT_FORMATS[fmt][1],
+                key=f"export_download_{level}_{page}"
+            )
+            scope = f"{len(entities)} selected {level}" if entities else f"all {level}"
+            st.caption(f"{scope}, {format_period_span(start, end)}")
+    
+    def _render_overview_cards(self, current_data: gpd.GeoDataFrame, all_data: gpd.GeoDataFrame, year: int, month: int,
+                               rank_table):
+        """Render overview metric cards with new 3-box design"""
         # Get previous month for comparison
         if month == 1:
             prev_month, prev_year = 12, year - 1
@@ -322,313 +540,75 @@ class SimplifiedDashboard:
         
         # Get current selected metric from session state
         selected_metric = getattr(st.session_state, 'dashboard_metric', None)
+        if selected_metric not in rank_table.metrics:
+            selected_metric = rank_table.metrics[0]
+        
+        # Top movers are slices of the precomputed per-period rankings
+        top_increases = rank_table.top(year, month, selected_metric, 3, by='change')
+        top_decreases = rank_table.top(year, month, selected_metric, 3, by='change', ascending=True)
         
         # Three columns layout
         col1, col2, col3 = st.columns([1, 1, 1])
         
-        if st.session_state.admin_level == 'districts':
-            self._render_district_overview_cards(col1, col2, col3, current_data, prev_data, selected_metric, year, month)
-        else:
-            self._render_sector_overview_cards(col1, col2, col3, current_data, prev_data, selected_metric, year, month)
-
-    def _render_district_overview_cards(self, col1, col2, col3, current_data, prev_data, selected_metric, year, month):
-        """Render district overview cards"""
-        
-        # Calculate current metrics
-        current_total_cases = current_data['all cases'].sum()
-        current_incidence = current_data['all cases incidence'].mean()
-        
-        # Calculate previous metrics
-        prev_total_cases = prev_data['all cases'].sum() if not prev_data.empty else current_total_cases
-        prev_incidence = prev_data['all cases incidence'].mean() if not prev_data.empty else current_incidence
-        
-        # Calculate changes
-        cases_change = current_total_cases - prev_total_cases
-        incidence_change = current_incidence - prev_incidence
-        
-        # Calculate district-level changes for ranking
-        district_changes = []
-        for district in current_data['District'].unique():
-            current_district = current_data[current_data['District'] == district]
-            prev_district = prev_data[prev_data['District'] == district] if not prev_data.empty else pd.DataFrame()
-            
-            if not current_district.empty:
-                try:
-                    if selected_metric == 'all cases incidence':
-                        current_val = current_district['all cases incidence'].iloc[0]
-                        prev_val = prev_district['all cases incidence'].iloc[0] if not prev_district.empty else current_val
-                        change = current_val - prev_val
-                        change_pct = ((change / prev_val) * 100) if prev_val > 0 else 0
-                        metric_name = "case/1000"
-                        current_display = f"{current_val:.1f}"
-                    elif selected_metric == 'Severe cases/Deaths incidence':
-                        current_val = current_district['Severe cases/Deaths incidence'].iloc[0]
-                        prev_val = prev_district['Severe cases/Deaths incidence'].iloc[0] if not prev_district.empty else current_val
-                        change = current_val - prev_val
-                        change_pct = ((change / prev_val) * 100) if prev_val > 0 else 0
-                        metric_name = "case/1000"
-                        current_display = f"{current_val:.1f}"
-                    elif selected_metric == 'Severe cases/Deaths':
-                        current_val = current_district['Severe cases/Deaths'].iloc[0]
-                        prev_val = prev_district['Severe cases/Deaths'].iloc[0] if not prev_district.empty else current_val
-                        change = current_val - prev_val
-                        change_pct = ((change / prev_val) * 100) if prev_val > 0 else 0
-                        metric_name = "severe cases"
-                        current_display = f"{int(current_val)}"
-                    else:  # Default to 'all cases'
-                        current_val = current_district['all cases'].iloc[0]
-                        prev_val = prev_district['all cases'].iloc[0] if not prev_district.empty else current_val
-                        change = current_val - prev_val
-                        change_pct = ((change / prev_val) * 100) if prev_val > 0 else 0
-                        metric_name = "cases"
-                        current_display = f"{int(current_val)}"
-                    
-                    district_changes.append({
-                        'District': district,
-                        'change': change,
-                        'change_pct': change_pct,
-                        'metric_name': metric_name,
-                        'current_display': current_display
-                    })
-                except (KeyError, IndexError, ValueError) as e:
-                    # Skip districts with missing data
-                    continued({
-                    'District': district,
-                    'change': change,
-                    'change_pct': change_pct,
-                    'metric_name': metric_name,
-                    'current_display': current_display
-                })
-        
-        df_changes = pd.DataFrame(district_changes)
-        
-        # Column 1: Current Metrics
-        with col1:
-            st.markdown("###  CURRENT METRICS")
-            
-            st.metric(
-                label="Total Cases",
-                value=f"{int(current_total_cases):,}",
-                delta=f"{cases_change:+,.0f}",
-                delta_color="inverse"
-            )
-            
-            st.metric(
-                label="Average Incidence",
-                value=f"{current_incidence:.1f}",
-                delta=f"{incidence_change:+.1f}",
-                delta_color="inverse"
-            )
+        # Headline case count of the level and the incidence derived from it
+        level = st.session_state.admin_level.title()
+        cases = next(metric for metric in METRIC_REGISTRY.selectable(level) if not metric.is_derived)
+        incidence = next(metric for metric in METRIC_REGISTRY.metrics(level) if metric.numerator == cases.column)
+        self._render_current_metrics_card(col1, current_data, prev_data, cases, incidence, "CURRENT METRICS")
+        entity_label = 'district' if st.session_state.admin_level == 'districts' else 'sector'
         
         # Column 2: Highest Increases
         with col2:
-            st.markdown("###  HIGHEST INCREASES")
-            
-            if not df_changes.empty:
-                top_increases = df_changes.nlargest(3, 'change')  # Sort by raw change, not percentage
-                
-                if top_increases.empty:
-                    st.info("No increase data available for selected metric")
-                else:
-                    for _, row in top_increases.iterrows():
-                        # FIXED: Use actual change value, not percentage for color logic
-                        change_val = row['change']
-                        bg_color = 'rgba(220, 53, 69, 0.3)' if change_val > 0 else 'rgba(40, 167, 69, 0.3)'
-                        
-                        st.markdown(f"""
-                        <div style="
-                            background: {bg_color};
-                            padding: 1.2rem;
-                            border-radius: 10px;
-                            margin-bottom: 0.5rem;
-                            display: flex;
-                            justify-content: space-between;
-                            align-items: center;
-                        ">
-                            <strong style="flex: 1; color: white; font-size: 18px;">{row['District']}</strong>
-                            <span style="color: white; text-align: right; font-size: 17px;">
-                                {row['current_display']} {row['metric_name']} ({row['change']:+,.0f})
-                            </span>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.info("No district data available to display increases")
+            self._render_top_movers(top_increases, rank_table.entity_col, selected_metric, "HIGHEST INCREASES",
+                                    f"No {entity_label} data available to display increases", increases=True)
         
         # Column 3: Biggest Decreases
         with col3:
-            st.markdown("### BIGGEST DECREASES")
-            
-            if not df_changes.empty:
-                top_decreases = df_changes.nsmallest(3, 'change')  # Sort by raw change, not percentage
-                
-                if top_decreases.empty:
-                    st.info("No decrease data available for selected metric")
-                else:
-                    for _, row in top_decreases.iterrows():
-                        # FIXED: Use actual change value, not percentage for color logic  
-                        change_val = row['change']
-                        bg_color = 'rgba(40, 167, 69, 0.3)' if change_val < 0 else 'rgba(220, 53, 69, 0.3)'
-                        
-                        st.markdown(f"""
-                        <div style="
-                            background: {bg_color};
-                            padding: 1.2rem;
-                            border-radius: 10px;
-                            margin-bottom: 0.5rem;
-                            display: flex;
-                            justify-content: space-between;
-                            align-items: center;
-                        ">
-                            <strong style="flex: 1; color: white; font-size: 18px;">{row['District']}</strong>
-                            <span style="color: white; text-align: right; font-size: 17px;">
-                                {row['current_display']} {row['metric_name']} ({row['change']:+,.0f})
-                            </span>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.info("No district data available to display decreases")
-
-    def _render_sector_overview_cards(self, col1, col2, col3, current_data, prev_data, selected_metric, year, month):
-        """Render sector overview cards"""
-        
-        # Calculate current metrics
-        current_simple_cases = current_data['Simple malaria cases'].sum()
-        current_incidence = current_data['incidence'].mean()
-        
-        # Calculate previous metrics
-        prev_simple_cases = prev_data['Simple malaria cases'].sum() if not prev_data.empty else current_simple_cases
-        prev_incidence = prev_data['incidence'].mean() if not prev_data.empty else current_incidence
-        
-        # Calculate changes
-        simple_cases_change = current_simple_cases - prev_simple_cases
-        incidence_change = current_incidence - prev_incidence
-        
-        # Calculate sector-level changes for ranking
-        sector_changes = []
-        for _, sector_row in current_data.iterrows():
-            sector_name = sector_row.get('sector_display', sector_row.get('Sector', 'Unknown'))
-            sector_key = sector_row.get('sector_key', sector_name)
-            
-            # Find previous data for this sector
-            prev_sector_data = prev_data[
-                (prev_data['Sector'] == sector_row['Sector']) & 
-                (prev_data['District'] == sector_row['District'])
-            ] if not prev_data.empty else pd.DataFrame()
-            
-            try:
-                if selected_metric == 'incidence':
-                    current_val = sector_row['incidence']
-                    prev_val = prev_sector_data['incidence'].iloc[0] if not prev_sector_data.empty else current_val
-                    change = current_val - prev_val
-                    change_pct = ((change / prev_val) * 100) if prev_val > 0 else 0
-                    metric_name = "case/1000"
-                    current_display = f"{current_val:.1f}"
-                else:  # Default to 'Simple malaria cases'
-                    current_val = sector_row['Simple malaria cases']
-                    prev_val = prev_sector_data['Simple malaria cases'].iloc[0] if not prev_sector_data.empty else current_val
-                    change = current_val - prev_val
-                    change_pct = ((change / prev_val) * 100) if prev_val > 0 else 0
-                    metric_name = "cases"
-                    current_display = f"{int(current_val)}"
-                
-                sector_changes.append({
-                    'Sector': sector_name,
-                    'change': change,
-                    'change_pct': change_pct,
-                    'metric_name': metric_name,
-                    'current_display': current_display
-                })
-            except (KeyError, IndexError, ValueError) as e:
-                # Skip sectors with missing data
-                continue
-        
-        df_changes = pd.DataFrame(sector_changes)
-        
-        # Column 1: Current Metrics
+            self._render_top_movers(top_decreases, rank_table.entity_col, selected_metric, "BIGGEST DECREASES",
+                                    f"No {entity_label} data available to display decreases", increases=False)
+    
+    def _render_current_metrics_card(self, col1, current_data, prev_data, cases: Metric, incidence: Metric, title: str):
+        """Render the current-metrics card (month total and overall incidence against the previous month)"""
+        # Each metric aggregates by its registry rule - incidence is total cases / total population
+        current = np.array([cases.aggregate(current_data), incidence.aggregate(current_data)], dtype='float64')
+        previous = current if prev_data.empty else np.array(
+            [cases.aggregate(prev_data), incidence.aggregate(prev_data)], dtype='float64'
+        )
+        changes = current - previous
+        
+        # Column 1: Current Metrics - heading and both tiles in one block
+        tiles = DashboardStyling.render_metric_tiles(
+            [cases.filter_label, incidence.short_label],
+            [f"{int(current[0]):,}", f"{current[1]:.1f}"],
+            changes,
+            [f"{changes[0]:+,.0f}", f"{changes[1]:+.1f}"]
+        )
         with col1:
-            st.markdown("### CURRENT METRICS")
-            
-            st.metric(
-                label="Simple Cases",
-                value=f"{int(current_simple_cases):,}",
-                delta=f"{simple_cases_change:+,.0f}",
-                delta_color="inverse"
-            )
-            
-            st.metric(
-                label="Average Incidence",
-                value=f"{current_incidence:.1f}",
-                delta=f"{incidence_change:+.1f}",
-                delta_color="inverse"
-            )
-        
-        # Column 2: Highest Increases
-        with col2:
-            st.markdown("### HIGHEST INCREASES")
-            
-            if not df_changes.empty:
-                top_increases = df_changes.nlargest(3, 'change')  # Sort by raw change, not percentage
-                
-                if top_increases.empty:
-                    st.info("No increase data available for selected metric")
-                else:
-                    for _, row in top_increases.iterrows():
-                        # FIXED: Use actual change value, not percentage for color logic
-                        change_val = row['change']
-                        bg_color = 'rgba(220, 53, 69, 0.3)' if change_val > 0 else 'rgba(40, 167, 69, 0.3)'
-                        
-                        st.markdown(f"""
-                        <div style="
-                            background: {bg_color};
-                            padding: 1.2rem;
-                            border-radius: 10px;
-                            margin-bottom: 0.5rem;
-                            display: flex;
-                            justify-content: space-between;
-                            align-items: center;
-                        ">
-                            <strong style="flex: 1; color: white; font-size: 18px;">{row['Sector']}</strong>
-                            <span style="color: white; text-align: right; font-size: 17px;">
-                                {row['current_display']} {row['metric_name']} ({row['change']:+,.0f})
-                            </span>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.info("No sector data available to display increases")
+            st.markdown(DashboardStyling.render_card(title, tiles), unsafe_allow_html=True)
+    
+    def _render_top_movers(self, movers: pd.DataFrame, entity_col: str, metric: str, title: str, empty_message: str,
+                           increases: bool):
+        """Render an increases/decreases card - heading and top-mover rows in one block"""
+        if movers.empty:
+            st.markdown(f"### {title}")
+            st.info(empty_message)
+            return
         
-        # Column 3: Biggest Decreases
-        with col3:
-            st.markdown("###  BIGGEST DECREASES")
-            
-            if not df_changes.empty:
-                top_decreases = df_changes.nsmallest(3, 'change')  # Sort by raw change, not percentage
-                
-                if top_decreases.empty:
-                    st.info("No decrease data available for selected metric")
-                else:
-                    for _, row in top_decreases.iterrows():
-                        # FIXED: Use actual change value, not percentage for color logic  
-                        change_val = row['change']
-                        bg_color = 'rgba(40, 167, 69, 0.3)' if change_val < 0 else 'rgba(220, 53, 69, 0.3)'
-                        
-                        st.markdown(f"""
-                        <div style="
-                            background: {bg_color};
-                            padding: 1.2rem;
-                            border-radius: 10px;
-                            margin-bottom: 0.5rem;
-                            display: flex;
-                            justify-content: space-between;
-                            align-items: center;
-                        ">
-                            <strong style="flex: 1; color: white; font-size: 18px;">{row['Sector']}</strong>
-                            <span style="color: white; text-align: right; font-size: 17px;">
-                                {row['current_display']} {row['metric_name']} ({row['change']:+,.0f})
-                            </span>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.info("No sector data available to display decreases")
+        # Rates are shown per 1,000 people, counts as whole numbers
+        definition = METRIC_REGISTRY.get(st.session_state.admin_level.title(), metric)
+        metric_name = definition.unit if definition is not None else "cases"
+        value_format = "{:.1f}" if definition is not None and definition.is_derived else "{:.0f}"
+        
+        # FIXED: Use actual change value, not percentage for color logic
+        changes = movers['change'].to_numpy()
+        rising = changes > 0 if increases else ~(changes < 0)  # A missing change (NaN) counts as rising
+        rows = DashboardStyling.render_mover_rows(
+            movers[entity_col].to_numpy(),
+            [value_format.format(value) for value in movers['value'].to_numpy()],
+            [f"{change:+,.0f}" for change in changes],
+            rising, metric_name
+        )
+        st.markdown(DashboardStyling.render_card(title, rows), unsafe_allow_html=True)
     
     def run(self):
         """Main execution function"""
@@ -639,8 +619,16 @@ class SimplifiedDashboard:
         self.render_header()
         self.render_sidebar()
         
+        # The first sessions after boot wait for the process warm-up instead of repeating its work
+        warmup = start_warmup()
+        if not warmup.is_ready(st.session_state.admin_level):
+            with st.spinner("Preparing dashboard data..."):
+                warmup.wait(st.session_state.admin_level, timeout=120)
+        
         # Load data and setup components
         data, entity_options, display_type = self.load_data()
+        self.render_data_quality()
+        self.render_cache_stats()
         components = self.setup_components(data)
         
         # Render selected page
@@ -1,11 +1,29 @@
-import plotly.express as px
-import streamlit as st
-from typing import Dict, Any
-import geopandas as gpd
+from __future__ import annotations
+
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Any
+
+from lazy_imports import lazy_import
+from metric_registry import METRIC_REGISTRY
+from view_cache import cached_figure
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+shapely = lazy_import('shapely')
 
 class MapVisualizations:
     """Handle choropleth map visualizations for both districts and sectors"""
     
+    # Gi* hotspot classes
+    HOTSPOT_COLORS = {
+        'Hot spot': '#d32f2f',
+        'Cold spot': '#1976d2',
+        'Not significant': '#555555'
+    }
+    
     def __init__(self, dashboard_type: str, metrics_calculator):
         self.dashboard_type = dashboard_type
         self.metrics_calculator = metrics_calculator
@@ -20,32 +38,17 @@ class MapVisualizations:
             [1.0, '#4a148c']     # Deep purple
         ]
     
-    def create_choropleth_map(self, data: gpd.GeoDataFrame, year: int, month: int, metric: str) -> Any:
-        """Create choropleth map with completely clean styling"""
+    @cached_figure
+    def create_choropleth_map(self, data: gpd.GeoDataFrame, year: int, month: int, metric: str, lean: bool = False) -> Any:
+        """Create choropleth map with completely clean styling (lean=True for a compact payload)"""
         filtered_data = data[(data['year'] == year) & (data['month'] == month)].copy()
         
-        # Get yearly range for consistent coloring
-        yearly_data = data[data['year'] == year]
-        vmin = yearly_data[metric].min()
-        vmax = yearly_data[metric].max()
+        # Get yearly range for consistent coloring (precomputed stats table)
+        vmin, vmax = self.metrics_calculator.get_yearly_color_range(data, year, metric)
         
         # Get simple colorbar title
-        if self.dashboard_type == "Districts":
-            if metric == 'all cases':
-                colorbar_title = 'All Cases'
-            elif metric == 'Severe cases/Deaths':
-                colorbar_title = 'Severe Cases'
-            elif metric == 'all cases incidence':
-                colorbar_title = 'Incidence'
-            else:
-                colorbar_title = 'Cases'
-        else:
-            if metric == 'Simple malaria cases':
-                colorbar_title = 'Cases'
-            elif metric == 'incidence':
-                colorbar_title = 'Incidence'
-            else:
-                colorbar_title = 'Cases'
+        definition = METRIC_REGISTRY.get(self.dashboard_type, metric)
+        colorbar_title = definition.short_label if definition is not None else 'Cases'
         
         # Get hover data and display column
         hover_data = self._get_hover_data()
@@ -57,46 +60,129 @@ class MapVisualizations:
             else:
                 display_col = 'Sector' if 'Sector' in filtered_data.columns else 'District'
         
-        # Create the map with NO title
+        if lean:
+            fig = self._create_lean_choropleth(filtered_data, metric, display_col, vmin, vmax)
+        else:
+            # Create the map with NO title
+            fig = px.choropleth_mapbox(
+                filtered_data,
+                geojson=filtered_data.geometry.__geo_interface__,
+                locations=filtered_data.index,
+                color=metric,
+                hover_name=display_col,
+                hover_data=hover_data,
+                color_continuous_scale=self.pink_purple_scale,
+                range_color=[vmin, vmax],
+                mapbox_style='carto-darkmatter',
+                zoom=6.8,
+                center={'lat': -1.9, 'lon': 29.9},
+                labels=self._get_map_labels()
+            )
+        
+        # Update layout with CLEAN colorbar - no extra text
+        fig.update_layout(
+            plot_bgcolor='rgba(20,20,20,0.9)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            height=580,
+            margin=dict(l=0, r=0, t=10, b=0),
+            showlegend=False,
+            coloraxis_colorbar=self._get_colorbar(colorbar_title)
+        )
+        
+        return fig
+    
+    @cached_figure
+    def create_hotspot_map(self, data: gpd.GeoDataFrame, year: int, month: int, metric: str, spatial_index) -> Any:
+        """Create Getis-Ord Gi* hotspot map (hot/cold spots at 95% from permutation tests)"""
+        display_col = self.metrics_calculator.get_display_column()
+        hotspots = self.metrics_calculator.get_hotspot_table(data, metric, spatial_index)
+        period_hotspots = hotspots[(hotspots['year'] == year) & (hotspots['month'] == month)]
+        
+        filtered_data = data[(data['year'] == year) & (data['month'] == month)]
+        filtered_data = filtered_data.merge(
+            period_hotspots[[display_col, 'hotspot', 'cluster', 'gi_z', 'gi_p']], on=display_col, how='left'
+        )
+        filtered_data['hotspot'] = filtered_data['hotspot'].fillna('Not significant')
+        
         fig = px.choropleth_mapbox(
             filtered_data,
             geojson=filtered_data.geometry.__geo_interface__,
             locations=filtered_data.index,
-            color=metric,
+            color='hotspot',
+            color_discrete_map=self.HOTSPOT_COLORS,
+            category_orders={'hotspot': list(self.HOTSPOT_COLORS)},
             hover_name=display_col,
-            hover_data=hover_data,
-            color_continuous_scale=self.pink_purple_scale,
-            range_color=[vmin, vmax],
+            hover_data={metric: ':,.2f', 'gi_z': ':.2f', 'gi_p': ':.3f', 'cluster': True},
             mapbox_style='carto-darkmatter',
             zoom=6.8,
             center={'lat': -1.9, 'lon': 29.9},
-            labels=self._get_map_labels()
+            labels={**self._get_map_labels(), 'hotspot': 'Gi* Hotspot', 'gi_z': 'Gi* z-score',
+                    'gi_p': 'p-value', 'cluster': "Local Moran's I"}
         )
         
-        # Update layout with CLEAN colorbar - no extra text
+        fig.update_traces(marker_line_width=0.5)
         fig.update_layout(
             plot_bgcolor='rgba(20,20,20,0.9)',
             paper_bgcolor='rgba(0,0,0,0)',
             font_color='white',
             height=580,
             margin=dict(l=0, r=0, t=10, b=0),
-            showlegend=False,
-            coloraxis_colorbar=dict(
-                title_font_color='white',
-                tickfont_color='white',
-                title=dict(
-                    text=colorbar_title,  # Just the metric name
-                    font=dict(size=12)
-                ),
-                tickformat=":,.0f",
-                len=0.8,
-                thickness=20,
-                x=1.02
-            )
+            legend=dict(title='', font=dict(color='white'), bgcolor='rgba(30,30,30,0.9)', x=0.01, y=0.99)
         )
         
         return fig
     
+    def _create_lean_choropleth(self, filtered_data: gpd.GeoDataFrame, metric: str, display_col: str,
+                                vmin: float, vmax: float) -> Any:
+        """Build the map directly with graph_objects: one value array, population as customdata"""
+        label = self._get_map_labels().get(metric, metric)
+        definition = METRIC_REGISTRY.get(self.dashboard_type, metric)
+        value_format = definition.fmt if definition is not None else ',.0f'
+        
+        fig = go.Figure(go.Choroplethmapbox(
+            geojson=self._get_lean_geojson(filtered_data),
+            locations=np.arange(len(filtered_data)),
+            z=np.round(filtered_data[metric].to_numpy(dtype='float64'), 2),
+            coloraxis='coloraxis',
+            text=filtered_data[display_col].tolist(),
+            customdata=filtered_data['Population'].round().to_numpy(dtype='float64'),
+            hovertemplate=(f"<b>%{{text}}</b><br>{label}: %{{z:{value_format}}}"
+                           "<br>Population: %{customdata:,.0f}<extra></extra>"),
+            marker_line_width=0.5
+        ))
+        fig.update_layout(
+            template='none',  # the default template alone adds several KB to every payload
+            coloraxis=dict(colorscale=self.pink_purple_scale, cmin=float(vmin), cmax=float(vmax)),
+            mapbox=dict(style='carto-darkmatter', zoom=6.8, center={'lat': -1.9, 'lon': 29.9})
+        )
+        return fig
+    
+    def _get_lean_geojson(self, filtered_data: gpd.GeoDataFrame, precision: float = 1e-4) -> Dict[str, Any]:
+        """Minimal GeoJSON: positional ids, no properties, coordinates snapped to ~10 m"""
+        geometries = shapely.set_precision(filtered_data.geometry.values.data, precision)
+        features = [
+            {'type': 'Feature', 'id': i, 'geometry': shapely.geometry.mapping(geom)}
+            for i, geom in enumerate(geometries)
+            if geom is not None
+        ]
+        return {'type': 'FeatureCollection', 'features': features}
+    
+    def _get_colorbar(self, colorbar_title: str) -> Dict[str, Any]:
+        """Get the clean colorbar configuration shared by both map modes"""
+        return dict(
+            title_font_color='white',
+            tickfont_color='white',
+            title=dict(
+                text=colorbar_title,  # Just the metric name
+                font=dict(size=12)
+            ),
+            tickformat=":,.0f",
+            len=0.8,
+            thickness=20,
+            x=1.02
+        )
+    
     def _get_map_titles(self, year: int, month: int, metric: str) -> tuple:
         """Get appropriate titles based on dashboard type and metric"""
         month_names = {
@@ -105,63 +191,19 @@ class MapVisualizations:
         }
         month_name = month_names.get(month, str(month))
         
-        if self.dashboard_type == "Districts":
-            return self._get_district_titles(year, month_name, metric)
-        else:
-            return self._get_sector_titles(year, month_name, metric)
-    
-    def _get_district_titles(self, year: int, month_name: str, metric: str) -> tuple:
-        """Get titles for district maps"""
-        title_map = {
-            'all cases': (f'All Malaria Cases by District ({month_name} {year})', 'All Cases'),
-            'Severe cases/Deaths': (f'Severe Cases & Deaths by District ({month_name} {year})', 'Severe Cases & Deaths'),
-            'all cases incidence': (f'All Cases Incidence by District ({month_name} {year})', 'All Cases Incidence'),
-            'Severe cases/Deaths incidence': (f'Severe Cases & Deaths Incidence by District ({month_name} {year})', 'Severe Cases & Deaths Incidence')
-        }
-        return title_map.get(metric, (f'District Analysis ({month_name} {year})', 'Value'))
-    
-    def _get_sector_titles(self, year: int, month_name: str, metric: str) -> tuple:
-        """Get titles for sector maps"""
-        title_map = {
-            'Simple malaria cases': (f'Simple Malaria Cases Distribution ({month_name} {year})', 'Simple Malaria Cases'),
-            'incidence': (f'Simple Malaria Incidence ({month_name} {year})', 'Incidence')
-        }
-        return title_map.get(metric, (f'Sector Analysis ({month_name} {year})', 'Value'))
+        definition = METRIC_REGISTRY.get(self.dashboard_type, metric)
+        if definition is None:
+            entity_label = "District" if self.dashboard_type == "Districts" else "Sector"
+            return f'{entity_label} Analysis ({month_name} {year})', 'Value'
+        return definition.map_title.format(period=f'{month_name} {year}'), definition.label
     
     def _get_hover_data(self) -> Dict[str, Any]:
-        """Get hover data configuration based on dashboard type"""
+        """Get hover data configuration based on dashboard type (metric formats from the registry)"""
+        hover_data = METRIC_REGISTRY.hover_formats(self.dashboard_type)
         if self.dashboard_type == "Districts":
-            return {
-                'all cases': ':,.0f',
-                'Severe cases/Deaths': ':,.0f',
-                'all cases incidence': ':.2f',
-                'Severe cases/Deaths incidence': ':.2f',
-                'Population': ':,.0f'
-            }
-        else:
-            return {
-                'District': True,
-                'Simple malaria cases': ':,.0f',
-                'incidence': ':.2f',
-                'Population': ':,.0f'
-            }
+            return hover_data
+        return {'District': True, **hover_data}
     
     def _get_map_labels(self) -> Dict[str, str]:
         """Get labels for map based on dashboard type"""
-        if self.dashboard_type == "Districts":
-            return {
-                'all cases': 'All Cases',
-                'Severe cases/Deaths': 'Severe Cases & Deaths',
-                'all cases incidence': 'All Cases Incidence',
-                'Severe cases/Deaths incidence': 'Severe Cases & Deaths Incidence',
-                'District': 'District',
-                'Population': 'Population'
-            }
-        else:
-            return {
-                'Simple malaria cases': 'Simple Malaria Cases',
-                'incidence': 'Incidence',
-                'District': 'District',
-                'Sector': 'Sector',
-                'Population': 'Population'
-            }
\ No newline at end of file
+        return METRIC_REGISTRY.labels(self.dashboard_type)
\ No newline at end of file
@@ -0,0 +1,174 @@
+# metric_registry.py - One definition per indicator: label, format, aggregation rule and derivation
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+
+POPULATION_COLUMN = 'Population'
+
+
+class Metric:
+    """A numeric column of one admin level, with everything the views need to show it
+
+    Counts aggregate by summing. Rates are derived from a count column per
+    `per` people and aggregate population-weighted (total count / population);
+    they are computed from their count at load, vectorized over the whole frame.
+    Metrics with a filter_label appear in the dashboard metric filter, in
+    registry order.
+    """
+
+    def __init__(self, column: str, label: str, fmt: str = ',.0f', aggregation: str = 'sum',
+                 numerator: Optional[str] = None, per: int = 1000, short_label: Optional[str] = None,
+                 filter_label: Optional[str] = None, icon: str = '📊', unit: str = 'cases',
+                 map_title: Optional[str] = None):
+        self.column = column
+        self.label = label
+        self.fmt = fmt
+        self.aggregation = aggregation
+        self.numerator = numerator
+        self.per = per
+        self.short_label = short_label or label
+        self.filter_label = filter_label
+        self.icon = icon
+        self.unit = unit
+        self.map_title = map_title or f"{label} ({{period}})"
+
+    @property
+    def is_derived(self) -> bool:
+        return self.numerator is not None
+
+    @property
+    def hover_format(self) -> str:
+        """plotly express hover_data format"""
+        return f":{self.fmt}"
+
+    @property
+    def selector_label(self) -> str:
+        return f"{self.icon} {self.label}"
+
+    @property
+    def trend_title(self) -> str:
+        return f"{self.label} Trends Over Time"
+
+    def aggregate(self, data: pd.DataFrame) -> float:
+        """One value for a group of rows by the aggregation rule (sum, population-weighted rate or mean)"""
+        if self.aggregation == 'sum':
+            return float(data[self.column].sum())
+        if self.aggregation == 'population_weighted':
+            population = data[POPULATION_COLUMN].sum()
+            return float(data[self.numerator].sum() / population * self.per) if population > 0 else 0.0
+        if self.aggregation == 'mean':
+            return float(data[self.column].mean())
+        raise ValueError(f"Unknown aggregation '{self.aggregation}' for {self.column}")
+
+    def derive(self, data: pd.DataFrame) -> np.ndarray:
+        """Rate per `per` people from the count and population columns (0 where population is not positive)"""
+        counts = data[self.numerator].to_numpy(dtype='float64')
+        population = data[POPULATION_COLUMN].to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(population > 0, counts / population * self.per, 0.0)
+
+
+class MetricRegistry:
+    """Metrics per dashboard type ('Districts' / 'Sectors'), in display order"""
+
+    def __init__(self, metrics: Dict[str, List[Metric]]):
+        self._metrics = metrics
+        self._by_column = {level: {metric.column: metric for metric in level_metrics}
+                           for level, level_metrics in metrics.items()}
+
+    @property
+    def levels(self) -> List[str]:
+        return list(self._metrics)
+
+    def _check_level(self, level: str):
+        """Unknown levels are an error, not district metrics on sector data"""
+        if level not in self._metrics:
+            raise KeyError(f"Unknown dashboard level {level!r}; expected one of {', '.join(map(repr, self._metrics))}")
+
+    def metrics(self, level: str) -> List[Metric]:
+        self._check_level(level)
+        return self._metrics[level]
+
+    def get(self, level: str, column: str) -> Optional[Metric]:
+        self._check_level(level)
+        return self._by_column[level].get(column)
+
+    def columns(self, level: str) -> List[str]:
+        return [metric.column for metric in self.metrics(level)]
+
+    def selectable(self, level: str) -> List[Metric]:
+        """Metrics offered in the dashboard metric filter"""
+        return [metric for metric in self.metrics(level) if metric.filter_label]
+
+    def count_columns(self, level: str) -> List[str]:
+        """Summed source columns (cases), without population"""
+        return [metric.column for metric in self.metrics(level)
+                if metric.aggregation == 'sum' and not metric.is_derived]
+
+    def source_columns(self, level: str) -> List[str]:
+        """Columns read from the source file: counts and population"""
+        return self.count_columns(level) + [POPULATION_COLUMN]
+
+    def rate_columns(self, level: str) -> Dict[str, str]:
+        """Derived rate columns mapped to the count columns they are computed from"""
+        return {metric.column: metric.numerator for metric in self.metrics(level) if metric.is_derived}
+
+    def labels(self, level: str) -> Dict[str, str]:
+        """Column -> axis/legend label"""
+        return {metric.column: metric.label for metric in self.metrics(level)}
+
+    def hover_formats(self, level: str, include_population: bool = True) -> Dict[str, str]:
+        """Column -> hover format of every metric: counts, then rates, population last"""
+        metrics = [metric for metric in self.metrics(level) if metric.column != POPULATION_COLUMN]
+        formats = {metric.column: metric.hover_format
+                   for metric in sorted(metrics, key=lambda metric: metric.is_derived)}
+        if include_population:
+            formats[POPULATION_COLUMN] = self.get(level, POPULATION_COLUMN).hover_format
+        return formats
+
+    def level_for_columns(self, columns: Iterable[str]) -> Optional[str]:
+        """Dashboard type whose count columns are all present (None if no level matches)"""
+        columns = set(columns)
+        for level in self.levels:
+            if set(self.count_columns(level)) <= columns:
+                return level
+        return None
+
+    def derive(self, data: pd.DataFrame, level: str) -> pd.DataFrame:
+        """Compute every derived metric of a level in place (once per load)"""
+        for metric in self.metrics(level):
+            if metric.is_derived and metric.numerator in data.columns and POPULATION_COLUMN in data.columns:
+                data[metric.column] = metric.derive(data)
+        return data
+
+
+def _population() -> Metric:
+    return Metric(POPULATION_COLUMN, 'Population', aggregation='mean', unit='people')
+
+
+METRIC_REGISTRY = MetricRegistry({
+    'Districts': [
+        Metric('all cases', 'All Cases', filter_label='Total Cases',
+               map_title='All Malaria Cases by District ({period})'),
+        Metric('all cases incidence', 'All Cases Incidence', fmt='.2f', aggregation='population_weighted',
+               numerator='all cases', short_label='Incidence', filter_label='Cases Incidence Rate', icon='📈',
+               unit='case/1000', map_title='All Cases Incidence by District ({period})'),
+        Metric('Severe cases/Deaths', 'Severe Cases & Deaths', short_label='Severe Cases',
+               filter_label='Severe Cases/Deaths', icon='⚠️', unit='severe cases',
+               map_title='Severe Cases & Deaths by District ({period})'),
+        Metric('Severe cases/Deaths incidence', 'Severe Cases & Deaths Incidence', fmt='.2f',
+               aggregation='population_weighted', numerator='Severe cases/Deaths', short_label='Severe Incidence',
+               unit='case/1000', map_title='Severe Cases & Deaths Incidence by District ({period})'),
+        _population()
+    ],
+    'Sectors': [
+        Metric('Simple malaria cases', 'Simple Malaria Cases', short_label='Cases',
+               filter_label='Simple Malaria Cases', icon='🦟',
+               map_title='Simple Malaria Cases Distribution ({period})'),
+        Metric('incidence', 'Incidence', fmt='.2f', aggregation='population_weighted',
+               numerator='Simple malaria cases', filter_label='Incidence Rate', unit='case/1000',
+               map_title='Simple Malaria Incidence ({period})'),
+        _population()
+    ]
+})
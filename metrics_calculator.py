@@ -1,110 +1,198 @@
-import streamlit as st
+from __future__ import annotations
+
+import numpy as np
 import pandas as pd
-from typing import Tuple, Optional
+from typing import Dict, List, Tuple
+
+from hotspot_analysis import HotspotAnalyzer
+from lazy_imports import lazy_import
+from metric_registry import METRIC_REGISTRY
+from query_backends import SQLRangeIndex, SQLRankTable, get_query_backend
+from range_queries import PeriodRangeIndex, format_period_span, previous_window, resolve_period
+from rank_tables import RankTable
+from trend_series import TrendSeriesStore
+from view_cache import TABLE_CACHE, dataset_fingerprint
+
+gpd = lazy_import('geopandas')
 
 class MetricsCalculator:
     """Calculate key metrics for both district and sector dashboards"""
     
+    # Quantiles stored per (year, metric) for classed color breaks
+    COLOR_BREAK_QUANTILES = (0.2, 0.4, 0.6, 0.8)
+    
     def __init__(self, dashboard_type: str):
         self.dashboard_type = dashboard_type
-        # Updated district metrics - removed "Severe cases/Deaths incidence"
-        self.district_metrics = {
-            '📊 All Cases': 'all cases',
-            '📈 All Cases Incidence': 'all cases incidence',
-            '⚠️ Severe Cases & Deaths': 'Severe cases/Deaths'
-        }
-        self.sector_metrics = {
-            '🦟 Simple Malaria Cases': 'Simple malaria cases',
-            '📊 Incidence': 'incidence'
-        }
     
     def get_available_metrics(self) -> dict:
-        """Get available metrics based on dashboard type"""
-        if self.dashboard_type == "Districts":
-            return self.district_metrics
-        elif self.dashboard_type == "Sectors":
-            return self.sector_metrics
-        else:
-            # Fallback
-            return self.district_metrics
-    
-    @st.cache_data
-    def calculate_metrics(_self, _data, selected_year: int, selected_metric: str, 
-                         previous_year: Optional[int] = None) -> Tuple[float, float, Optional[float]]:
-        """Calculate key metrics for the dashboard - cached for performance"""
-        # Use all data for the selected year (not filtered by month) for proper totals
-        current_data = _data[_data['year'] == selected_year]
-        
-        if _self.dashboard_type == "Districts":
-            return _self._calculate_district_metrics(current_data, _data, selected_metric, 
-                                                   selected_year, previous_year)
-        else:
-            return _self._calculate_sector_metrics(current_data, _data, selected_metric, 
-                                                 selected_year, previous_year)
-    
-    def _calculate_district_metrics(self, current_data, all_data, selected_metric: str, 
-                                  selected_year: int, previous_year: Optional[int]) -> Tuple[float, float, Optional[float]]:
-        """Calculate metrics for district dashboard"""
-        if selected_metric in ['all cases', 'Severe cases/Deaths']:
-            total_cases = current_data[selected_metric].sum()
-            total_population = current_data['Population'].sum()
-            # Calculate overall incidence: (total cases / total population) * 1000
-            overall_incidence = (total_cases / total_population * 1000) if total_population > 0 else 0
-        else:
-            # For incidence metrics, take the mean of district-level incidences
-            overall_incidence = current_data[selected_metric].mean()
-            if selected_metric == 'all cases incidence':
-                total_cases = current_data['all cases'].sum()
-            else:
-                total_cases = 0
+        """Get available metrics based on dashboard type (selector label -> column, from the metric registry)"""
+        return {metric.selector_label: metric.column for metric in METRIC_REGISTRY.selectable(self.dashboard_type)}
+    
+    @staticmethod
+    def get_dashboard_metric_options(data) -> Dict[str, str]:
+        """Metric column -> label for the dashboard filters, detected from the data columns"""
+        level = METRIC_REGISTRY.level_for_columns(data.columns)
+        if level is None:
+            return {"Population": "Population"}
+        return {metric.column: metric.filter_label for metric in METRIC_REGISTRY.selectable(level)}
+    
+    def get_color_scale_range(self, data, metric: str) -> Tuple[float, float]:
+        """Get the global min and max for consistent color scaling across years - from the stats table"""
+        stats = self.get_yearly_stats(data).xs(metric, level='metric')
+        return stats['min'].min(), stats['max'].max()
+    
+    def get_yearly_color_range(self, data, year: int, metric: str) -> Tuple[float, float]:
+        """Get the min and max of a metric over one year for consistent monthly coloring"""
+        stats = self.get_yearly_stats(data)
+        key = (int(year), metric)
+        if key in stats.index:
+            return stats.at[key, 'min'], stats.at[key, 'max']
+        # Metric outside the stats table - fall back to scanning the year
+        yearly_data = data.loc[data['year'] == year, metric]
+        return yearly_data.min(), yearly_data.max()
+    
+    def get_color_breaks(self, data, year: int, metric: str) -> List[float]:
+        """Get quantile class breaks of a metric for one year (for classed legends) - [] for a year without data"""
+        stats = self.get_yearly_stats(data)
+        key = (int(year), metric)
+        if key in stats.index:
+            return [stats.at[key, f'q{int(q * 100)}'] for q in self.COLOR_BREAK_QUANTILES]
+        # Metric outside the stats table - fall back to the quantiles of the year
+        yearly_data = data.loc[data['year'] == year, metric].dropna()
+        if yearly_data.empty:
+            return []
+        return yearly_data.quantile(list(self.COLOR_BREAK_QUANTILES)).tolist()
+    
+    def get_yearly_stats(self, data) -> pd.DataFrame:
+        """Get min/max/sum and quantile breaks per (year, metric) - built once per dataset"""
+        key = ('yearly_stats', self.dashboard_type, dataset_fingerprint(data))
+        metrics = [col for col in list(self.get_available_metrics().values()) + ['Population'] if col in data.columns]
+        return TABLE_CACHE.get_or_compute(key, lambda: self._build_yearly_stats(data, metrics))
+    
+    def _build_yearly_stats(self, data, metrics: List[str]) -> pd.DataFrame:
+        """Vectorized groupby over years for all metrics at once"""
+        long = pd.DataFrame(data[['year'] + metrics]).melt(id_vars='year', var_name='metric', value_name='value')
+        grouped = long.groupby(['year', 'metric'])['value']
         
-        change_percent = None
-        if previous_year and previous_year in all_data['year'].values:
-            prev_data = all_data[all_data['year'] == previous_year]
-            if selected_metric in ['all cases', 'Severe cases/Deaths']:
-                prev_total_cases = prev_data[selected_metric].sum()
-                prev_total_pop = prev_data['Population'].sum()
-                prev_incidence = (prev_total_cases / prev_total_pop * 1000) if prev_total_pop > 0 else 0
-            else:
-                prev_incidence = prev_data[selected_metric].mean()
-            
-            if prev_incidence > 0:
-                change_percent = ((overall_incidence - prev_incidence) / prev_incidence) * 100
+        # (year, metric) rows with one column per statistic
+        stats = grouped.agg(['min', 'max', 'sum', 'mean'])
+        quantiles = grouped.quantile(list(self.COLOR_BREAK_QUANTILES)).unstack()
+        quantiles.columns = [f'q{int(q * 100)}' for q in quantiles.columns]
         
-        return total_cases, overall_incidence, change_percent
-    
-    def _calculate_sector_metrics(self, current_data, all_data, selected_metric: str, 
-                                selected_year: int, previous_year: Optional[int]) -> Tuple[float, float, Optional[float]]:
-        """Calculate metrics for sector dashboard"""
-        if selected_metric == 'Simple malaria cases':
-            total_cases = current_data[selected_metric].sum()
-            total_population = current_data['Population'].sum()
-            # Calculate overall incidence: (total cases / total population) * 1000
-            overall_incidence = (total_cases / total_population * 1000) if total_population > 0 else 0
-        else:  # incidence
-            # For incidence metric, take the mean of sector-level incidences
-            overall_incidence = current_data[selected_metric].mean()
-            total_cases = current_data['Simple malaria cases'].sum()
+        stats = stats.join(quantiles)
+        return stats
+    
+    def get_scatter_stats(self, data, x_col: str, y_col: str) -> pd.DataFrame:
+        """Get per-(year, month) quadrant thresholds, axis maxima and highlight rows of a scatterplot - built once per dataset"""
+        key = ('scatter_stats', self.dashboard_type, dataset_fingerprint(data), x_col, y_col)
+        return TABLE_CACHE.get_or_compute(key, lambda: self._build_scatter_stats(data, x_col, y_col))
+    
+    def _build_scatter_stats(self, data, x_col: str, y_col: str) -> pd.DataFrame:
+        """75th percentiles, maxima and arg-max row positions of both axes over the non-negative points"""
+        points = pd.DataFrame({
+            'year': data['year'].to_numpy(), 'month': data['month'].to_numpy(),
+            'x': data[x_col].to_numpy(dtype='float64'), 'y': data[y_col].to_numpy(dtype='float64')
+        })  # RangeIndex - idxmax labels are row positions in data
+        points = points[(points['x'] >= 0) & (points['y'] >= 0)]
+        grouped = points.groupby(['year', 'month'])[['x', 'y']]
         
-        change_percent = None
-        if previous_year and previous_year in all_data['year'].values:
-            prev_data = all_data[all_data['year'] == previous_year]
-            if selected_metric == 'Simple malaria cases':
-                prev_total_cases = prev_data[selected_metric].sum()
-                prev_total_pop = prev_data['Population'].sum()
-                prev_incidence = (prev_total_cases / prev_total_pop * 1000) if prev_total_pop > 0 else 0
-            else:  # incidence
-                prev_incidence = prev_data[selected_metric].mean()
-            
-            if prev_incidence > 0:
-                change_percent = ((overall_incidence - prev_incidence) / prev_incidence) * 100
+        thresholds = grouped.quantile(0.75)  # same linear interpolation as np.percentile
+        maxima = grouped.max()
+        rows = grouped.idxmax()
+        stats = pd.DataFrame({
+            'x_threshold': thresholds['x'], 'y_threshold': thresholds['y'],
+            'x_max': maxima['x'], 'y_max': maxima['y'],
+            'x_max_row': rows['x'].astype(np.int64), 'y_max_row': rows['y'].astype(np.int64),
+            'points': grouped.size()
+        })
+        return stats
+    
+    def get_rank_table(self, data) -> RankTable:
+        """Get per-period rankings of all entities for every metric - built once per dataset (or queried from SQL)"""
+        key = ('rank_table', self.dashboard_type, dataset_fingerprint(data))
+        metrics = list(self.get_available_metrics().values())
+        backend = get_query_backend(data)
+        if backend is not None:
+            # Rankings and deltas are computed in the database, one period at a time
+            return TABLE_CACHE.get_or_compute(key, lambda: SQLRankTable(backend, self.get_display_column(), metrics))
+        return TABLE_CACHE.get_or_compute(key, lambda: RankTable(data, self.get_display_column(), metrics))
+    
+    def get_trend_store(self, data) -> TrendSeriesStore:
+        """Get every entity's monthly series of all metrics as contiguous arrays - built once per dataset"""
+        key = ('trend_series', self.dashboard_type, dataset_fingerprint(data))
+        columns = METRIC_REGISTRY.columns(self.dashboard_type) + ['District']
+        return TABLE_CACHE.get_or_compute(key, lambda: TrendSeriesStore(data, self.get_display_column(), columns))
+    
+    def get_hotspot_table(self, data, metric: str, spatial_index,
+                          permutations: int = HotspotAnalyzer.PERMUTATIONS) -> pd.DataFrame:
+        """Get Local Moran's I / Gi* results for every month and entity - computed once per dataset and metric"""
+        key = ('hotspots', self.dashboard_type, dataset_fingerprint(data), metric, permutations)
+        return TABLE_CACHE.get_or_compute(
+            key, lambda: HotspotAnalyzer(spatial_index, permutations).analyze(data, self.get_display_column(), metric)
+        )
+    
+    def get_rate_columns(self) -> Dict[str, str]:
+        """Get incidence columns mapped to their case-count columns"""
+        return METRIC_REGISTRY.rate_columns(self.dashboard_type)
+    
+    def get_range_index(self, data) -> PeriodRangeIndex:
+        """Get the per-entity prefix-sum index for range totals - built once per dataset"""
+        key = ('range_index', self.dashboard_type, dataset_fingerprint(data))
+        count_columns = list(self.get_rate_columns().values())
+        backend = get_query_backend(data)
+        if backend is not None:
+            # Window totals are a GROUP BY in the database instead of in-memory prefix sums
+            return TABLE_CACHE.get_or_compute(
+                key, lambda: SQLRangeIndex(backend, self.get_display_column(), count_columns)
+            )
+        return TABLE_CACHE.get_or_compute(
+            key, lambda: PeriodRangeIndex(data, self.get_display_column(), count_columns)
+        )
+    
+    def get_period_data(self, data, period_type: str, year: int, month: int) -> Tuple[gpd.GeoDataFrame, str]:
+        """Get data for a period window shaped like a single month, plus a label for it
+
+        For a multi-month window, every entity gets one row with range totals
+        stamped as (year, month) and one row for the preceding window of equal
+        length stamped as the previous month. The map, top-N chart and
+        overview cards can then be used unchanged.
+        """
+        start, end, label = resolve_period(period_type, year, month)
+        if period_type == 'month':
+            return data, label
         
-        return total_cases, overall_incidence, change_percent
+        key = ('period_data', self.dashboard_type, dataset_fingerprint(data), period_type, int(year), int(month))
+        return TABLE_CACHE.get_or_compute(
+            key, lambda: self._build_period_data(data, start, end, label, int(year), int(month))
+        )
     
-    @st.cache_data
-    def get_color_scale_range(_self, _data, metric: str) -> Tuple[float, float]:
-        """Get the global min and max for consistent color scaling across years - cached"""
-        return _data[metric].min(), _data[metric].max()
+    def _build_period_data(self, data, start, end, label: str, year: int, month: int) -> Tuple[gpd.GeoDataFrame, str]:
+        """O(1)-per-entity range totals for the current and previous windows"""
+        range_index = self.get_range_index(data)
+        entity_col = range_index.entity_col
+        start, end = range_index.clip(start, end)
+        prev_start, prev_end = previous_window(start, end)
+        
+        # Names, province and geometry of each entity (latest row)
+        value_columns = set(range_index.sum_columns) | set(self.get_rate_columns()) | {'Population'}
+        attribute_columns = [col for col in data.columns
+                             if col not in value_columns and col not in ('year', 'month', 'Date', 'month_name')]
+        attributes = pd.DataFrame(data[attribute_columns]).drop_duplicates(entity_col, keep='last')
+        
+        prev_year, prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+        frames = []
+        for (window_start, window_end), (stamp_year, stamp_month) in [((prev_start, prev_end), (prev_year, prev_month)),
+                                                                        ((start, end), (year, month))]:
+            frame = range_index.range_frame(window_start, window_end, self.get_rate_columns())
+            frame['year'], frame['month'] = stamp_year, stamp_month
+            frames.append(frame)
+        
+        period_data = pd.concat(frames, ignore_index=True).merge(attributes, on=entity_col, how='left')
+        period_data[['year', 'month']] = period_data[['year', 'month']].astype('int32')
+        if 'geometry' in period_data.columns:
+            period_data = gpd.GeoDataFrame(period_data, geometry='geometry')
+        
+        return period_data, f"{label} ({format_period_span(start, end)})"
     
     def get_entity_column(self) -> str:
         """Get the column name for entities (districts/sectors)"""
@@ -0,0 +1,75 @@
+# name_normalization.py - Canonical province / district / sector names from one alias table
+
+import os
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class NameNormalizer:
+    """Map raw admin names to canonical names, working on unique values only
+
+    A column is factorized into integer codes plus its distinct values; only
+    the distinct values are cleaned and looked up in the alias table, and the
+    result is expanded back through the codes. Spelling variants (English
+    short forms, Kinyarwanda names) live in data/name_aliases.csv so every
+    module sees the same names.
+    """
+
+    ALIAS_FILE = 'data/name_aliases.csv'
+
+    def __init__(self, alias_file: str = ALIAS_FILE):
+        self.alias_file = alias_file
+        self._aliases = self._load_aliases(alias_file)
+        self._memo: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def reload(self):
+        """Re-read the alias table (called when a new dataset version is ingested)"""
+        aliases = self._load_aliases(self.alias_file)
+        with self._lock:
+            self._aliases = aliases
+            self._memo = {}
+
+    @staticmethod
+    def _key(name: str) -> str:
+        """Lookup key - case and whitespace insensitive"""
+        return ' '.join(str(name).split()).casefold()
+
+    def _load_aliases(self, alias_file: str) -> Dict[Tuple[str, str], str]:
+        """(kind, alias key) -> canonical name"""
+        if not os.path.exists(alias_file):
+            return {}
+        table = pd.read_csv(alias_file, dtype=str).dropna()
+        return {(kind.strip().lower(), self._key(alias)): canonical.strip()
+                for kind, alias, canonical in table[['kind', 'alias', 'canonical']].itertuples(index=False)}
+
+    def canonical(self, name: str, kind: str) -> str:
+        """Canonical form of one name: alias table first, otherwise trimmed title case"""
+        memo_key = (kind, name)
+        result = self._memo.get(memo_key)
+        if result is None:
+            cleaned = ' '.join(str(name).split())
+            result = self._aliases.get((kind, self._key(cleaned)), cleaned.title())
+            with self._lock:
+                self._memo[memo_key] = result
+        return result
+
+    def normalize(self, values: pd.Series, kind: str) -> pd.Series:
+        """Canonical names for a whole column (missing values stay missing)"""
+        codes, uniques = pd.factorize(values)
+        canonical = np.array([self.canonical(name, kind) for name in uniques] + [np.nan], dtype=object)
+        return pd.Series(canonical[codes], index=values.index, name=values.name)
+
+    def normalize_columns(self, frame: pd.DataFrame, columns) -> pd.DataFrame:
+        """Normalize admin columns in place - the column name (lowercased) is the alias kind"""
+        for col in columns:
+            if col in frame.columns:
+                frame[col] = self.normalize(frame[col], col.lower())
+        return frame
+
+
+# Loaded once per process; the alias file is small and rarely edited
+NAME_NORMALIZER = NameNormalizer()
@@ -0,0 +1,26 @@
+# parallel_tasks.py - Build independent views concurrently and join them before rendering
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# One pool per process, shared by every session (figure builders are pure functions of their inputs)
+FIGURE_EXECUTOR = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 2), thread_name_prefix='figures')
+
+
+def run_parallel(tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """Run named zero-argument callables on the shared pool and return their results by name
+
+    Tasks must not call Streamlit - element and widget calls need the script
+    thread's context, so all rendering stays on the caller's thread after the
+    join. The first failing task's exception is re-raised here.
+    """
+    if len(tasks) <= 1:
+        return {name: task() for name, task in tasks.items()}
+    futures = {name: FIGURE_EXECUTOR.submit(task) for name, task in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def run_in_background(task: Callable[[], Any]) -> Future:
+    """Start one callable on the shared pool while the caller renders something else (same rules as run_parallel)"""
+    return FIGURE_EXECUTOR.submit(task)
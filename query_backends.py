@@ -0,0 +1,241 @@
+# query_backends.py - Embedded SQL engines (SQLite / DuckDB) for period totals, rankings and deltas
+
+import glob
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from range_queries import Period, index_to_period, period_to_index
+from view_cache import dataset_fingerprint
+
+# Engine for every published dataset in this process; 'pandas' keeps everything in memory (default)
+QUERY_ENGINES = ('pandas', 'sqlite', 'duckdb')
+
+
+def duckdb_available() -> bool:
+    """DuckDB is optional - without it the duckdb engine falls back to SQLite"""
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_query_engine() -> str:
+    """Engine selected with MALARIA_QUERY_ENGINE (pandas, sqlite or duckdb)"""
+    engine = os.environ.get('MALARIA_QUERY_ENGINE', 'pandas').strip().lower()
+    if engine not in QUERY_ENGINES:
+        return 'pandas'
+    if engine == 'duckdb' and not duckdb_available():
+        return 'sqlite'
+    return engine
+
+
+def _quote(column: str) -> str:
+    """SQL identifier for a column name (names contain spaces and slashes)"""
+    return '"' + column.replace('"', '""') + '"'
+
+
+class SQLQueryBackend:
+    """Fact table of one dataset version in an embedded database file
+
+    The table holds every non-geometry column plus the row position in the
+    loaded frame and a month index, so rankings can point back at frame rows.
+    Queries return only their result rows; each version gets its own file,
+    which is reused across restarts and replaced when the version changes.
+    """
+
+    TABLE = 'facts'
+
+    def __init__(self, engine: str, connection: Any, path: str, fingerprint: str):
+        self.engine = engine
+        self.path = path
+        self.fingerprint = fingerprint
+        self._connection = connection
+        self._lock = threading.Lock()
+        self.columns = list(self.read(f"SELECT * FROM {self.TABLE} LIMIT 0").columns)
+        bounds = self.read(f"SELECT MIN(period) AS first_index, MAX(period) AS last_index FROM {self.TABLE}")
+        self.first_index, self.last_index = int(bounds.at[0, 'first_index']), int(bounds.at[0, 'last_index'])
+
+    @classmethod
+    def open(cls, engine: str, data: pd.DataFrame, fingerprint: str,
+             directory: str = 'data/cache/query') -> 'SQLQueryBackend':
+        """Open the database file of this version, building it from the frame if it does not exist yet"""
+        extension = 'duckdb' if engine == 'duckdb' else 'sqlite'
+        path = os.path.join(directory, f"{fingerprint}.{extension}")
+        try:
+            if not os.path.exists(path):
+                os.makedirs(directory, exist_ok=True)
+                cls._build(engine, data, path)
+            # Files of earlier versions of this dataset are never read again
+            name = fingerprint.split('@')[0]
+            for stale in glob.glob(os.path.join(directory, f"{glob.escape(name)}@*.{extension}")):
+                if stale != path:
+                    os.remove(stale)
+            connection = cls._connect(engine, path)
+        except OSError:
+            # Read-only deployments keep the table in memory
+            path = ':memory:'
+            connection = cls._connect(engine, path)
+            cls._write_table(connection, engine, data)
+        return cls(engine, connection, path, fingerprint)
+
+    @classmethod
+    def _build(cls, engine: str, data: pd.DataFrame, path: str):
+        """Write the fact table to a temporary file, then move it into place"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        connection = cls._connect(engine, temp_path)
+        try:
+            cls._write_table(connection, engine, data)
+        finally:
+            connection.close()
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _fact_frame(data: pd.DataFrame) -> pd.DataFrame:
+        """Non-geometry columns plus row position and month index (dates as ISO text)"""
+        frame = pd.DataFrame(data.drop(columns='geometry', errors='ignore'))
+        for col in frame.columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[col]):
+                frame[col] = frame[col].dt.strftime('%Y-%m-%d')
+        frame['row'] = np.arange(len(frame))
+        frame['period'] = frame['year'].astype('int64') * 12 + frame['month'].astype('int64') - 1
+        return frame
+
+    @classmethod
+    def _write_table(cls, connection, engine: str, data: pd.DataFrame):
+        frame = cls._fact_frame(data)
+        if engine == 'duckdb':
+            connection.register('fact_frame', frame)
+            connection.execute(f"CREATE TABLE {cls.TABLE} AS SELECT * FROM fact_frame")
+            connection.unregister('fact_frame')
+        else:
+            frame.to_sql(cls.TABLE, connection, index=False)
+            connection.commit()
+        connection.execute(f"CREATE INDEX idx_{cls.TABLE}_period ON {cls.TABLE} (period)")
+
+    @staticmethod
+    def _connect(engine: str, path: str):
+        if engine == 'duckdb':
+            import duckdb
+            return duckdb.connect(path)
+        # Shared by the figure builder threads - every query goes through self._lock
+        return sqlite3.connect(path, check_same_thread=False)
+
+    def read(self, sql: str, params: Tuple = ()) -> pd.DataFrame:
+        """Run a query and return its (small) result set as a frame"""
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            rows = cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
+        return pd.DataFrame(rows, columns=columns)
+
+    def clip(self, start: Period, end: Period) -> Tuple[Period, Period]:
+        """Clip a window to the months covered by the data"""
+        start_index = max(period_to_index(start), self.first_index)
+        end_index = min(period_to_index(end), self.last_index)
+        return index_to_period(start_index), index_to_period(max(end_index, start_index - 1))
+
+    def range_frame(self, entity_col: str, start: Period, end: Period, sum_columns: List[str],
+                    rate_columns: Dict[str, str] = None, population_col: str = 'Population') -> pd.DataFrame:
+        """Per-entity window totals with population-weighted incidence, aggregated in the database"""
+        months = "COUNT(*)"
+        population = f"COALESCE(SUM({_quote(population_col)}), 0) * 1.0 / {months}"
+        selects = [f"{_quote(entity_col)} AS {_quote(entity_col)}", f"{months} AS months_reported"]
+        selects += [f"COALESCE(SUM({_quote(col)}), 0) AS {_quote(col)}" for col in sum_columns]
+        selects.append(f"{population} AS {_quote(population_col)}")
+        for rate_col, count_col in (rate_columns or {}).items():
+            if count_col in sum_columns:
+                selects.append(f"CASE WHEN {population} > 0 THEN COALESCE(SUM({_quote(count_col)}), 0) * 1000.0 / "
+                               f"({population}) ELSE 0 END AS {_quote(rate_col)}")
+        sql = (f"SELECT {', '.join(selects)} FROM {self.TABLE} WHERE period BETWEEN ? AND ? "
+               f"GROUP BY {_quote(entity_col)} ORDER BY {_quote(entity_col)}")
+        frame = self.read(sql, (period_to_index(start), period_to_index(end)))
+        frame['months_reported'] = frame['months_reported'].astype(np.int64)
+        return frame
+
+    def ranked(self, entity_col: str, year: int, month: int, metric: str, by: str = 'value',
+               ascending: bool = False, n: Optional[int] = None) -> pd.DataFrame:
+        """Entities of one month with value, change and percent change against the previous month, ranked by one of them"""
+        if by not in ('value', 'change', 'change_pct'):
+            raise ValueError(f"Unknown ranking field: {by}")
+        period = period_to_index((int(year), int(month)))
+        order = 'ASC' if ascending else 'DESC'
+        limit = f" LIMIT {int(n)}" if n is not None else ""
+        # Same rules as RankTable: no value for the immediately preceding month -> no change
+        sql = (
+            f"WITH cur AS (SELECT {_quote(entity_col)} AS entity, {_quote('row')}, {_quote(metric)} AS value "
+            f"FROM {self.TABLE} WHERE period = ?), "
+            f"prev AS (SELECT {_quote(entity_col)} AS entity, {_quote(metric)} AS value "
+            f"FROM {self.TABLE} WHERE period = ?) "
+            f"SELECT cur.entity AS {_quote(entity_col)}, ? AS year, ? AS month, cur.{_quote('row')} AS {_quote('row')}, ? AS metric, "
+            f"cur.value AS value, COALESCE(cur.value - prev.value, 0) AS change, "
+            f"CASE WHEN prev.value > 0 THEN (cur.value - prev.value) * 100.0 / prev.value ELSE 0 END AS change_pct "
+            f"FROM cur LEFT JOIN prev ON prev.entity = cur.entity "
+            f"ORDER BY {by} {order}, value {order}, cur.entity{limit}"
+        )
+        return self.read(sql, (period, period - 1, int(year), int(month), metric))
+
+
+class SQLRankTable:
+    """RankTable interface over a SQL backend - each top-N query returns only its n rows"""
+
+    RANK_FIELDS = ('value', 'change', 'change_pct')
+
+    def __init__(self, backend: SQLQueryBackend, entity_col: str, metrics: List[str]):
+        self.backend = backend
+        self.entity_col = entity_col
+        self.metrics = [metric for metric in metrics if metric in backend.columns]
+
+    def period(self, year: int, month: int, metric: str) -> pd.DataFrame:
+        """All entities for a period and metric, highest value first"""
+        return self.backend.ranked(self.entity_col, year, month, metric)
+
+    def top(self, year: int, month: int, metric: str, n: int = 10,
+            by: str = 'value', ascending: bool = False) -> pd.DataFrame:
+        """Top (or bottom with ascending=True) n entities of a period ranked by value, change or change_pct"""
+        return self.backend.ranked(self.entity_col, year, month, metric, by=by, ascending=ascending, n=n)
+
+
+class SQLRangeIndex:
+    """PeriodRangeIndex interface over a SQL backend - window totals are one GROUP BY per query"""
+
+    def __init__(self, backend: SQLQueryBackend, entity_col: str, sum_columns: List[str],
+                 population_col: str = 'Population'):
+        self.backend = backend
+        self.entity_col = entity_col
+        self.population_col = population_col
+        self.sum_columns = [col for col in sum_columns if col in backend.columns]
+
+    def clip(self, start: Period, end: Period) -> Tuple[Period, Period]:
+        return self.backend.clip(start, end)
+
+    def range_frame(self, start: Period, end: Period, rate_columns: Dict[str, str] = None) -> pd.DataFrame:
+        return self.backend.range_frame(self.entity_col, start, end, self.sum_columns, rate_columns,
+                                        self.population_col)
+
+
+# Dataset name -> backend of its current version
+_BACKENDS: Dict[str, SQLQueryBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def register_query_backend(name: str, backend: SQLQueryBackend):
+    """Make a backend current for a dataset (replaces the previous version's)"""
+    with _BACKENDS_LOCK:
+        _BACKENDS[name] = backend
+
+
+def get_query_backend(data: Any) -> Optional[SQLQueryBackend]:
+    """SQL backend holding exactly this frame, or None (pandas engine, or a derived in-memory frame)"""
+    if not _BACKENDS:
+        return None
+    fingerprint = dataset_fingerprint(data)
+    backend = _BACKENDS.get(fingerprint.split('@')[0])
+    return backend if backend is not None and backend.fingerprint == fingerprint else None
@@ -0,0 +1,149 @@
+# range_queries.py - Prefix-sum index for arbitrary date-range and rolling-window totals
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import get_month_name
+
+Period = Tuple[int, int]
+
+# Period selector options (key -> label)
+PERIOD_TYPES = {
+    'month': 'Single month',
+    'quarter': 'Quarter',
+    'season': 'Season',
+    'fiscal_year': 'Fiscal year (Jul-Jun)',
+    'trailing_12': 'Trailing 12 months'
+}
+
+# Rwanda's rainfall seasons as (name, start month, length in months)
+SEASONS = [
+    ('Short dry season', 12, 3),
+    ('Long rains', 3, 3),
+    ('Long dry season', 6, 3),
+    ('Short rains', 9, 3)
+]
+
+
+def period_to_index(period: Period) -> int:
+    """Months since year 0 - consecutive months get consecutive indexes"""
+    return period[0] * 12 + period[1] - 1
+
+
+def index_to_period(index: int) -> Period:
+    """Inverse of period_to_index"""
+    return index // 12, index % 12 + 1
+
+
+def format_period_span(start: Period, end: Period) -> str:
+    """Human-readable 'Mon YYYY-Mon YYYY' span"""
+    if start == end:
+        return f"{get_month_name(start[1])} {start[0]}"
+    if start[0] == end[0]:
+        return f"{get_month_name(start[1])}-{get_month_name(end[1])} {end[0]}"
+    return f"{get_month_name(start[1])} {start[0]}-{get_month_name(end[1])} {end[0]}"
+
+
+def resolve_period(period_type: str, year: int, month: int) -> Tuple[Period, Period, str]:
+    """Get the (start, end, label) window of a period type that contains the selected month"""
+    year, month = int(year), int(month)
+    if period_type == 'quarter':
+        quarter = (month - 1) // 3
+        start, end = (year, quarter * 3 + 1), (year, quarter * 3 + 3)
+        return start, end, f"Q{quarter + 1} {year}"
+    if period_type == 'season':
+        for name, start_month, length in SEASONS:
+            offset = (month - start_month) % 12
+            if offset < length:
+                start_index = period_to_index((year, month)) - offset
+                start, end = index_to_period(start_index), index_to_period(start_index + length - 1)
+                season_year = f"{start[0]}/{str(end[0])[-2:]}" if start[0] != end[0] else f"{start[0]}"
+                return start, end, f"{name} {season_year}"
+    if period_type == 'fiscal_year':
+        start_year = year if month >= 7 else year - 1
+        return (start_year, 7), (start_year + 1, 6), f"FY {start_year}/{str(start_year + 1)[-2:]}"
+    if period_type == 'trailing_12':
+        start = index_to_period(period_to_index((year, month)) - 11)
+        return start, (year, month), f"12 months to {get_month_name(month)} {year}"
+    return (year, month), (year, month), f"{get_month_name(month)} {year}"
+
+
+def previous_window(start: Period, end: Period) -> Tuple[Period, Period]:
+    """Window of the same length immediately before (start, end)"""
+    length = period_to_index(end) - period_to_index(start) + 1
+    return index_to_period(period_to_index(start) - length), index_to_period(period_to_index(start) - 1)
+
+
+class PeriodRangeIndex:
+    """Cumulative sums per entity over a contiguous month axis
+
+    Every additive column is laid out as an (entities x months) grid and
+    prefix-summed once, so the total over any window is one subtraction per
+    entity regardless of the window length.
+    """
+
+    def __init__(self, data: pd.DataFrame, entity_col: str, sum_columns: List[str],
+                 population_col: str = 'Population'):
+        self.entity_col = entity_col
+        self.population_col = population_col
+        self.sum_columns = [col for col in sum_columns if col in data.columns]
+
+        months = data['year'].to_numpy(dtype=np.int64) * 12 + data['month'].to_numpy(dtype=np.int64) - 1
+        self.first_index, self.last_index = int(months.min()), int(months.max())
+        entity_codes = pd.Categorical(data[entity_col])
+        self.entities = list(entity_codes.categories)
+
+        rows, cols = entity_codes.codes, months - self.first_index
+        shape = (len(self.entities), self.last_index - self.first_index + 1)
+        self._prefix: Dict[str, np.ndarray] = {}
+        for col in self.sum_columns + [population_col]:
+            self._prefix[col] = self._prefix_sum(shape, rows, cols, data[col].to_numpy(dtype=np.float64))
+        self._prefix['_months'] = self._prefix_sum(shape, rows, cols, np.ones(len(data)))
+
+    def _prefix_sum(self, shape: Tuple[int, int], rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """(entities x months+1) cumulative sums with a leading zero column"""
+        grid = np.zeros(shape)
+        np.add.at(grid, (rows, cols), np.nan_to_num(values))
+        prefix = np.zeros((shape[0], shape[1] + 1))
+        np.cumsum(grid, axis=1, out=prefix[:, 1:])
+        return prefix
+
+    def clip(self, start: Period, end: Period) -> Tuple[Period, Period]:
+        """Clip a window to the months covered by the data"""
+        start_index = max(period_to_index(start), self.first_index)
+        end_index = min(period_to_index(end), self.last_index)
+        return index_to_period(start_index), index_to_period(max(end_index, start_index - 1))
+
+    def _bounds(self, start: Period, end: Period) -> Tuple[int, int]:
+        # Windows entirely after the data start one past the last month and are empty
+        start_index = min(max(period_to_index(start), self.first_index), self.last_index + 1) - self.first_index
+        end_index = min(period_to_index(end), self.last_index) - self.first_index + 1
+        return start_index, max(end_index, start_index)
+
+    def range_sum(self, column: str, start: Period, end: Period) -> np.ndarray:
+        """Total of a column over [start, end] for every entity (aligned with self.entities)"""
+        start_index, end_index = self._bounds(start, end)
+        prefix = self._prefix[column]
+        return prefix[:, end_index] - prefix[:, start_index]
+
+    def range_frame(self, start: Period, end: Period, rate_columns: Dict[str, str] = None) -> pd.DataFrame:
+        """Per-entity totals over a window, with population-weighted incidence per 1,000
+
+        rate_columns maps an incidence column to the count column it is derived
+        from; the window incidence is total count / average population * 1000.
+        """
+        months = self.range_sum('_months', start, end)
+        population = np.divide(self.range_sum(self.population_col, start, end), months,
+                               out=np.zeros_like(months), where=months > 0)
+
+        frame = pd.DataFrame({self.entity_col: self.entities, 'months_reported': months.astype(np.int64)})
+        for col in self.sum_columns:
+            frame[col] = self.range_sum(col, start, end)
+        frame[self.population_col] = population
+        for rate_col, count_col in (rate_columns or {}).items():
+            if count_col in frame.columns:
+                frame[rate_col] = np.divide(frame[count_col].to_numpy() * 1000, population,
+                                            out=np.zeros_like(population), where=population > 0)
+        return frame[frame['months_reported'] > 0].reset_index(drop=True)
@@ -0,0 +1,88 @@
+# rank_tables.py - Precomputed per-period rankings for top-N queries
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+
+class RankTable:
+    """Per-(year, month, metric) rankings of every entity, computed once per dataset
+
+    For each entity and period the table holds the metric value, the change
+    against the previous calendar month and the percent change, plus their
+    ranks within the period. Top-N queries of any size are slices of
+    pre-sorted position arrays.
+    """
+
+    RANK_FIELDS = ('value', 'change', 'change_pct')
+
+    def __init__(self, data: pd.DataFrame, entity_col: str, metrics: List[str]):
+        self.entity_col = entity_col
+        self.metrics = [metric for metric in metrics if metric in data.columns]
+        self.table = self._build_table(data)
+        self._slices, self._orders = self._build_index()
+
+    def _build_table(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Long table of (entity, period, metric) values with month-on-month changes"""
+        frame = pd.DataFrame({
+            self.entity_col: data[self.entity_col].to_numpy(),
+            'year': data['year'].to_numpy(),
+            'month': data['month'].to_numpy(),
+            'row': np.arange(len(data))  # position in the source frame
+        })
+        for metric in self.metrics:
+            frame[metric] = data[metric].to_numpy(dtype='float64')
+        frame['period'] = frame['year'] * 12 + frame['month']
+        frame = frame.sort_values([self.entity_col, 'period'], kind='stable')
+        
+        long = frame.melt(
+            id_vars=[self.entity_col, 'year', 'month', 'period', 'row'],
+            value_vars=self.metrics, var_name='metric', value_name='value'
+        )
+        
+        # Previous value only counts if it is the immediately preceding month
+        grouped = long.groupby([self.entity_col, 'metric'], sort=False)
+        prev_value = grouped['value'].shift(1)
+        prev_value = prev_value.where(grouped['period'].shift(1) == long['period'] - 1)
+        
+        # Same rules as the overview cards: no previous value -> no change
+        long['change'] = (long['value'] - prev_value).fillna(0.0)
+        long['change_pct'] = np.where(prev_value > 0, long['change'] / prev_value * 100, 0.0)
+        
+        long = long.sort_values(['year', 'month', 'metric', 'value'],
+                                ascending=[True, True, True, False], kind='stable').reset_index(drop=True)
+        group = long.groupby(['year', 'month', 'metric'], sort=False)
+        for field in self.RANK_FIELDS:
+            long[f'rank_{field}'] = group[field].rank(method='first', ascending=False).astype('int32')
+        return long.drop(columns='period')
+
+    def _build_index(self) -> Tuple[Dict[Tuple[int, int, str], Tuple[int, int]], Dict[str, np.ndarray]]:
+        """Period slice boundaries and per-field descending sort orders"""
+        keys = self.table[['year', 'month', 'metric']]
+        boundaries = np.flatnonzero(keys.ne(keys.shift()).any(axis=1).to_numpy())
+        ends = np.append(boundaries[1:], len(self.table))
+        slices = {
+            (int(year), int(month), metric): (int(start), int(end))
+            for (year, month, metric), start, end in zip(
+                keys.iloc[boundaries].itertuples(index=False, name=None), boundaries, ends)
+        }
+        
+        group_codes = np.repeat(np.arange(len(boundaries)), ends - boundaries)
+        orders = {
+            field: np.lexsort((-self.table[field].to_numpy(), group_codes))
+            for field in self.RANK_FIELDS
+        }
+        return slices, orders
+
+    def period(self, year: int, month: int, metric: str) -> pd.DataFrame:
+        """All entities for a period and metric, highest value first"""
+        start, end = self._slices.get((int(year), int(month), metric), (0, 0))
+        return self.table.iloc[start:end]
+
+    def top(self, year: int, month: int, metric: str, n: int = 10,
+            by: str = 'value', ascending: bool = False) -> pd.DataFrame:
+        """Top (or bottom with ascending=True) n entities of a period ranked by value, change or change_pct"""
+        start, end = self._slices.get((int(year), int(month), metric), (0, 0))
+        order = self._orders[by][start:end]
+        picked = order[::-1][:n] if ascending else order[:n]
+        return self.table.iloc[picked]
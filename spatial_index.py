@@ -0,0 +1,123 @@
+# spatial_index.py - STRtree spatial index and contiguity graph for admin geometries
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import lazy_import
+
+shapely = lazy_import('shapely')
+sparse = lazy_import('scipy.sparse')
+
+
+class SpatialIndex:
+    """Spatial index over one geometry per entity, with a sparse neighbour (contiguity) matrix
+
+    Two entities are neighbours when their polygons touch or overlap (queen
+    contiguity), or lie within ``tolerance`` degrees of each other to absorb
+    slivers between digitized boundaries. Neighbourhood queries and spatial
+    lags are sparse matrix-vector products.
+    """
+
+    CACHE_DIR = 'data/cache'
+
+    def __init__(self, keys: List[str], geometries, tolerance: float = 0.0, cache_name: Optional[str] = None):
+        self.keys = list(keys)
+        self.geometries = np.asarray(geometries, dtype=object)
+        self.tolerance = tolerance
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.tree = shapely.STRtree(self.geometries)
+        self.adjacency = self._load_or_build_adjacency(cache_name)
+
+    @classmethod
+    def from_data(cls, data: pd.DataFrame, key_col: str, tolerance: float = 0.0,
+                  cache_name: Optional[str] = None) -> 'SpatialIndex':
+        """Build from a long (entity x month) frame using the first geometry of each entity"""
+        entities = data.drop_duplicates(key_col)
+        return cls(entities[key_col].tolist(), entities.geometry.values, tolerance, cache_name)
+
+    # === ADJACENCY ===
+
+    def _geometry_hash(self) -> str:
+        """Hash of keys, geometries and tolerance - identifies a cached adjacency file"""
+        digest = hashlib.sha1(repr(self.tolerance).encode())
+        digest.update('\x1f'.join(map(str, self.keys)).encode())
+        for wkb in shapely.to_wkb(self.geometries):
+            digest.update(wkb if wkb is not None else b'')
+        return digest.hexdigest()[:16]
+
+    def _load_or_build_adjacency(self, cache_name: Optional[str]) -> sparse.csr_matrix:
+        """Read the adjacency matrix from the disk cache, building and saving it on a miss"""
+        if not cache_name:
+            return self._build_adjacency()
+
+        cache_path = os.path.join(self.CACHE_DIR, f"{cache_name}_adjacency_{self._geometry_hash()}.npz")
+        if os.path.exists(cache_path):
+            try:
+                return sparse.load_npz(cache_path).tocsr()
+            except (OSError, ValueError):
+                pass  # Corrupt cache file - rebuild below
+
+        adjacency = self._build_adjacency()
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            sparse.save_npz(cache_path, adjacency)
+        except OSError:
+            pass  # Read-only deployments just rebuild per process
+        return adjacency
+
+    def _build_adjacency(self) -> sparse.csr_matrix:
+        """One bulk tree query for all geometries -> symmetric binary matrix without self-links"""
+        if self.tolerance > 0:
+            left, right = self.tree.query(self.geometries, predicate='dwithin', distance=self.tolerance)
+        else:
+            left, right = self.tree.query(self.geometries, predicate='intersects')
+
+        off_diagonal = left != right
+        left, right = left[off_diagonal], right[off_diagonal]
+        n = len(self.keys)
+        adjacency = sparse.csr_matrix((np.ones(len(left), dtype=np.float64), (left, right)), shape=(n, n))
+
+        # Symmetrize and collapse duplicate pairs to 1
+        adjacency = ((adjacency + adjacency.T) > 0).astype(np.float64)
+        return adjacency.tocsr()
+
+    # === QUERIES ===
+
+    @property
+    def degree(self) -> np.ndarray:
+        """Number of neighbours of each entity"""
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    def row_standardized(self) -> sparse.csr_matrix:
+        """Weights matrix with each row summing to 1 (isolated entities keep an empty row)"""
+        degree = self.degree
+        inverse = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+        return sparse.diags(inverse) @ self.adjacency
+
+    def neighbors(self, key: str) -> List[str]:
+        """Keys of the entities adjacent to key"""
+        row = self.adjacency.getrow(self.positions[key])
+        return [self.keys[i] for i in row.indices]
+
+    def spatial_lag(self, values: np.ndarray, standardize: bool = True) -> np.ndarray:
+        """Neighbour average (or sum) of values - values is (n,) or (n, k) aligned with self.keys"""
+        weights = self.row_standardized() if standardize else self.adjacency
+        return weights @ np.asarray(values, dtype=np.float64)
+
+    def count_neighbors_where(self, mask: np.ndarray) -> np.ndarray:
+        """How many neighbours of each entity satisfy a boolean mask (e.g. 'cases rising')"""
+        return self.adjacency @ np.asarray(mask, dtype=np.float64)
+
+    def query(self, geometry, predicate: str = 'intersects') -> List[str]:
+        """Keys of entities whose geometry satisfies predicate against an arbitrary geometry"""
+        return [self.keys[i] for i in self.tree.query(geometry, predicate=predicate)]
+
+    def align(self, series: pd.Series) -> np.ndarray:
+        """Reorder an entity-indexed series to the index order (missing entities -> NaN)"""
+        return series.reindex(self.keys).to_numpy(dtype=np.float64)
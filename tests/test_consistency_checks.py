@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from consistency_checks import AggregationConsistencyChecker
+
+
+def make_sectors(march_cases=10):
+    return pd.DataFrame({
+        'year': [2024, 2024, 2024, 2024],
+        'month': [2, 2, 3, 3],
+        'District': ['Alpha', 'Alpha', 'Alpha', 'Alpha'],
+        'Sector': ['North', 'South', 'North', 'South'],
+        'Simple malaria cases': [30, 20, march_cases, 15],
+        'Population': [600, 400, 600, 400],
+    })
+
+
+def make_districts():
+    return pd.DataFrame({
+        'year': [2024, 2024],
+        'month': [2, 3],
+        'Province': ['East', 'East'],
+        'District': ['Alpha', 'Alpha'],
+        'all cases': [50, 25],
+        'Population': [1000, 1000],
+    })
+
+
+@pytest.fixture
+def checker():
+    return AggregationConsistencyChecker()
+
+
+def test_consistent_months_have_no_discrepancies(checker):
+    report = checker.check(make_sectors(), make_districts())
+
+    assert list(report['sector_cases']) == [50, 25]
+    assert list(report['sectors_reporting']) == [2, 2]
+    assert not report['has_discrepancy'].any()
+    assert checker.summary() == {'months_checked': 2, 'district_months': 2, 'discrepancies': 0,
+                                 'cases_exceed_district': 0, 'population_mismatch': 0}
+
+
+def test_sector_cases_above_district_are_flagged(checker):
+    checker.check(make_sectors(march_cases=30), make_districts())
+
+    flagged = checker.discrepancies()
+    assert list(zip(flagged['year'], flagged['month'])) == [(2024, 3)]
+    assert flagged.loc[0, 'cases_exceed_district']
+    assert flagged.loc[0, 'cases_diff'] == 20
+    assert checker.summary()['cases_exceed_district'] == 1
+
+
+def test_only_changed_months_are_recomputed(checker):
+    checker.check(make_sectors(), make_districts())
+    checker.check(make_sectors(march_cases=12), make_districts())
+
+    assert checker.last_recomputed == [(2024, 3)]
+    assert list(checker.district_report()['sector_cases']) == [50, 27]
+
+
+def test_missing_district_rows_and_province_rollup(checker):
+    districts = make_districts().iloc[:1]
+    checker.check(make_sectors(), districts)
+
+    report = checker.district_report()
+    assert list(report['missing_in_district_file']) == [False, True]
+    provinces = checker.province_report()
+    assert list(provinces['Province']) == ['East', 'East']
+    assert provinces.loc[1, 'missing_in_district_file']
+
+
+def test_empty_summary_has_the_same_keys(checker):
+    empty = checker.summary()
+    checker.check(make_sectors(), make_districts())
+
+    assert set(empty) == set(checker.summary())
+    assert all(value == 0 for value in empty.values())
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from data_export import SliceExporter, get_export_formats
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({
+        'District': ['A', 'B'], 'year': [2024, 2024], 'month': [1, 1],
+        'Population': [1000, 2000], 'all cases': [10, 20],
+    })
+
+
+def test_geojson_is_not_offered_without_geometry(data):
+    assert 'geojson' not in get_export_formats(data)
+    assert 'csv' in get_export_formats(data)
+    assert 'geojson' in get_export_formats()
+
+
+def test_geojson_export_without_geometry_raises(data):
+    exporter = SliceExporter(data, 'District')
+    with pytest.raises(ValueError, match='geometry'):
+        exporter.iter_export('geojson', (2024, 1), (2024, 1), ['all cases'])
+    csv = b''.join(exporter.iter_export('csv', (2024, 1), (2024, 1), ['all cases'])).decode()
+    assert csv.splitlines()[0] == 'year,month,District,Population,all cases'
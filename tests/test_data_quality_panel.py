@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+from streamlit.testing.v1 import AppTest
+
+import data_loader
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'main_simplified.py')
+
+
+@pytest.fixture
+def dirty_districts(tmp_path, monkeypatch):
+    # A copy of the district file with one issue of each common kind
+    data = pd.read_csv(os.path.join(ROOT, 'data', 'district_malaria_data.csv'), dtype=str)
+    data.loc[0, 'Date'] = 'not a date'
+    data.loc[1, 'all cases'] = 'n/a'
+    data.loc[2, 'Severe cases/Deaths'] = '-3'
+    path = tmp_path / 'dirty_district_malaria_data.csv'
+    data.to_csv(path, index=False)
+
+    geometry_file = os.path.join(ROOT, 'data', 'district_geometries.geojson')
+    monkeypatch.setattr(data_loader.MalariaDataLoader, '__init__',
+                        lambda self: data_loader.BaseDataLoader.__init__(self, str(path), geometry_file))
+    yield path
+
+    # Publishing saved a manifest for the copy next to the real ones
+    manifest = os.path.join('data', 'cache', 'manifests', f'{path.stem}.json')
+    if os.path.exists(manifest):
+        os.remove(manifest)
+
+
+def test_data_quality_panel_renders_issues(dirty_districts):
+    app = AppTest.from_file(APP, default_timeout=180).run()
+
+    assert not app.exception
+    panel = next(expander for expander in app.sidebar.expander if 'Data quality' in expander.label)
+    assert panel.label.startswith('❌')
+    text = '\n'.join(markdown.value for markdown in panel.markdown)
+    assert '| severity | column | count | message | examples |' in text
+    assert 'not a date' in text
+    assert 'Affected rows by month' in text
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from data_validation import DataValidationError, DataValidator
+
+
+@pytest.fixture
+def validator():
+    return DataValidator(entity_columns=['District'], count_columns=['all cases'],
+                         rate_columns={'all cases incidence': 'all cases'})
+
+
+def make_raw(**overrides):
+    raw = pd.DataFrame({
+        'Date': ['2024-01-01', '2024-02-01', '2024-01-01', '2024-02-01'],
+        'District': ['Bugesera', 'Bugesera', 'Gasabo', 'Gasabo'],
+        'Population': [1000, 1000, 2000, 2000],
+        'all cases': [10, 20, 40, 60],
+        'all cases incidence': [10.0, 20.0, 20.0, 30.0],
+    })
+    for column, values in overrides.items():
+        raw[column] = values
+    return raw
+
+
+def test_clean_file(validator):
+    report = validator.validate(make_raw(), 'districts.csv')
+
+    assert report.is_clean and not report.has_errors
+    assert report.rows_checked == 4
+    assert report.summary() == {}
+    assert report.by_month.empty
+
+
+def test_missing_required_columns_raise(validator):
+    with pytest.raises(DataValidationError, match='Population') as excinfo:
+        validator.validate(make_raw().drop(columns=['Population']))
+    assert excinfo.value.report.count('missing_columns') == 1
+
+
+def test_rate_columns_are_optional(validator):
+    assert validator.validate(make_raw().drop(columns=['all cases incidence'])).is_clean
+
+
+def test_row_level_issues_are_counted_and_broken_down_by_month(validator):
+    raw = make_raw(**{
+        'Date': ['2024-01-01', 'not a date', '2024-01-01', '2024-02-01'],
+        'all cases': [10, 20, 'n/a', -5],
+        'all cases incidence': [10.0, 20.0, 20.0, 99.0],
+    })
+    report = validator.validate(raw)
+
+    assert report.has_errors
+    assert report.count('invalid_date') == 1
+    assert report.count('coerced_to_zero') == 1
+    assert report.count('negative_count') == 1
+    # Only Gasabo February - the 'n/a' row has no expected rate to compare against
+    assert report.count('rate_mismatch') == 1
+    assert report.to_frame().set_index('check').loc['coerced_to_zero', 'examples'] == 'n/a'
+
+    by_month = report.by_month
+    assert list(by_month.index) == [(2024, 1), (2024, 2)]
+    assert by_month.loc[(2024, 1), 'coerced:all cases'] == 1
+    assert by_month.loc[(2024, 2), 'negative:all cases'] == 1
+
+
+def test_duplicate_entity_months(validator):
+    raw = make_raw(Date=['2024-01-01', '2024-01-15', '2024-01-01', '2024-02-01'])
+    report = validator.validate(raw)
+
+    assert report.count('duplicate_row') == 2
+    assert report.errors()[0]['examples'] == ['Bugesera / 2024-01']
+
+
+def test_geometry_keys_missing_on_either_side(validator):
+    report = validator.validate(make_raw())
+    geometries = pd.DataFrame({'District': ['Bugesera', 'Nyarugenge']})
+    validator.check_geometry_keys(report, make_raw(), geometries)
+
+    assert report.count('no_geometry') == 1 and report.count('no_data') == 1
+    assert not report.has_errors
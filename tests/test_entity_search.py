@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from entity_search import EntitySearchIndex, normalize_name
+
+
+@pytest.fixture
+def index():
+    data = pd.DataFrame({
+        'Province': ['Northern', 'Northern', 'Northern', 'Kigali', 'Kigali'],
+        'District': ['Musanze', 'Musanze', 'Burera', 'Gasabo', 'Gasabo'],
+        'Sector': ['Muhoza', 'Kinigi', 'Bungwe', 'Kimihurura', 'Remera'],
+    })
+    data['sector_display'] = data['Sector'] + ' (' + data['District'] + ')'
+    # Repeated months of the same sector are one entity
+    data = pd.concat([data, data.iloc[:2]], ignore_index=True)
+    return EntitySearchIndex(data, 'sector_display', 'Sector')
+
+
+def test_normalize_name_strips_accents_and_punctuation():
+    assert normalize_name('  Nyarugenge-Ville, Rwamagana ') == 'nyarugenge ville rwamagana'
+    assert normalize_name('Kinigí') == 'kinigi'
+
+
+def test_empty_query_lists_entities_in_key_order(index):
+    assert len(index) == 5
+    assert index.search('') == ['Bungwe (Burera)', 'Kimihurura (Gasabo)', 'Kinigi (Musanze)',
+                                'Muhoza (Musanze)', 'Remera (Gasabo)']
+    assert index.search('', limit=2) == ['Bungwe (Burera)', 'Kimihurura (Gasabo)']
+
+
+def test_own_name_ranks_before_parent_matches(index):
+    # 'mu' prefixes the sector Muhoza and the district Musanze
+    assert index.search('mu') == ['Muhoza (Musanze)', 'Kinigi (Musanze)']
+    assert index.search('kin') == ['Kinigi (Musanze)']
+    assert index.search('northern') == ['Bungwe (Burera)', 'Kinigi (Musanze)', 'Muhoza (Musanze)']
+
+
+def test_misspelled_query_falls_back_to_fuzzy_matching(index):
+    assert index.search('kimihurra') == ['Kimihurura (Gasabo)']
+    assert index.search('zzzz') == []
+
+
+def test_search_and_drill_down_respect_province_and_district(index):
+    assert index.get_provinces() == ['Kigali', 'Northern']
+    assert index.get_districts('Northern') == ['Burera', 'Musanze']
+    assert index.get_entities(district='Gasabo') == ['Kimihurura (Gasabo)', 'Remera (Gasabo)']
+    assert index.search('kim', province='Kigali') == ['Kimihurura (Gasabo)']
+    assert index.search('', province='Northern', district='Burera') == ['Bungwe (Burera)']
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from hotspot_analysis import HotspotAnalyzer
+from spatial_index import SpatialIndex
+
+
+@pytest.fixture
+def index():
+    # 3x3 lattice of unit squares plus one isolated square far to the east
+    keys = [f'{row}{col}' for row in 'abc' for col in '123'] + ['z']
+    cells = [shapely.box(col, row, col + 1, row + 1) for row in range(3) for col in range(3)]
+    return SpatialIndex(keys, cells + [shapely.box(10, 10, 11, 11)])
+
+
+@pytest.fixture
+def data(index):
+    rng = np.random.default_rng(7)
+    rows = [(key, 2024, month, float(value))
+            for month in (1, 2) for key, value in zip(index.keys, rng.integers(1, 100, len(index.keys)))]
+    return pd.DataFrame(rows, columns=['Sector', 'year', 'month', 'cases'])
+
+
+def test_gi_star_z_matches_closed_form(index, data):
+    analyzer = HotspotAnalyzer(index, permutations=19)
+    january = data[data['month'] == 1].set_index('Sector')['cases']
+    x = index.align(january)
+    n = len(x)
+    weights = index.adjacency.toarray() + np.eye(n)
+
+    x_bar, s = x.mean(), np.sqrt((x ** 2).mean() - x.mean() ** 2)
+    w_sum = weights.sum(axis=1)
+    expected = (weights @ x - x_bar * w_sum) / (s * np.sqrt((n * (weights ** 2).sum(axis=1) - w_sum ** 2) / (n - 1)))
+
+    table = analyzer.analyze(data, 'Sector', 'cases')
+    observed = table[table['month'] == 1].set_index('Sector')['gi_z'].reindex(index.keys)
+    assert observed.to_numpy() == pytest.approx(expected)
+
+
+def test_draws_skip_self_and_take_degree_neighbours(index):
+    analyzer = HotspotAnalyzer(index, permutations=50)
+    draws, mask = analyzer._neighbor_draws, analyzer._draw_mask
+    for i, degree in enumerate(analyzer.degree):
+        assert mask[i].sum() == degree
+        for p in range(analyzer.permutations):
+            drawn = draws[p, i][mask[i]]
+            assert i not in drawn
+            assert len(set(drawn)) == degree
+            assert drawn.max(initial=0) < len(index.keys)
+
+
+def test_p_values_lie_between_one_over_p_plus_one_and_one(index, data):
+    analyzer = HotspotAnalyzer(index, permutations=19)
+    table = analyzer.analyze(data, 'Sector', 'cases')
+    for column in ('moran_p', 'gi_p'):
+        assert table[column].between(1 / 20, 1).all()
+
+
+def test_isolated_entities_and_constant_months_are_not_significant(index, data):
+    data.loc[data['month'] == 2, 'cases'] = 5.0
+    table = HotspotAnalyzer(index, permutations=19).analyze(data, 'Sector', 'cases')
+
+    isolated = table[table['Sector'] == 'z']
+    assert (isolated[['moran_p', 'gi_p']] == 1).all().all()
+    constant = table[table['month'] == 2]
+    assert (constant[['moran_p', 'gi_p']] == 1).all().all()
+    assert (constant['hotspot'] == 'Not significant').all()
+
+
+def test_missing_entity_months_are_dropped(index, data):
+    data = data[~((data['Sector'] == 'b2') & (data['month'] == 2))]
+    table = HotspotAnalyzer(index, permutations=19).analyze(data, 'Sector', 'cases')
+
+    assert len(table) == len(data)
+    assert table[(table['Sector'] == 'b2')]['month'].tolist() == [1]
+    # The gap is filled with the monthly mean, so the other values are unchanged
+    february = table[table['month'] == 2].set_index('Sector')['value']
+    assert february.to_dict() == data[data['month'] == 2].set_index('Sector')['cases'].to_dict()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metric_registry import METRIC_REGISTRY, Metric
+
+
+@pytest.fixture
+def districts():
+    return pd.DataFrame({
+        'all cases': [10, 30, 5],
+        'Severe cases/Deaths': [1, 0, 2],
+        'Population': [1000, 2000, 0],
+        'all cases incidence': [99.0, 99.0, 99.0],  # stale values from the file
+    })
+
+
+def test_derive_recomputes_every_rate_in_place(districts):
+    result = METRIC_REGISTRY.derive(districts, 'Districts')
+
+    assert result is districts
+    np.testing.assert_allclose(districts['all cases incidence'], [10.0, 15.0, 0.0])
+    np.testing.assert_allclose(districts['Severe cases/Deaths incidence'], [1.0, 0.0, 0.0])
+
+
+def test_derive_skips_rates_without_their_count_column():
+    data = pd.DataFrame({'all cases': [4], 'Population': [2000]})
+    METRIC_REGISTRY.derive(data, 'Districts')
+    assert list(data.columns) == ['all cases', 'Population', 'all cases incidence']
+
+
+def test_aggregation_rules(districts):
+    level = 'Districts'
+    assert METRIC_REGISTRY.get(level, 'all cases').aggregate(districts) == 45
+    # Population-weighted: 45 cases / 3,000 people, not the mean of the row rates
+    assert METRIC_REGISTRY.get(level, 'all cases incidence').aggregate(districts) == pytest.approx(15.0)
+    assert METRIC_REGISTRY.get(level, 'Population').aggregate(districts) == pytest.approx(1000)
+    assert METRIC_REGISTRY.get(level, 'all cases incidence').aggregate(districts.iloc[2:]) == 0.0
+
+    with pytest.raises(ValueError):
+        Metric('x', 'X', aggregation='median').aggregate(districts)
+
+
+def test_selector_and_source_columns():
+    assert [metric.column for metric in METRIC_REGISTRY.selectable('Districts')] == [
+        'all cases', 'all cases incidence', 'Severe cases/Deaths']
+    assert METRIC_REGISTRY.source_columns('Sectors') == ['Simple malaria cases', 'Population']
+    assert METRIC_REGISTRY.rate_columns('Sectors') == {'incidence': 'Simple malaria cases'}
+    assert METRIC_REGISTRY.level_for_columns(['Simple malaria cases', 'Population']) == 'Sectors'
+    assert METRIC_REGISTRY.level_for_columns(['Population']) is None
+
+
+def test_unknown_level_raises_instead_of_falling_back_to_districts():
+    with pytest.raises(KeyError, match="'Districts', 'Sectors'"):
+        METRIC_REGISTRY.get('sectors', 'incidence')
+    with pytest.raises(KeyError, match='Unknown dashboard level'):
+        METRIC_REGISTRY.columns('Provinces')
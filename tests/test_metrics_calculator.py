@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_visualizations import ChartVisualizations
+from metrics_calculator import MetricsCalculator
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({
+        'District': [f'D{i}' for i in range(8)] * 2,
+        'year': [2023] * 8 + [2024] * 8,
+        'month': [6] * 16,
+        'all cases': rng.integers(0, 500, 16).astype(float),
+        'Severe cases/Deaths': rng.integers(0, 20, 16).astype(float),
+        'Population': rng.integers(1000, 5000, 16).astype(float),
+    })
+    frame['Severe cases/Deaths incidence'] = frame['Severe cases/Deaths'] / frame['Population'] * 1000
+    return frame
+
+
+def test_color_breaks_come_from_the_stats_table(data):
+    calculator = MetricsCalculator('Districts')
+    breaks = calculator.get_color_breaks(data, 2024, 'all cases')
+    expected = np.percentile(data.loc[data['year'] == 2024, 'all cases'], [20, 40, 60, 80])
+    assert breaks == pytest.approx(expected)
+
+
+def test_color_breaks_fall_back_for_metrics_outside_the_stats_table(data):
+    calculator = MetricsCalculator('Districts')
+    # Not selectable, so the stats table has no row for it
+    breaks = calculator.get_color_breaks(data, 2023, 'Severe cases/Deaths incidence')
+    expected = np.percentile(data.loc[data['year'] == 2023, 'Severe cases/Deaths incidence'], [20, 40, 60, 80])
+    assert breaks == pytest.approx(expected)
+
+
+def test_color_breaks_of_a_year_without_data_are_empty(data):
+    assert MetricsCalculator('Districts').get_color_breaks(data, 2031, 'all cases') == []
+
+
+@pytest.fixture
+def scatter_data():
+    # Shuffled, non-Range index; one negative point per month; May has no non-negative points
+    frame = pd.DataFrame({
+        'District': ['A', 'B', 'C', 'D', 'E'] * 3,
+        'year': [2024] * 15,
+        'month': [3] * 5 + [4] * 5 + [5] * 5,
+        'all cases': [10, 50, -1, 30, 20, 5, 15, 25, 35, -1, -1, -2, -1, -3, -1],
+        'Severe cases/Deaths': [4, 1, 9, 3, 2, 7, 1, 2, -1, 3, 1, 1, 1, 1, 1],
+    }, index=np.arange(15)[::-1] * 10)
+    return frame
+
+
+def test_scatter_thresholds_are_75th_percentiles_of_non_negative_points(scatter_data):
+    stats = MetricsCalculator('Districts').get_scatter_stats(scatter_data, 'all cases', 'Severe cases/Deaths')
+    for month in (3, 4):
+        period = scatter_data[(scatter_data['month'] == month)
+                              & (scatter_data['all cases'] >= 0) & (scatter_data['Severe cases/Deaths'] >= 0)]
+        row = stats.loc[(2024, month)]
+        assert row['x_threshold'] == pytest.approx(np.percentile(period['all cases'], 75))
+        assert row['y_threshold'] == pytest.approx(np.percentile(period['Severe cases/Deaths'], 75))
+        assert row['points'] == len(period)
+
+
+def test_scatter_highlight_rows_are_positions_in_data(scatter_data):
+    stats = MetricsCalculator('Districts').get_scatter_stats(scatter_data, 'all cases', 'Severe cases/Deaths')
+    march, april = stats.loc[(2024, 3)], stats.loc[(2024, 4)]
+    assert scatter_data.iloc[int(march['x_max_row'])]['District'] == 'B'
+    assert scatter_data.iloc[int(march['y_max_row'])]['District'] == 'A'  # C has 9 but negative cases
+    assert scatter_data.iloc[int(april['x_max_row'])]['District'] == 'C'  # D has 35 but negative severe
+    assert scatter_data.iloc[int(april['y_max_row'])]['District'] == 'A'
+
+
+def test_period_without_non_negative_points_has_no_scatterplot(scatter_data):
+    calculator = MetricsCalculator('Districts')
+    assert (2024, 5) not in calculator.get_scatter_stats(scatter_data, 'all cases', 'Severe cases/Deaths').index
+    chart_viz = ChartVisualizations('Districts', calculator)
+    assert chart_viz.create_scatterplot(scatter_data, 2024, 5) == (None, None, None)
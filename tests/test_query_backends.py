@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from query_backends import SQLQueryBackend, SQLRangeIndex, SQLRankTable, duckdb_available
+from range_queries import PeriodRangeIndex
+from rank_tables import RankTable
+
+ENGINES = ['sqlite', pytest.param('duckdb', marks=pytest.mark.skipif(not duckdb_available(),
+                                                                    reason='duckdb not installed'))]
+COLUMNS = ['District', 'row', 'value', 'change', 'change_pct']
+RATES = {'all cases incidence': 'all cases'}
+
+
+@pytest.fixture
+def data():
+    # D skips March, so its April change has no previous month; values and changes have no ties
+    rows = [
+        ('A', 2024, 1, 10, 1000), ('B', 2024, 1, 20, 2000), ('C', 2024, 1, 35, 500), ('D', 2024, 1, 4, 800),
+        ('A', 2024, 2, 31, 1000), ('B', 2024, 2, 18, 2000), ('C', 2024, 2, 40, 500), ('D', 2024, 2, 12, 800),
+        ('A', 2024, 3, 25, 1100), ('B', 2024, 3, 45, 2100), ('C', 2024, 3, 33, 600),
+        ('A', 2024, 4, 60, 1100), ('B', 2024, 4, 41, 2100), ('C', 2024, 4, 34, 600), ('D', 2024, 4, 7, 900),
+    ]
+    return pd.DataFrame(rows, columns=['District', 'year', 'month', 'all cases', 'Population'])
+
+
+@pytest.fixture(params=ENGINES)
+def backend(request, data, tmp_path):
+    return SQLQueryBackend.open(request.param, data, 'test@0001', directory=str(tmp_path))
+
+
+def test_top_matches_rank_table(backend, data):
+    expected = RankTable(data, 'District', ['all cases'])
+    table = SQLRankTable(backend, 'District', ['all cases', 'missing column'])
+    assert table.metrics == ['all cases']
+
+    for month in (1, 2, 3, 4):
+        # Every change in January is 0, so only the value ranking is defined there
+        fields = ('value',) if month == 1 else RankTable.RANK_FIELDS
+        for by in fields:
+            for ascending in (False, True):
+                for n in (2, 10):
+                    got = table.top(2024, month, 'all cases', n, by=by, ascending=ascending)
+                    want = expected.top(2024, month, 'all cases', n, by=by, ascending=ascending)
+                    pd.testing.assert_frame_equal(got[COLUMNS].reset_index(drop=True),
+                                                  want[COLUMNS].reset_index(drop=True), check_dtype=False)
+
+
+def test_period_matches_rank_table(backend, data):
+    expected = RankTable(data, 'District', ['all cases']).period(2024, 4, 'all cases')
+    got = SQLRankTable(backend, 'District', ['all cases']).period(2024, 4, 'all cases')
+    pd.testing.assert_frame_equal(got[COLUMNS], expected[COLUMNS].reset_index(drop=True), check_dtype=False)
+    assert got.set_index('District').loc['D', 'change'] == 0
+
+
+@pytest.mark.parametrize('start, end', [
+    ((2024, 1), (2024, 4)),
+    ((2024, 3), (2024, 3)),
+    ((2023, 6), (2024, 2)),
+    ((2025, 1), (2025, 3)),  # entirely after the data
+])
+def test_range_frame_matches_period_range_index(backend, data, start, end):
+    expected = PeriodRangeIndex(data, 'District', ['all cases'])
+    index = SQLRangeIndex(backend, 'District', ['all cases', 'missing column'])
+    assert index.sum_columns == ['all cases']
+    assert index.clip(start, end) == expected.clip(start, end)
+
+    got = index.range_frame(start, end, RATES)
+    want = expected.range_frame(start, end, RATES)
+    assert list(got.columns) == list(want.columns)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
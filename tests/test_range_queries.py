@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from range_queries import PeriodRangeIndex, format_period_span, previous_window, resolve_period
+
+
+@pytest.fixture
+def index():
+    # B has no row for 2023-12, C only reports in 2024-02
+    data = pd.DataFrame({
+        'District': ['A', 'A', 'A', 'B', 'B', 'C'],
+        'year': [2023, 2024, 2024, 2023, 2024, 2024],
+        'month': [12, 1, 2, 11, 2, 2],
+        'all cases': [10, 20, 30, 5, 15, 8],
+        'Population': [1000, 1000, 2000, 500, 1500, 400],
+    })
+    return PeriodRangeIndex(data, 'District', ['all cases', 'missing column'])
+
+
+def test_range_sum_per_entity(index):
+    assert index.entities == ['A', 'B', 'C']
+    assert index.sum_columns == ['all cases']
+    np.testing.assert_array_equal(index.range_sum('all cases', (2023, 12), (2024, 1)), [30, 0, 0])
+    np.testing.assert_array_equal(index.range_sum('all cases', (2023, 11), (2024, 2)), [60, 20, 8])
+
+
+def test_range_frame_weights_incidence_by_average_population(index):
+    frame = index.range_frame((2024, 1), (2024, 2), {'all cases incidence': 'all cases'}).set_index('District')
+
+    assert list(frame.index) == ['A', 'B', 'C']
+    assert list(frame['months_reported']) == [2, 1, 1]
+    assert frame.loc['A', 'all cases'] == 50
+    assert frame.loc['A', 'Population'] == 1500
+    assert frame.loc['A', 'all cases incidence'] == pytest.approx(50 * 1000 / 1500)
+    assert frame.loc['B', 'all cases incidence'] == pytest.approx(15 * 1000 / 1500)
+
+
+def test_range_frame_drops_entities_without_rows(index):
+    frame = index.range_frame((2023, 11), (2023, 11))
+    assert list(frame['District']) == ['B']
+
+
+def test_windows_outside_the_data_are_clipped(index):
+    assert index.clip((2020, 1), (2030, 6)) == ((2023, 11), (2024, 2))
+    np.testing.assert_array_equal(index.range_sum('all cases', (2020, 1), (2030, 6)), [60, 20, 8])
+    np.testing.assert_array_equal(index.range_sum('all cases', (2025, 1), (2025, 3)), [0, 0, 0])
+    assert index.range_frame((2025, 1), (2025, 3)).empty
+
+
+def test_resolve_period_and_previous_window():
+    assert resolve_period('quarter', 2024, 5) == ((2024, 4), (2024, 6), 'Q2 2024')
+    assert resolve_period('season', 2024, 1) == ((2023, 12), (2024, 2), 'Short dry season 2023/24')
+    assert resolve_period('fiscal_year', 2024, 3) == ((2023, 7), (2024, 6), 'FY 2023/24')
+    assert resolve_period('trailing_12', 2024, 3)[:2] == ((2023, 4), (2024, 3))
+    assert previous_window((2024, 1), (2024, 3)) == ((2023, 10), (2023, 12))
+    assert format_period_span((2023, 12), (2024, 2)) == 'Dec 2023-Feb 2024'
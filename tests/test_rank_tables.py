@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from rank_tables import RankTable
+
+
+@pytest.fixture
+def data():
+    # Entity C skips March, so its April change has no previous month
+    rows = [
+        ('A', 2024, 2, 10), ('B', 2024, 2, 20), ('C', 2024, 2, 5),
+        ('A', 2024, 3, 30), ('B', 2024, 3, 15), ('C', 2024, 4, 50),
+        ('A', 2024, 4, 25), ('B', 2024, 4, 40),
+    ]
+    return pd.DataFrame(rows, columns=['District', 'year', 'month', 'all cases'])
+
+
+def test_period_is_sorted_by_value_and_points_at_source_rows(data):
+    table = RankTable(data, 'District', ['all cases'])
+    period = table.period(2024, 3, 'all cases')
+    assert period['District'].tolist() == ['A', 'B']
+    assert data.iloc[period['row']]['all cases'].tolist() == [30, 15]
+
+
+def test_change_only_against_the_immediately_preceding_month(data):
+    table = RankTable(data, 'District', ['all cases'])
+    april = table.period(2024, 4, 'all cases').set_index('District')
+    assert april.loc['A', 'change'] == -5
+    assert april.loc['B', 'change'] == 25
+    assert april.loc['B', 'change_pct'] == pytest.approx(25 / 15 * 100)
+    assert april.loc['C', 'change'] == 0
+    assert april.loc['C', 'change_pct'] == 0
+
+
+def test_top_by_field_and_bottom(data):
+    table = RankTable(data, 'District', ['all cases'])
+    assert table.top(2024, 4, 'all cases', 2)['District'].tolist() == ['C', 'B']
+    assert table.top(2024, 4, 'all cases', 1, by='change')['District'].tolist() == ['B']
+    assert table.top(2024, 4, 'all cases', 1, by='change', ascending=True)['District'].tolist() == ['A']
+
+
+def test_unknown_period_and_missing_metric(data):
+    table = RankTable(data, 'District', ['all cases', 'incidence'])
+    assert table.metrics == ['all cases']
+    assert table.top(2030, 1, 'all cases').empty
@@ -0,0 +1,138 @@
+import threading
+import time
+
+from view_cache import LRUCache, SingleFlight
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def start_callers(count, call):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(call())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_callers_share_one_computation():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    threads, results, errors = start_callers(4, lambda: flights.do('key', compute))
+    wait_until(lambda: flights.stats()['coalesced'] == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors and len(calls) == 1
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    stats = flights.stats()
+    assert stats['computations'] == 1 and stats['max_waiters'] == 3 and stats['in_flight'] == 0
+
+
+def test_failure_is_raised_in_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise ValueError('boom')
+
+    threads, results, errors = start_callers(3, lambda: flights.do('key', compute))
+    wait_until(lambda: flights.stats()['coalesced'] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not results
+    assert len(errors) == 3 and all(isinstance(error, ValueError) for error in errors)
+    assert flights.stats()['failures'] == 1
+
+
+def test_nothing_is_kept_after_a_flight_lands():
+    flights = SingleFlight()
+    assert flights.do('key', lambda: 1) == 1
+    assert flights.do('key', lambda: 2) == 2
+    assert flights.stats()['computations'] == 2 and flights.stats()['coalesced'] == 0
+
+
+def test_cache_misses_on_one_key_compute_once():
+    cache = LRUCache(max_entries=2)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    threads, results, errors = start_callers(3, lambda: cache.get_or_compute('key', compute))
+    wait_until(lambda: cache.stats()['coalesced'] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 3 and len(calls) == 1
+    assert cache.get('key') == 'value'
+
+
+def test_value_computed_across_an_invalidation_is_not_stored():
+    cache = LRUCache()
+
+    def compute():
+        cache.clear()  # e.g. a new dataset version published mid-computation
+        return 'stale'
+
+    assert cache.get_or_compute('key', compute) == 'stale'
+    assert cache.get('key') is None
+
+
+def test_lru_eviction():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_discard_where_drops_matching_keys():
+    cache = LRUCache()
+    for key in [('old', 1), ('old', 2), ('new', 1)]:
+        cache.put(key, key)
+
+    assert cache.discard_where(lambda key: 'old' in key) == 2
+    assert cache.get(('new', 1)) == ('new', 1)
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flights = SingleFlight()
+    release = threading.Event()
+    threads, _, _ = start_callers(1, lambda: flights.do('slow', lambda: release.wait(5)))
+    wait_until(lambda: flights.stats()['in_flight'] == 1)
+
+    assert flights.do('other', lambda: 'fast') == 'fast'
+    release.set()
+    for thread in threads:
+        thread.join()
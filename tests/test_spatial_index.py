@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import shapely
+
+from spatial_index import SpatialIndex
+
+
+def grid(size=3):
+    keys = [f'{row}{col}' for row in range(size) for col in range(size)]
+    return keys, [shapely.box(col, row, col + 1, row + 1) for row in range(size) for col in range(size)]
+
+
+@pytest.fixture
+def index():
+    keys, cells = grid()
+    # One square far away from the grid has no neighbours
+    return SpatialIndex(keys + ['far'], cells + [shapely.box(10, 10, 11, 11)])
+
+
+def test_queen_adjacency_of_a_square_grid(index):
+    adjacency = index.adjacency.toarray()
+    assert (adjacency == adjacency.T).all()
+    assert (np.diag(adjacency) == 0).all()
+    # Corners touch 3 cells, edges 5, the centre all 8 (corner contact counts)
+    assert index.degree.tolist() == [3, 5, 3, 5, 8, 5, 3, 5, 3, 0]
+    assert sorted(index.neighbors('00')) == ['01', '10', '11']
+
+
+def test_row_standardized_rows_sum_to_one_except_isolated(index):
+    row_sums = np.asarray(index.row_standardized().sum(axis=1)).ravel()
+    assert row_sums[:9] == pytest.approx(np.ones(9))
+    assert row_sums[9] == 0
+
+
+def test_spatial_lag_matches_dense_product(index):
+    values = np.arange(10, dtype=np.float64) ** 2
+    dense = index.adjacency.toarray()
+    weights = np.divide(dense, dense.sum(axis=1, keepdims=True), out=np.zeros_like(dense),
+                        where=dense.sum(axis=1, keepdims=True) > 0)
+    assert index.spatial_lag(values) == pytest.approx(weights @ values)
+    assert index.spatial_lag(values, standardize=False) == pytest.approx(dense @ values)
+    assert index.spatial_lag(np.column_stack([values, -values])) == pytest.approx(
+        weights @ np.column_stack([values, -values]))
+
+
+def test_adjacency_cache_is_reused_and_invalidated_by_geometry(tmp_path, monkeypatch):
+    monkeypatch.setattr(SpatialIndex, 'CACHE_DIR', str(tmp_path))
+    keys, cells = grid()
+    first = SpatialIndex(keys, cells, cache_name='test')
+    cached = list(tmp_path.glob('test_adjacency_*.npz'))
+    assert len(cached) == 1
+
+    # A second index over the same geometries reads the file instead of querying the tree
+    monkeypatch.setattr(SpatialIndex, '_build_adjacency', lambda self: pytest.fail('cache not reused'))
+    second = SpatialIndex(keys, cells, cache_name='test')
+    assert (second.adjacency != first.adjacency).nnz == 0
+    monkeypatch.undo()
+    monkeypatch.setattr(SpatialIndex, 'CACHE_DIR', str(tmp_path))
+
+    # Moving one cell away changes the hash, so the adjacency is rebuilt and cached separately
+    moved = cells[:-1] + [shapely.box(10, 10, 11, 11)]
+    third = SpatialIndex(keys, moved, cache_name='test')
+    assert len(list(tmp_path.glob('test_adjacency_*.npz'))) == 2
+    assert third.degree[-1] == 0
+    assert third.degree.tolist() != first.degree.tolist()
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main_simplified.py')
+
+
+@pytest.fixture
+def trends_page():
+    app = AppTest.from_file(APP, default_timeout=180)
+    app.session_state['current_page'] = 'trends'
+    return app.run()
+
+
+def test_search_after_deselecting_a_default_entity(trends_page):
+    selection = trends_page.multiselect(key='trend_entities_districts')
+    first, *rest = selection.value
+    selection.unselect(first).run()
+
+    trends_page.text_input(key='entity_search_districts').input('musanz').run()
+
+    assert not trends_page.exception
+    selection = trends_page.multiselect(key='trend_entities_districts')
+    assert selection.value == rest
+    assert first not in selection.options
+    assert 'Musanze' in selection.options
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trend_series import TrendSeriesStore, lttb_indices
+
+
+def test_lttb_keeps_short_series_whole():
+    x = np.arange(5)
+    np.testing.assert_array_equal(lttb_indices(x, x, 10), np.arange(5))
+    np.testing.assert_array_equal(lttb_indices(x, x, 2), np.arange(5))
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[37], y[71] = 50.0, -40.0
+    kept = lttb_indices(x, y, 10)
+
+    assert len(kept) == 10
+    assert kept[0] == 0 and kept[-1] == 99
+    assert np.all(np.diff(kept) > 0)
+    assert 37 in kept and 71 in kept
+
+
+def test_lttb_ignores_missing_values():
+    x = np.arange(20, dtype=float)
+    y = np.where(x == 5, np.nan, x)
+    kept = lttb_indices(x, y, 6)
+    assert len(kept) == 6 and kept[-1] == 19
+
+
+@pytest.fixture
+def store():
+    # Rows deliberately out of order; B misses 2024-02
+    data = pd.DataFrame({
+        'District': ['B', 'A', 'A', 'B', 'A'],
+        'year': [2024, 2024, 2023, 2023, 2024],
+        'month': [3, 2, 12, 12, 1],
+        'all cases': [7, 3, 1, 5, 2],
+        'Province': ['East', 'East', 'East', 'East', 'East'],
+    })
+    return TrendSeriesStore(data, 'District', ['all cases', 'Province', 'not a column'])
+
+
+def test_store_slices_each_entity_in_month_order(store):
+    assert store.entities == ['A', 'B']
+    assert 'A' in store and 'C' not in store
+    assert len(store) == 5
+    assert store.columns == ['all cases', 'Province']
+
+    dates, values = store.series('A', ['all cases'])
+    assert list(pd.to_datetime(dates).strftime('%Y-%m')) == ['2023-12', '2024-01', '2024-02']
+    np.testing.assert_array_equal(values['all cases'], [1, 2, 3])
+
+    dates, values = store.series('B', ['all cases', 'Province'])
+    assert list(pd.to_datetime(dates).strftime('%Y-%m')) == ['2023-12', '2024-03']
+    assert list(values['Province']) == ['East', 'East']
+
+
+def test_store_downsamples_long_series():
+    months = pd.period_range('2015-01', periods=120, freq='M')
+    cases = np.ones(120)
+    cases[60] = 100
+    data = pd.DataFrame({'District': 'A', 'year': months.year, 'month': months.month, 'all cases': cases})
+    store = TrendSeriesStore(data, 'District', ['all cases'])
+
+    dates, values = store.series('A', ['all cases'], max_points=12)
+    assert len(dates) == len(values['all cases']) == 12
+    assert values['all cases'].max() == 100
+    assert len(store.series('A', ['all cases'], max_points=200)[0]) == 120
@@ -0,0 +1,24 @@
+from chart_visualizations import ChartVisualizations
+from data_loader import MalariaDataLoader
+from map_visualizations import MapVisualizations
+from metrics_calculator import MetricsCalculator
+from view_cache import FIGURE_CACHE
+from warmup import WarmupStatus, get_default_view, warm_level
+
+
+def test_dashboard_figures_are_served_from_the_warmed_cache():
+    status = WarmupStatus(['districts'])
+    warm_level('districts', status)
+    assert set(status.steps['districts']) == {'data', 'cards', 'trends', 'map', 'chart'}
+
+    data = MalariaDataLoader().get_published_dataset().data
+    year, month, metric = get_default_view(data)
+    chart_viz = ChartVisualizations('Districts', MetricsCalculator('Districts'))
+    map_viz = MapVisualizations('Districts', MetricsCalculator('Districts'))
+
+    # Spelled the way the dashboard page calls them for its default filters
+    misses = FIGURE_CACHE.stats()['misses']
+    chart_viz.create_top_entities_chart(data, year, month, metric, lean=False, period_label=None)
+    map_viz.create_choropleth_map(data, year, month, metric, lean=False)
+
+    assert FIGURE_CACHE.stats()['misses'] == misses
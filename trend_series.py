@@ -0,0 +1,89 @@
+# trend_series.py - Per-entity monthly time series extracted once per dataset, with LTTB downsampling
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions kept by Largest-Triangle-Three-Buckets downsampling to `threshold` points
+
+    First and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    average of the next bucket, so peaks and troughs survive.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))  # a missing month never wins a bucket on NaN
+    # threshold - 2 buckets over the interior points 1 .. n-2, plus the last point as a final bucket
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    edges = np.append(edges, n)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        areas = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor])
+                       - (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(np.argmax(areas))
+        kept[bucket + 1] = anchor
+    return kept
+
+
+class TrendSeriesStore:
+    """Every entity's monthly series in contiguous arrays, sorted by entity then month
+
+    Rows of one entity are a single slice of each column array, so building a
+    trend view costs the selected entities' points rather than a scan of the
+    whole dataset. Dates are derived once from year/month at build time.
+    """
+
+    def __init__(self, data: pd.DataFrame, entity_col: str, columns: List[str]):
+        self.entity_col = entity_col
+        self.columns = [col for col in columns if col in data.columns]
+
+        entities = data[entity_col].to_numpy()
+        periods = data['year'].to_numpy(dtype='int64') * 12 + data['month'].to_numpy(dtype='int64') - 1
+        codes, uniques = pd.factorize(entities, sort=True)
+        order = np.lexsort((periods, codes))
+
+        # Months since 1970-01 are exactly datetime64[M]; plotly wants nanosecond dates
+        self.dates = (periods[order] - 1970 * 12).astype('datetime64[M]').astype('datetime64[ns]')
+        self.values: Dict[str, np.ndarray] = {}
+        for col in self.columns:
+            series = data[col]
+            array = series.to_numpy(dtype='float64') if pd.api.types.is_numeric_dtype(series) else series.to_numpy()
+            self.values[col] = np.ascontiguousarray(array[order])
+
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self._slices: Dict[str, Tuple[int, int]] = {
+            entity: (int(bounds[i]), int(bounds[i + 1])) for i, entity in enumerate(uniques)
+        }
+
+    @property
+    def entities(self) -> List[str]:
+        return list(self._slices)
+
+    def __contains__(self, entity: str) -> bool:
+        return entity in self._slices
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def series(self, entity: str, columns: List[str], max_points: Optional[int] = None
+               ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """(dates, {column: values}) of one entity, LTTB-downsampled on the first column above max_points"""
+        start, end = self._slices[entity]
+        dates = self.dates[start:end]
+        values = {col: self.values[col][start:end] for col in columns}
+        if max_points is not None and end - start > max_points and columns:
+            kept = lttb_indices(dates.astype('int64'), values[columns[0]], max_points)
+            dates = dates[kept]
+            values = {col: array[kept] for col, array in values.items()}
+        return dates, values
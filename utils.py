@@ -1,5 +1,8 @@
 # utils.py - Shared constants and utilities to eliminate duplication
 
+import numbers
+import weakref
+
 # Month names - used across multiple files (REMOVED from chart_visualizations.py)
 MONTH_NAMES = {
     1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun",
@@ -21,4 +24,46 @@ def calculate_percentage_change(current: float, previous: float) -> float:
     """Calculate percentage change between two values"""
     if previous == 0:
         return 0.0
-    return ((current - previous) / previous) * 100
\ No newline at end of file
+    return ((current - previous) / previous) * 100
+
+# id(figure) -> (weak reference, payload size); cached figures are read-only, so one measurement per object
+_PAYLOAD_SIZES = {}
+
+def get_figure_payload_size(fig) -> int:
+    """Size in bytes of the JSON a Plotly figure sends to the browser (serialized once per figure object)"""
+    key = id(fig)
+    entry = _PAYLOAD_SIZES.get(key)
+    if entry is not None and entry[0]() is fig:
+        return entry[1]
+    size = len(fig.to_json().encode('utf-8'))
+    _PAYLOAD_SIZES[key] = (weakref.ref(fig, lambda _: _PAYLOAD_SIZES.pop(key, None)), size)
+    return size
+
+def format_bytes(num_bytes: int) -> str:
+    """Format a byte count for display"""
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    if num_bytes >= 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes} B"
+
+def format_markdown_table(frame, index: bool = True) -> str:
+    """Render a small DataFrame as a Markdown table (st.markdown needs no pyarrow, unlike st.dataframe)"""
+    def cell(value) -> str:
+        if value is None or value != value:  # None / NaN
+            text = ''
+        elif isinstance(value, numbers.Number) and not isinstance(value, bool) and float(value).is_integer():
+            text = f"{int(value):,}"
+        elif isinstance(value, numbers.Real) and not isinstance(value, bool):
+            text = f"{value:,.3g}" if abs(value) < 1 else f"{value:,.1f}"
+        else:
+            text = str(value)
+        return text.replace('|', '\\|').replace('\n', ' ')
+    
+    headers = ([' / '.join(map(str, frame.index.names)) if any(frame.index.names) else ''] if index else [])
+    headers += [str(col) for col in frame.columns]
+    lines = ['| ' + ' | '.join(headers) + ' |', '|' + '---|' * len(headers)]
+    for label, row in zip(frame.index, frame.itertuples(index=False, name=None)):
+        labels = ([' / '.join(map(str, label)) if isinstance(label, tuple) else str(label)] if index else [])
+        lines.append('| ' + ' | '.join(labels + [cell(value) for value in row]) + ' |')
+    return '\n'.join(lines)
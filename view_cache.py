@@ -0,0 +1,257 @@
+# view_cache.py - Shared in-process caches for figures and derived views
+
+import hashlib
+import inspect
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+class _Flight:
+    """One in-progress computation and the callers waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time; concurrent callers share its result
+
+    The first caller for a key (the leader) computes; callers arriving while
+    it runs wait for the leader's result instead of repeating the work, and
+    a failure is re-raised in every one of them. Nothing is stored once the
+    flight lands - caching is up to the caller.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.computations = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.max_waiters = 0
+        self.wait_seconds = 0.0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return compute() for key, joining a computation already running for it"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.computations += 1
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, flight.waiters)
+
+        if not leader:
+            start = time.perf_counter()
+            flight.done.wait()
+            with self._lock:
+                self.wait_seconds += time.perf_counter() - start
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contention counters: computations run, callers coalesced onto one, time spent waiting"""
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'computations': self.computations,
+                'coalesced': self.coalesced,
+                'failures': self.failures,
+                'max_waiters': self.max_waiters,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache shared across Streamlit sessions
+
+    Misses go through a SingleFlight, so sessions missing the same key at the
+    same time (after a restart or a new dataset version) wait for one
+    computation instead of each running their own.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        # Bumped by invalidation - results computed from before it are returned but not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value and mark it as most recently used"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss (once for concurrent misses)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        return self._flights.do(key, lambda: self._compute_and_store(key, compute))
+
+    def _compute_and_store(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            # A flight for this key may have landed between our miss and this one starting
+            if key in self._entries:
+                return self._entries[key]
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            if generation != self._generation:
+                return value  # Invalidated while computing - the value may be derived from stale data
+        self.put(key, value)
+        return value
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate, returning how many were dropped"""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+            return len(stale)
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for monitoring"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                **self._flights.stats()
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Figures for identical views are shared by every session in the process
+FIGURE_CACHE = LRUCache(max_entries=256)
+
+# Precomputed per-dataset tables (rankings, statistics) keyed on the dataset fingerprint
+TABLE_CACHE = LRUCache(max_entries=128)
+
+
+# id(frame) -> (weak reference, fingerprint); identity-checked so reused ids never match
+_FINGERPRINTS: Dict[int, Tuple[Callable[[], Any], str]] = {}
+_FINGERPRINTS_LOCK = threading.Lock()
+
+
+def set_dataset_fingerprint(data: pd.DataFrame, fingerprint: str):
+    """Register a known fingerprint (e.g. a dataset version) for a loaded frame"""
+    key = id(data)
+    with _FINGERPRINTS_LOCK:
+        _FINGERPRINTS[key] = (weakref.ref(data, lambda _: _FINGERPRINTS.pop(key, None)), fingerprint)
+
+
+def dataset_fingerprint(data: pd.DataFrame) -> str:
+    """Get a content fingerprint for a dataset (computed once per frame object)
+
+    Not stored in DataFrame.attrs: pandas copies attrs into derived frames
+    (merge, concat, slices), which would then share a stale fingerprint.
+    """
+    entry = _FINGERPRINTS.get(id(data))
+    if entry is not None and entry[0]() is data:
+        return entry[1]
+
+    columns = [col for col in data.columns if col != 'geometry']
+    # Row hashes in order, so precomputed tables can refer to row positions
+    hashed = pd.util.hash_pandas_object(data[columns], index=False)
+    fingerprint = f"{len(data)}-{hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()[:16]}"
+    set_dataset_fingerprint(data, fingerprint)
+    return fingerprint
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn list/set/dict arguments into hashable cache key parts"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if hasattr(value, 'item'):
+        # numpy scalars (e.g. year/month from selectboxes) -> plain python values
+        return value.item()
+    return value
+
+
+def cached_figure(method: Callable) -> Callable:
+    """Cache a visualization method on (dashboard type, view parameters, dataset fingerprint)
+
+    The wrapped method must take the dataset as its first argument and be a pure
+    function of the dataset and the remaining arguments. Every caller gets the
+    same figure object back, so callers must treat it as read-only.
+    Arguments are keyed after binding to the signature with defaults applied,
+    so positional, keyword and omitted-default spellings of a call share an entry.
+    """
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, data, *args, **kwargs):
+        bound = signature.bind(self, data, *args, **kwargs)
+        bound.apply_defaults()
+        view_arguments = list(bound.arguments.values())[2:]
+        key = (
+            type(self).__name__, method.__name__, self.dashboard_type,
+            dataset_fingerprint(data), _freeze(view_arguments)
+        )
+        return FIGURE_CACHE.get_or_compute(key, lambda: method(self, data, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,172 @@
+# warmup.py - Load both levels and prime the shared caches for the default view at process start
+#
+# Usage: python warmup.py                      (warm up once and print the readiness report)
+#        python warmup.py --serve [options]    (start the Streamlit server with warm-up running in the background)
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from chart_visualizations import ChartVisualizations
+from data_loader import MalariaDataLoader, SectorDataLoader
+from map_visualizations import MapVisualizations
+from metrics_calculator import MetricsCalculator
+from parallel_tasks import run_parallel
+
+# Admin level -> (loader class, dashboard type); districts first since it is the default level
+LEVELS = {
+    'districts': (MalariaDataLoader, 'Districts'),
+    'sectors': (SectorDataLoader, 'Sectors')
+}
+
+
+class WarmupStatus:
+    """Progress of the process warm-up - step timings per admin level and a ready flag per level"""
+
+    def __init__(self, levels):
+        self.state = 'pending'
+        self.started_at: Optional[float] = None
+        self.elapsed_ms: Optional[float] = None
+        self.steps: Dict[str, Dict[str, float]] = {level: {} for level in levels}
+        self.errors: Dict[str, str] = {}
+        self._ready = {level: threading.Event() for level in levels}
+        self._lock = threading.Lock()
+
+    def record(self, level: str, step: str, elapsed_ms: float):
+        with self._lock:
+            self.steps[level][step] = elapsed_ms
+
+    def finish_level(self, level: str, error: Optional[str] = None):
+        """Mark a level done (failed levels are done too - sessions then load it themselves)"""
+        if error:
+            self.errors[level] = error
+        self._ready[level].set()
+
+    def is_ready(self, level: Optional[str] = None) -> bool:
+        if level is None:
+            return all(event.is_set() for event in self._ready.values())
+        return level not in self._ready or self._ready[level].is_set()
+
+    def wait(self, level: str, timeout: Optional[float] = None) -> bool:
+        """Block until a level is warm; False on timeout"""
+        return level not in self._ready or self._ready[level].wait(timeout)
+
+    def summary(self) -> str:
+        """One-line readiness report"""
+        if self.state == 'pending':
+            return "not started"
+        if self.state == 'running':
+            done = [level for level, event in self._ready.items() if event.is_set()]
+            return f"running ({', '.join(done) or 'no levels'} ready)"
+        failed = f", failed: {', '.join(self.errors)}" if self.errors else ""
+        return f"{self.state} in {self.elapsed_ms / 1000:.1f} s{failed}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {level: dict(timings) for level, timings in self.steps.items()}
+        return {'state': self.state, 'elapsed_ms': self.elapsed_ms, 'steps': steps, 'errors': dict(self.errors),
+                'ready': {level: event.is_set() for level, event in self._ready.items()}}
+
+    def save(self, path: str = 'data/cache/warmup.json') -> Optional[str]:
+        """Write the report for external readiness probes (best effort)"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as handle:
+                json.dump(self.to_dict(), handle, indent=2)
+        except OSError:
+            return None
+        return path
+
+
+def get_default_view(data) -> Tuple[int, int, str]:
+    """(year, month, metric) a new session opens on: latest year, its last month, first metric"""
+    year = int(data['year'].max())
+    month = int(data.loc[data['year'] == year, 'month'].max())
+    metric = next(iter(MetricsCalculator.get_dashboard_metric_options(data)))
+    return year, month, metric
+
+
+def _timed(status: WarmupStatus, level: str, step: str, func: Callable[[], Any]) -> Callable[[], Any]:
+    def run():
+        start = time.perf_counter()
+        result = func()
+        status.record(level, step, (time.perf_counter() - start) * 1000)
+        return result
+    return run
+
+
+def warm_level(level: str, status: WarmupStatus):
+    """Ingest one level, build the default dashboard view and extract the trend series into the shared caches"""
+    loader_class, display_type = LEVELS[level]
+    data = _timed(status, level, 'data', lambda: loader_class().get_published_dataset().data)()
+
+    year, month, metric = get_default_view(data)
+    metrics_calculator = MetricsCalculator(display_type)
+    map_viz = MapVisualizations(display_type, MetricsCalculator(display_type))
+    chart_viz = ChartVisualizations(display_type, MetricsCalculator(display_type))
+
+    # Same calls (and so the same cache keys) as the dashboard page with its default filters
+    run_parallel({
+        'cards': _timed(status, level, 'cards', lambda: metrics_calculator.get_rank_table(data)),
+        'trends': _timed(status, level, 'trends', lambda: metrics_calculator.get_trend_store(data)),
+        'map': _timed(status, level, 'map',
+                      lambda: map_viz.create_choropleth_map(data, year, month, metric)),
+        'chart': _timed(status, level, 'chart',
+                        lambda: chart_viz.create_top_entities_chart(data, year, month, metric))
+    })
+
+
+def warm_up(status: WarmupStatus) -> WarmupStatus:
+    """Warm every level in turn; a failing level is reported and does not stop the others"""
+    status.state = 'running'
+    status.started_at = time.time()
+    start = time.perf_counter()
+    for level in LEVELS:
+        try:
+            warm_level(level, status)
+            status.finish_level(level)
+        except Exception as e:
+            status.finish_level(level, f"{type(e).__name__}: {e}")
+    status.elapsed_ms = (time.perf_counter() - start) * 1000
+    status.state = 'failed' if status.errors else 'ready'
+    status.save()
+    return status
+
+
+# One warm-up per process, shared by every session
+WARMUP_STATUS = WarmupStatus(LEVELS)
+_warmup_lock = threading.Lock()
+
+
+def start_warmup() -> WarmupStatus:
+    """Start the background warm-up if it has not run in this process yet (safe to call on every rerun)"""
+    with _warmup_lock:
+        if WARMUP_STATUS.state == 'pending':
+            WARMUP_STATUS.state = 'running'
+            threading.Thread(target=warm_up, args=(WARMUP_STATUS,), name='warmup', daemon=True).start()
+    return WARMUP_STATUS
+
+
+if __name__ == "__main__":
+    if '--serve' in sys.argv:
+        # Warm up inside the server process, so its caches are the ones sessions use. Go through the
+        # importable module (not __main__) so the app script sees this same warm-up status.
+        from streamlit.web import cli as stcli
+        import warmup
+
+        warmup.start_warmup()
+        options = [arg for arg in sys.argv[1:] if arg != '--serve']
+        app = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main_simplified.py')
+        sys.argv = ['streamlit', 'run', app] + options
+        sys.exit(stcli.main())
+
+    warm_up(WARMUP_STATUS)
+    print(f"Warm-up {WARMUP_STATUS.summary()}")
+    for level, steps in WARMUP_STATUS.steps.items():
+        print(f"  {level}: " + ', '.join(f"{step} {elapsed:.0f} ms" for step, elapsed in steps.items()))
+    for level, error in WARMUP_STATUS.errors.items():
+        print(f"  {level} failed: {error}")
+    sys.exit(1 if WARMUP_STATUS.errors else 0)